@@ -6,15 +6,12 @@ import json
 import os
 import random
 import time
-from typing import AsyncGenerator, Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 
-from app.tts import speak as tts_speak
-from vosk import Model, KaldiRecognizer
+from app.pipeline import STAGES, VoicePipeline, WakeSpotter, make_vad, wake_grammar
 import logging
 import re
-import urllib.parse
 import webbrowser
-import requests
 
 from app.constants import (
     DEBUG,
@@ -22,18 +19,29 @@ from app.constants import (
     WAKE_WORD,
     WAKE_WORD_ALIASES,
     VOSK_MODEL_PATH,
+    COMMAND_QUEUE_SIZE,
+    WAKE_SPOTTER,
+    WAKE_PREROLL_CHUNKS,
+    SPECULATE,
+    SPECULATE_STABLE_PARTIALS,
+    SPECULATE_TTS,
 )
 
 if not DEBUG:
     os.environ.setdefault("VOSK_LOG_LEVEL", "-1")
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("gtts").setLevel(logging.WARNING)
+from core.config import FILE_INDEX, FILE_INDEX_PATH, FILE_INDEX_ROOTS, FILE_INDEX_REFRESH
+from core.executor import abandoned, default_executor
+from core.file_index import start_background_index
 from core.intent_router import IntentRouter
+from core import tracing
 from core.transcript import Transcript
 from app.config import VOICE_NAME, VOICE_RATE
 
 from core.tools import _REGISTRY, tool, _TOOL_SCHEMA_MAP
 from app.intent_router import fuzzy_match, Action
+from app.speculation import Speculator
 
 ROUTER_PROMPT = """
 You are an intent‑router for a local voice assistant.
@@ -56,21 +64,15 @@ or
 logger = logging.getLogger(__name__)
 
 
-@tool
+@tool(timeout=8.0)
 def play_music(url: str | None = None, query: str | None = None) -> tuple[bool, str]:
     """Play a song, playlist or stream in the default browser."""
     if url is None and query:
-        q = urllib.parse.quote_plus(query)
-        search_url = f"https://www.youtube.com/results?search_query={q}"
-        try:
-            resp = requests.get(search_url, timeout=5)
-            m = re.search(r"/watch\?v=([\w-]{11})", resp.text)
-            if m:
-                url = f"https://www.youtube.com/watch?v={m.group(1)}"
-            else:
-                url = search_url
-        except Exception:
-            url = search_url
+        from app.youtube import resolver
+
+        url = resolver().resolve(query)
+        if abandoned():
+            return False, "Lookup cancelled"
     if url:
         try:
             webbrowser.open(url)
@@ -194,57 +196,28 @@ _CASUAL_FALLBACKS = [
 ]
 
 
-async def microphone_chunks() -> AsyncGenerator[bytes, None]:
-    q: asyncio.Queue[bytes] = asyncio.Queue()
-    loop = asyncio.get_running_loop()
+# Fixed replies synthesized into the voice cache at startup.
+_PREWARM_PHRASES = [
+    "Ready",
+    "I didn't understand",
+    *_CASUAL_FALLBACKS,
+    *(reply for _, replies in _SMALL_TALK for reply in replies),
+]
 
-    def _worker() -> None:
-        import pyaudio
-        pa = pyaudio.PyAudio()
-        try:
-            stream = pa.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=16000,
-                input=True,
-                frames_per_buffer=8000,
-            )
-        except Exception as e:
-            print(f"Microphone error: {e}")
-            return
-        stream.start_stream()
-        while True:
-            try:
-                data = stream.read(4000, exception_on_overflow=False)
-            except OSError as exc:
-                logger.error(
-                    "Mic read failed: %s. Check device index or reinitialise audio input.",
-                    exc,
-                )
-                try:
-                    stream.stop_stream()
-                    stream.close()
-                    stream = pa.open(
-                        format=pyaudio.paInt16,
-                        channels=1,
-                        rate=16000,
-                        input=True,
-                        frames_per_buffer=8000,
-                    )
-                    stream.start_stream()
-                except Exception as exc2:
-                    logger.error("Reopening mic failed: %s", exc2)
-                    time.sleep(1)
-                    continue
-                continue
-            asyncio.run_coroutine_threadsafe(q.put(data), loop)
 
-    import threading
+# Audio output (edge_tts, miniaudio, simpleaudio) is only loaded once
+# something is actually spoken, so console and one-shot runs never pay for it.
+_PLAYER: Any = None
 
-    threading.Thread(target=_worker, daemon=True).start()
-    while True:
-        data = await q.get()
-        yield data
+
+def _player() -> Any:
+    """Return the shared :class:`~app.playback.PlaybackScheduler`."""
+    global _PLAYER
+    if _PLAYER is None:
+        from app.playback import PlaybackScheduler
+
+        _PLAYER = PlaybackScheduler()
+    return _PLAYER
 
 
 def speak(text: str, enable: bool) -> None:
@@ -254,170 +227,396 @@ def speak(text: str, enable: bool) -> None:
         return
 
     if enable:
-        asyncio.create_task(tts_speak(text))
+        _player().submit(text)
     else:
         print(f"Assistant: {text}")
 
 
-def handle_text(text: str, router: IntentRouter, tts: bool, transcript: Transcript) -> None:
-    """Map *text* to a tool either via fuzzy rules or the LLM."""
+_SENTENCE_END = re.compile(r"[.!?;]\s")
+
+
+class _ReplyStream:
+    """Print or speak a streamed LLM reply as its tokens arrive.
+
+    The requests backend streams on a worker thread, so tokens are handed
+    to *loop* before they touch the console or the player. Spoken replies
+    are submitted one complete sentence at a time.
+    """
+
+    def __init__(self, tts: bool, loop: asyncio.AbstractEventLoop) -> None:
+        self.tts = tts
+        self.loop = loop
+        self.text = ""
+        self.sent = 0
+
+    def __call__(self, token: str) -> None:
+        try:
+            on_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._add(token)
+        else:
+            self.loop.call_soon_threadsafe(self._add, token)
+
+    def _add(self, token: str) -> None:
+        if not self.tts:
+            if not self.text:
+                print("Assistant: ", end="")
+            print(token, end="", flush=True)
+            self.text += token
+            return
+        self.text += token
+        end = None
+        for end in _SENTENCE_END.finditer(self.text, self.sent):
+            pass
+        if end is not None:
+            speak(self.text[self.sent:end.end()], True)
+            self.sent = end.end()
+
+    def finish(self, final: bool) -> bool:
+        """End the stream; return True if the reply has already been output.
+
+        *final* is False when the model chose a tool after all, in which
+        case the rest of the text is dropped.
+        """
+        if not self.text:
+            return False
+        if not self.tts:
+            print(flush=True)
+        elif final and self.text[self.sent:].strip():
+            speak(self.text[self.sent:], True)
+        return final
+
+
+def _clean_action_args(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    if name == "kill_process":
+        args["name"] = _clean_arg(args.get("name", ""))
+    if name == "open_website":
+        args["url"] = _clean_arg(args.get("url", ""))
+    if name == "open_explorer":
+        args["path"] = _clean_arg(args.get("path", ""))
+    return args
+
+
+def _resolve_rules(text: str) -> tuple[str | None, Action | None]:
+    """Resolve *text* without the LLM: a canned reply, a tool action or neither."""
     for pattern, replies in _SMALL_TALK:
         if pattern.search(text):
-            resp = random.choice(replies)
-            transcript.log("BOT", resp)
-            speak(resp, tts)
-            return
+            return random.choice(replies), None
     act = fuzzy_match(text)
     if act:
         if act.name == "repeat":
-            resp = random.choice(_CASUAL_FALLBACKS)
-            transcript.log("BOT", resp)
-            speak(resp, tts)
-            return
+            return random.choice(_CASUAL_FALLBACKS), None
         if act.name in _REGISTRY:
-            if act.name == "kill_process":
-                act.args["name"] = _clean_arg(act.args.get("name", ""))
-            if act.name == "open_website":
-                act.args["url"] = _clean_arg(act.args.get("url", ""))
-            if act.name == "open_explorer":
-                act.args["path"] = _clean_arg(act.args.get("path", ""))
-            if DEBUG:
-                transcript.log("FUNC", f"{act.name} {act.args} | raw='{text}'")
-            ok, msg = _REGISTRY[act.name]["callable"](**act.args)
-            transcript.log("BOT", msg)
-            speak(msg, tts)
-            return
+            return None, Action(act.name, _clean_action_args(act.name, act.args))
+    return None, None
 
-    name, args_route, intent = router.route(text)
-    if DEBUG:
-        transcript.log("INTENT", intent)
+
+def _resolve_route(
+    name: str | None, args_route: Dict[str, Any]
+) -> tuple[str | None, Action | None]:
+    """Turn a router decision into a tool action or a spoken reply."""
     if name and name in _REGISTRY:
-        if name == "kill_process":
-            args_route["name"] = _clean_arg(args_route.get("name", ""))
-        if name == "open_website":
-            args_route["url"] = _clean_arg(args_route.get("url", ""))
-            if not args_route["url"]:
-                name = None
-        if name == "open_explorer":
-            args_route["path"] = _clean_arg(args_route.get("path", ""))
-        if name and DEBUG:
-            transcript.log("FUNC", f"{name} {args_route} | raw='{text}'")
-        if name:
-            ok, msg = _REGISTRY[name]["callable"](**args_route)
-            transcript.log("BOT", msg)
-            speak(msg, tts)
-            return
-    else:
-        reply = args_route.get("content")
-        if not reply and CONVERSATIONAL_MODE:
-            reply = random.choice(_CASUAL_FALLBACKS)
-        elif not reply:
-            reply = "I didn't understand"
+        args_route = _clean_action_args(name, args_route)
+        if name == "open_website" and not args_route["url"]:
+            return None, None
+        return None, Action(name, args_route)
+    reply = args_route.get("content")
+    if not reply and CONVERSATIONAL_MODE:
+        reply = random.choice(_CASUAL_FALLBACKS)
+    elif not reply:
+        reply = "I didn't understand"
+    return reply, None
+
+
+def handle_text(text: str, router: IntentRouter, tts: bool, transcript: Transcript) -> None:
+    """Map *text* to a tool either via fuzzy rules or the LLM."""
+    with tracing.span("rules"):
+        reply, act = _resolve_rules(text)
+    if reply is None and act is None:
+        name, args_route, intent = router.route(text)
+        if DEBUG:
+            transcript.log("INTENT", intent)
+        reply, act = _resolve_route(name, args_route)
+    if act:
+        if DEBUG:
+            transcript.log("FUNC", f"{act.name} {act.args} | raw='{text}'")
+        ok, reply = default_executor().run_sync(act.name, act.args)
+    if reply is not None:
         transcript.log("BOT", reply)
         speak(reply, tts)
 
 
+Plan = tuple[Optional[str], Optional[Action], Optional[str]]
+
+
+async def plan_command(
+    text: str, router: IntentRouter, on_token: Optional[Callable[[str], None]] = None
+) -> Plan:
+    """Decide how to answer *text*: ``(reply, action, intent)``. Runs no tool.
+
+    *on_token* receives a streamed chat reply as it arrives.
+    """
+    with tracing.span("rules"):
+        reply, act = _resolve_rules(text)
+    intent = None
+    if reply is None and act is None:
+        with STAGES["route"].time():
+            name, args_route, intent = await router.aroute(text, on_token)
+        reply, act = _resolve_route(name, args_route)
+    return reply, act, intent
+
+
+async def handle_text_async(
+    text: str,
+    router: IntentRouter,
+    tts: bool,
+    transcript: Transcript,
+    plan: Plan | None = None,
+) -> None:
+    """:func:`handle_text` for the event loop: routing and tools never block it.
+
+    *plan* is a result of :func:`plan_command` computed ahead of time.
+    Without one, a streamed chat reply is printed or spoken as it arrives.
+    """
+    stream = None
+    if plan is None:
+        if getattr(router, "stream", False):
+            stream = _ReplyStream(tts, asyncio.get_running_loop())
+        plan = await plan_command(text, router, stream)
+    reply, act, intent = plan
+    if DEBUG and intent is not None:
+        transcript.log("INTENT", intent)
+    if act:
+        if DEBUG:
+            transcript.log("FUNC", f"{act.name} {act.args} | raw='{text}'")
+        with STAGES["act"].time():
+            ok, reply = await default_executor().run(act.name, act.args)
+    streamed = stream is not None and stream.finish(act is None)
+    if reply is not None:
+        transcript.log("BOT", reply)
+        if not streamed:
+            speak(reply, tts)
+
+
+_BACKGROUND: set[asyncio.Task[Any]] = set()
+
+
+def _spawn(coro: Any) -> asyncio.Task[Any]:
+    """Run *coro* as a task and keep a reference until it finishes."""
+    task = asyncio.create_task(coro)
+    _BACKGROUND.add(task)
+    task.add_done_callback(_BACKGROUND.discard)
+    return task
+
+
+def _to_command(text: str) -> str | None:
+    """Return the command after the wake word, or ``None`` if it is absent."""
+    text = _fix_wake_word(text)
+    if not text or not text.lower().startswith(WAKE_WORD.lower()):
+        return None
+    return text[len(WAKE_WORD):].strip()
+
+
+Command = tuple[float, str, Optional[str], "Optional[asyncio.Task[Plan]]"]
+
+
+async def _act_worker(
+    commands: "asyncio.Queue[Command]",
+    router: IntentRouter,
+    tts: bool,
+    transcript: Transcript,
+) -> None:
+    """Route and act on recognized commands one at a time."""
+    while True:
+        queued, cmd, trace_id, speculation = await commands.get()
+        tracing.set_command(trace_id)
+        STAGES["queue_wait"].record((time.monotonic() - queued) * 1000)
+        try:
+            plan = None
+            if speculation is not None:
+                try:
+                    plan = await speculation
+                except Exception as exc:
+                    logger.info("speculative plan for %r failed: %s", cmd, exc)
+            await handle_text_async(cmd, router, tts, transcript, plan)
+        except Exception as exc:
+            logger.error("command %r failed: %s", cmd, exc)
+        finally:
+            commands.task_done()
+
+
+def _make_speculator(router: IntentRouter, tts: bool) -> Speculator | None:
+    if not SPECULATE:
+        return None
+    synthesize: Any = None
+    if tts and SPECULATE_TTS:
+        from app.tts import warm
+
+        synthesize = warm
+    return Speculator(
+        lambda cmd: plan_command(cmd, router), SPECULATE_STABLE_PARTIALS, synthesize=synthesize
+    )
+
+
 async def voice_loop(
     router: IntentRouter, model_path: str, tts: bool, transcript: Transcript
 ) -> None:
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Vosk model missing at {model_path}")
+    from vosk import Model, KaldiRecognizer
+
     model = Model(model_path)
     recognizer = KaldiRecognizer(model, 16000)
     transcript.log("BOT", "Ready")
-    last_voice = time.monotonic()
-    awaiting = False
-    buffer = ""
-    last_part = ""
-    async for chunk in microphone_chunks():
-        if recognizer.AcceptWaveform(chunk):
-            res = json.loads(recognizer.Result())
-            text = res.get("text", "").strip()
-            if DEBUG and text:
-                transcript.log("RAW", text)
-                if last_part:
-                    transcript.log("PART", "")
-            awaiting = False
-            buffer = ""
-            last_part = ""
-            text = _fix_wake_word(text)
-            if not text:
-                continue
-            if not text.lower().startswith(WAKE_WORD.lower()):
-                continue
-            cmd = text[len(WAKE_WORD):].strip()
-            transcript.log("USER", cmd)
-            handle_text(cmd, router, tts, transcript)
-        else:
-            part = json.loads(recognizer.PartialResult()).get("partial", "")
-            now = time.monotonic()
-            if part:
-                buffer = part
-                awaiting = WAKE_WORD.lower() in part.lower() or awaiting
-                last_voice = now
-                last_part = part
+    player = _player()
+    if tts:
+        from app.tts import prewarm
+
+        _spawn(prewarm(_PREWARM_PHRASES))
+    spotter = None
+    if WAKE_SPOTTER:
+        # Vosk ignores grammar words missing from the model's vocabulary,
+        # which is why the aliases are listed alongside the wake word.
+        words = {WAKE_WORD, *WAKE_WORD_ALIASES}
+        spotter = WakeSpotter(
+            KaldiRecognizer(model, 16000, wake_grammar(words)), words, WAKE_PREROLL_CHUNKS
+        )
+    pipeline = VoicePipeline(
+        asyncio.get_running_loop(), recognizer, _to_command, vad=make_vad(), spotter=spotter
+    )
+    commands: asyncio.Queue[Command] = asyncio.Queue(COMMAND_QUEUE_SIZE)
+    _spawn(_act_worker(commands, router, tts, transcript))
+    speculator = _make_speculator(router, tts)
+    pipeline.start()
+    seen_drops = 0
+    woke: float | None = None
+    try:
+        while True:
+            kind, text = await pipeline.events.get()
+            if pipeline.audio.dropped != seen_drops:
+                seen_drops = pipeline.audio.dropped
+                logger.warning("recognizer behind, dropped oldest audio: %s", pipeline.stats())
+            if kind == "partial":
                 if DEBUG:
-                    transcript.log("PART", part)
-            elif awaiting and now - last_voice > 0.3:
-                res = json.loads(recognizer.FinalResult())
-                text = (buffer + " " + res.get("text", "")).strip()
+                    transcript.log("PART", text)
+                if speculator is not None and woke is not None:
+                    cmd = _to_command(text)
+                    if cmd:
+                        speculator.observe(cmd)
+            elif kind == "wake":
+                player.interrupt()  # barge-in: the user is talking to us again
+                if speculator is not None:
+                    speculator.reset()
+                tracing.begin()
+                woke = time.perf_counter()
+                tracing.record("wake_handoff", pipeline.events.lag_ms)
+            elif kind == "raw":
                 if DEBUG:
                     transcript.log("RAW", text)
-                    if last_part:
-                        transcript.log("PART", "")
-                awaiting = False
-                buffer = ""
-                last_part = ""
-                text = _fix_wake_word(text)
-                if not text:
-                    continue
-                if not text.lower().startswith(WAKE_WORD.lower()):
+            elif kind == "clear":
+                if DEBUG:
+                    transcript.log("PART", "")
+            elif kind == "final":
+                player.interrupt()
+                if tracing.current() is None:
+                    tracing.begin()
+                elif woke is not None:
+                    tracing.record("asr_final", (time.perf_counter() - woke) * 1000)
+                woke = None
+                trace_id = tracing.current()
+                tracing.set_command(None)
+                transcript.log("USER", text)
+                speculation = speculator.take(text) if speculator is not None else None
+                if commands.full():
+                    logger.warning("act stage busy, dropping %r: %s", text, pipeline.stats())
+                    if speculation is not None:
+                        speculation.cancel()
                     continue
-                cmd = text[len(WAKE_WORD):].strip()
-                transcript.log("USER", cmd)
-                handle_text(cmd, router, tts, transcript)
+                commands.put_nowait((time.monotonic(), text, trace_id, speculation))
+    finally:
+        pipeline.stop()
+        logger.info("voice pipeline stats: %s", pipeline.stats())
+        if speculator is not None:
+            logger.info("speculation stats: %s", speculator.stats())
 
 
 async def console_loop(router: IntentRouter, transcript: Transcript) -> None:
     while True:
-        text = input("You: ")
+        text = await asyncio.to_thread(input, "You: ")
         if not text:
             continue
+        tracing.begin()
         transcript.log("USER", text)
-        handle_text(text, router, False, transcript)
+        await handle_text_async(text, router, False, transcript)
+
+
+def run_command(query: str, router: IntentRouter, transcript: Transcript) -> str:
+    """Route and execute one command; return the reply text."""
+    tracing.begin()
+    name, params, _ = router.route(query)
+    if name and name in _REGISTRY:
+        ok, msg = default_executor().run_sync(name, params)
+    else:
+        msg = params.get("content", "I didn't understand")
+    transcript.log("BOT", msg)
+    return msg
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--mode",
-        choices=["voice", "console"],
+        choices=["voice", "console", "daemon"],
         default="voice",
     )
     parser.add_argument("--model-path", default=VOSK_MODEL_PATH)
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="trace pipeline stages and print latency histograms on exit",
+    )
     parser.add_argument("text", nargs="*", help="Optional one-shot command")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     logging.basicConfig(level=logging.DEBUG if DEBUG else logging.INFO)
+    if args.stats:
+        tracing.enable()
+    if tracing.TRACER.enabled:
+        tracing.install_signal_handler()
+    try:
+        _run(args)
+    finally:
+        if args.stats:
+            tracing.dump()
+            for name, s in default_executor().stats().items():
+                logger.info("tool %s: %s", name, s)
+
 
+def _run(args: argparse.Namespace) -> None:
     transcript = Transcript(DEBUG)
+    if not args.text and FILE_INDEX:
+        start_background_index(FILE_INDEX_PATH, FILE_INDEX_ROOTS, FILE_INDEX_REFRESH)
     router = IntentRouter()
     router.system_prompt = ROUTER_PROMPT
 
     if args.text:
-        query = " ".join(args.text)
-        name, params, _ = router.route(query)
-        if name and name in _REGISTRY:
-            ok, msg = _REGISTRY[name]["callable"](**params)
-            transcript.log("BOT", msg)
-            speak(msg, False)
-        else:
-            reply = params.get("content", "I didn't understand")
-            transcript.log("BOT", reply)
-            speak(reply, False)
+        speak(run_command(" ".join(args.text), router, transcript), False)
         return
 
-    if args.mode == "voice":
+    if args.mode == "daemon":
+        from app.daemon import Daemon
+
+        daemon = Daemon(lambda text: run_command(text, router, transcript))
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemon.close()
+            router.close()
+    elif args.mode == "voice":
         print(f"TTS backend: Edge | Voice: {VOICE_NAME} | Rate: {VOICE_RATE}")
         asyncio.run(voice_loop(router, args.model_path, True, transcript))
     else:
@@ -0,0 +1,152 @@
+"""Bounded drop-oldest hand-offs between the audio pipeline stages."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Generic, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Ring(ABC, Generic[T]):
+    """Fixed-size ring of timestamped items written by one producer thread.
+
+    ``deque.append``/``popleft`` are atomic under the GIL, so the producer
+    never takes a lock or creates a Future. It only signals the consumer
+    when the consumer is parked on an empty ring. When the ring is full the
+    oldest item is overwritten and counted, so the consumer always works on
+    near-real-time data.
+
+    Items for which *keep* returns True are never overwritten: the oldest
+    other item is dropped instead, and if there is none the ring grows.
+    Finding that item means scanning the ring, so both ends take a lock
+    when *keep* is given.
+    """
+
+    def __init__(self, maxsize: int, keep: Callable[[T], bool] | None = None) -> None:
+        self._keep = keep
+        self._buf: Deque[Tuple[float, T]] = deque(maxlen=None if keep else maxsize)
+        self._lock = threading.Lock()
+        self._waiting = False
+        self.maxsize = maxsize
+        self.received = 0
+        self.dropped = 0
+        self.lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    def put_threadsafe(self, item: T) -> None:
+        """Called from the producer thread."""
+        if self._keep is None:
+            if len(self._buf) == self.maxsize:
+                self.dropped += 1
+            self._buf.append((time.monotonic(), item))
+        else:
+            with self._lock:
+                if len(self._buf) >= self.maxsize:
+                    self._evict()
+                self._buf.append((time.monotonic(), item))
+        self.received += 1
+        if self._waiting:
+            self._waiting = False
+            self._wake()
+
+    def _evict(self) -> None:
+        assert self._keep is not None
+        for i, (_, queued) in enumerate(self._buf):
+            if not self._keep(queued):
+                del self._buf[i]
+                self.dropped += 1
+                return
+
+    @abstractmethod
+    def _wake(self) -> None:
+        """Signal a consumer parked on the empty ring."""
+
+    def _pop(self) -> Tuple[bool, T | None]:
+        try:
+            if self._keep is None:
+                stamp, item = self._buf.popleft()
+            else:
+                with self._lock:
+                    stamp, item = self._buf.popleft()
+        except IndexError:
+            return False, None
+        self.lag_ms = (time.monotonic() - stamp) * 1000
+        self.max_lag_ms = max(self.max_lag_ms, self.lag_ms)
+        return True, item
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self._buf),
+            "received": self.received,
+            "dropped": self.dropped,
+            "lag_ms": round(self.lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+        }
+
+
+class LoopHandoff(_Ring[T]):
+    """Ring from a producer thread to an asyncio consumer."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        maxsize: int = 16,
+        keep: Callable[[T], bool] | None = None,
+    ) -> None:
+        super().__init__(maxsize, keep)
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def _wake(self) -> None:
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    async def get(self) -> T:
+        while True:
+            ok, item = self._pop()
+            if ok:
+                return item  # type: ignore[return-value]
+            self._event.clear()
+            self._waiting = True
+            # Re-check after publishing the flag so a concurrent put is
+            # never missed.
+            if self._buf:
+                self._waiting = False
+                continue
+            await self._event.wait()
+
+
+class ThreadHandoff(_Ring[T]):
+    """Ring from a producer thread to a consumer thread."""
+
+    def __init__(self, maxsize: int = 16) -> None:
+        super().__init__(maxsize)
+        self._event = threading.Event()
+
+    def _wake(self) -> None:
+        self._event.set()
+
+    def get(self, timeout: float | None = None) -> T | None:
+        """Return the next item, or ``None`` if *timeout* passes first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            ok, item = self._pop()
+            if ok:
+                return item
+            self._event.clear()
+            self._waiting = True
+            if self._buf:
+                self._waiting = False
+                continue
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                self._waiting = False
+                return None
+            self._event.wait(remaining)
@@ -0,0 +1,36 @@
+"""Thin ``Kyra`` entry point: hand one-shot commands to the daemon when it runs.
+
+Only the standard library is imported on the fast path. Without a daemon,
+or for the interactive modes, it falls back to :func:`app.assistant.main`
+in this process. A command the daemon accepted but did not answer is
+reported, never run a second time.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import List
+
+from .daemon import DaemonError, request
+
+
+def main(argv: List[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and not any(a.startswith("-") for a in argv):
+        try:
+            reply = request(" ".join(argv))
+        except DaemonError as exc:
+            # The daemon has the command; running it here would do it twice.
+            print(f"Kyra: {exc}", file=sys.stderr)
+            sys.exit(1)
+        if reply is not None:
+            if reply:
+                print(f"Assistant: {reply}")
+            return
+    from .assistant import main as run
+
+    run(argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,13 @@
 VOICE_NAME = "en-US-JennyNeural"
 VOICE_RATE = "+5%"
 AUDIO_CACHE = ".voice_cache"
+AUDIO_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Store decoded PCM so cache hits play without an MP3 decode
+AUDIO_CACHE_PCM = True
+# Socket path or pipe name of the resident daemon; None picks a per-user default
+DAEMON_ADDRESS = None
+# Query -> YouTube video-ID cache used by play_music; None keeps it in memory
+YOUTUBE_CACHE = ".youtube_cache.json"
+YOUTUBE_CACHE_TTL = 7 * 24 * 3600
+# Seconds play_music waits for a video ID before opening the search page instead
+YOUTUBE_DEADLINE = 3.0
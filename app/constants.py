@@ -6,3 +6,23 @@ TTS_FALLBACK = True
 DEBUG = True
 CONVERSATIONAL_MODE = True
 VOSK_MODEL_PATH = "vosk-model-small-en-us-0.15"
+# Mic chunks (250 ms each) buffered before the oldest are dropped
+MIC_QUEUE_CHUNKS = 16
+# Recognized commands waiting for the route/act stage before new ones are dropped
+COMMAND_QUEUE_SIZE = 4
+# Skip silent mic chunks before they reach the recognizer (needs NumPy)
+VAD_ENABLED = True
+# Spot the wake word with a tiny grammar before engaging the full recognizer
+WAKE_SPOTTER = True
+# Chunks replayed to the full recognizer once the wake word fires
+WAKE_PREROLL_CHUNKS = 6
+# Chunks the full recognizer may run after a wake before giving up
+WAKE_LISTEN_CHUNKS = 32
+# Plan a command from stable partial results before the recognizer finalizes it
+# (off until bench_speculation shows a saving on real recordings)
+SPECULATE = False
+# Identical consecutive partials needed before speculating
+SPECULATE_STABLE_PARTIALS = 2
+# Also synthesize a predicted chat reply while the user is still talking
+# (tool confirmations are only known once the tool has run)
+SPECULATE_TTS = True
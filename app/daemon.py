@@ -0,0 +1,242 @@
+"""Resident Kyra process answering one-shot commands over a local socket.
+
+The daemon keeps the router, its caches, the HTTP pool and the file index
+warm. ``Kyra <command>`` then costs one round trip instead of a fresh
+interpreter. The transport is :mod:`multiprocessing.connection`: a Unix
+domain socket, or a named pipe on Windows. Messages are length-prefixed
+JSON, so no pickles cross the socket.
+
+The default socket lives in a per-user directory with mode 0700, and it is
+created under a 0177 umask. Both ends also prove knowledge of a random
+key, kept next to the socket (or under ``%LOCALAPPDATA%`` for a pipe) in
+a file only the user can read. Another local user cannot talk to the
+daemon, and a squatted pipe name cannot impersonate it.
+
+This module only uses the standard library, so the thin client stays cheap.
+"""
+
+from __future__ import annotations
+
+import getpass
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict
+
+from .config import DAEMON_ADDRESS
+
+logger = logging.getLogger(__name__)
+
+# Largest request or reply accepted, in bytes.
+_MAX_MESSAGE = 1 << 20
+
+
+def _private_dir() -> str:
+    """``kyra-<user>`` under the runtime or temp dir, owned by us with mode 0700."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    path = os.path.join(base, f"kyra-{getpass.getuser()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not os.path.isdir(path) or os.path.islink(path) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"{path} is not a private directory")
+    return path
+
+
+def default_address() -> str:
+    """Per-user socket path (or pipe name); ``KYRA_SOCKET`` overrides it."""
+    override = os.environ.get("KYRA_SOCKET") or DAEMON_ADDRESS
+    if override:
+        return override
+    if os.name == "nt":
+        return rf"\\.\pipe\kyra-{getpass.getuser()}"
+    return os.path.join(_private_dir(), "daemon.sock")
+
+
+def _key_path(address: str) -> str:
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "kyra", address.rsplit("\\", 1)[-1] + ".key")
+    return f"{address}.key"
+
+
+def authkey(address: str, create: bool = False) -> bytes | None:
+    """The shared secret for *address*, made on first use when *create* is set."""
+    path = _key_path(address)
+    try:
+        with open(path, "rb") as f:
+            if os.name != "nt":
+                st = os.fstat(f.fileno())
+                if st.st_uid != os.getuid() or st.st_mode & 0o077:
+                    raise PermissionError(f"{path} is readable by other users")
+            return f.read()
+    except FileNotFoundError:
+        if not create:
+            return None
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    key = os.urandom(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+class DaemonError(RuntimeError):
+    """The daemon accepted a command but gave no reply."""
+
+
+def request(text: str, address: str | None = None, timeout: float = 30.0) -> str | None:
+    """Send *text* to a running daemon and return its reply.
+
+    Returns ``None`` if no daemon is listening or it cannot be authenticated;
+    the caller then runs the command itself. Once the command has been
+    sent it is never handed back: a daemon that does not answer within
+    *timeout*, or drops the connection, raises :class:`DaemonError`, since
+    it may still be running the command.
+    """
+    try:
+        address = address or default_address()
+        key = authkey(address)
+        if key is None:
+            return None
+        conn = Client(address, authkey=key)
+    except (OSError, EOFError, AuthenticationError) as exc:
+        logger.debug("no usable daemon: %s", exc)
+        return None
+    with conn:
+        try:
+            conn.send_bytes(json.dumps({"text": text}).encode())
+        except OSError as exc:
+            logger.warning("Kyra daemon connection failed: %s; running here", exc)
+            return None
+        try:
+            if not conn.poll(timeout):
+                raise DaemonError(
+                    f"Kyra daemon did not answer within {timeout:g}s; the command may still be running"
+                )
+            resp = json.loads(conn.recv_bytes(_MAX_MESSAGE))
+        except (OSError, EOFError) as exc:
+            raise DaemonError(f"Kyra daemon connection lost: {exc}") from exc
+    return resp.get("reply", "")
+
+
+class Daemon:
+    """Accept connections and run *handle* for each request on a small pool."""
+
+    def __init__(
+        self,
+        handle: Callable[[str], str],
+        address: str | None = None,
+        workers: int = 4,
+    ) -> None:
+        self.handle = handle
+        self.address = address or default_address()
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="kyra-daemon")
+        self._listener: Listener | None = None
+        self._authkey: bytes | None = None
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self.served = 0
+        self.errors = 0
+        self._total_ms = 0.0
+
+    def bind(self) -> "Daemon":
+        if os.name != "nt" and os.path.exists(self.address):
+            try:
+                alive = request("", self.address, timeout=1.0) is not None
+            except DaemonError:
+                alive = True
+            if alive:
+                raise RuntimeError(f"Kyra daemon already listening on {self.address}")
+            os.unlink(self.address)  # left behind by a daemon that died
+        self._authkey = authkey(self.address, create=True)
+        if os.name == "nt":
+            self._listener = Listener(self.address, authkey=self._authkey)
+            return self
+        # The socket is born 0600, so no other user can connect before a chmod.
+        umask = os.umask(0o177)
+        try:
+            self._listener = Listener(self.address, authkey=self._authkey)
+        finally:
+            os.umask(umask)
+        return self
+
+    def serve_forever(self) -> None:
+        if self._listener is None:
+            self.bind()
+        assert self._listener is not None
+        logger.info("Kyra daemon listening on %s", self.address)
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except (AuthenticationError, EOFError) as exc:
+                if self._closed.is_set():
+                    break
+                logger.warning("rejected daemon client: %s", exc)
+                continue
+            except OSError:
+                if self._closed.is_set():
+                    break
+                raise
+            if self._closed.is_set():
+                conn.close()
+                break
+            self._pool.submit(self._serve, conn)
+
+    def start(self) -> "Daemon":
+        """Bind and serve on a background thread."""
+        self.bind()
+        threading.Thread(target=self.serve_forever, name="kyra-daemon", daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        try:
+            # Unblock accept(). No key, so this cannot wait on a handshake;
+            # the loop sees the rejected client and _closed.
+            Client(self.address).close()
+        except (OSError, EOFError, AuthenticationError):
+            pass
+        if self._listener is not None:
+            self._listener.close()
+        self._pool.shutdown(wait=False)
+
+    def _serve(self, conn: Connection) -> None:
+        start = time.perf_counter()
+        ok = True
+        with conn:
+            try:
+                text = json.loads(conn.recv_bytes(_MAX_MESSAGE)).get("text", "")
+                reply = self.handle(text) if text else ""
+            except EOFError:
+                return
+            except Exception as exc:
+                logger.exception("daemon request failed")
+                ok = False
+                reply = str(exc)
+            with self._lock:
+                self.served += 1
+                self.errors += not ok
+                self._total_ms += (time.perf_counter() - start) * 1000
+            try:
+                conn.send_bytes(json.dumps({"ok": ok, "reply": reply}).encode())
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "served": self.served,
+                "errors": self.errors,
+                "mean_ms": round(self._total_ms / self.served, 2) if self.served else 0.0,
+            }
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import re
 
 from rapidfuzz import fuzz
 
+from core.matcher import FuzzyCatalogue, Rule, RuleSet
+
 
 @dataclass
 class Action:
@@ -29,36 +31,68 @@ _PATTERNS = {
     "kill_process": (re.compile(r"(?:kill|close|terminate) (?P<proc>.+)", re.I), "name"),
 }
 
+_KEYWORDS = {
+    "open_explorer": ("open", "show"),
+    "create_note": ("note", "remember"),
+    "open_website": ("open", "visit", "go to"),
+    "launch_app": ("launch", "open", "start"),
+    "play_song": ("play", "listen to"),
+    "download_app": ("download", "install"),
+    "kill_process": ("kill", "close", "terminate"),
+}
+
+_RULES = RuleSet(
+    [Rule(name, regex, _KEYWORDS[name], key) for name, (regex, key) in _PATTERNS.items()]
+)
+
 _CHOICES = {
-    "open_explorer": "open folder",
-    "create_note": "create note",
-    "open_website": "open website",
-    "launch_app": "launch app",
-    "play_song": "play song",
-    "download_app": "download app",
-    "kill_process": "kill process",
+    "open_explorer": ("open folder",),
+    "create_note": ("create note",),
+    "open_website": ("open website",),
+    "launch_app": ("launch app",),
+    "play_song": ("play song",),
+    "download_app": ("download app",),
+    "kill_process": ("kill process",),
 }
 
+_CATALOGUE = FuzzyCatalogue(_CHOICES, fuzz.partial_ratio)
 
-def fuzzy_match(cmd: str) -> Optional[Action]:
-    text = cmd.lower().strip()
-    for name, (regex, arg_key) in _PATTERNS.items():
-        m = regex.search(text)
-        if m:
-            return Action(name, {arg_key: m.group(1).strip()})
-
-    scores = {
-        name: fuzz.partial_ratio(text, phrase)
-        for name, phrase in _CHOICES.items()
-    }
-    best_name = max(scores, key=scores.get)
-    score = scores[best_name]
+
+def _fuzzy_action(text: str, best: Tuple[str, str, float] | None) -> Optional[Action]:
+    if best is None:
+        return None
+    best_name, phrase, score = best
     if score >= 80:
         _, key = _PATTERNS[best_name]
-        arg = text.replace(_CHOICES[best_name], "", 1).strip()
+        arg = text.replace(phrase, "", 1).strip()
         if not arg:
             arg = text
         return Action(best_name, {key: arg})
-    if score >= 60:
-        return Action("repeat", {})
+    return Action("repeat", {})
+
+
+def _rule_action(text: str) -> Optional[Action]:
+    hit = _RULES.match(text)
+    if hit:
+        rule, m = hit
+        return Action(rule.name, {rule.arg: m.group(rule.group).strip()})
     return None
+
+
+def fuzzy_match(cmd: str) -> Optional[Action]:
+    text = cmd.lower().strip()
+    act = _rule_action(text)
+    if act:
+        return act
+    return _fuzzy_action(text, _CATALOGUE.best(text, 60))
+
+
+def match_many(cmds: Iterable[str]) -> List[Optional[Action]]:
+    """:func:`fuzzy_match` over many utterances, scoring the fallbacks in one batch."""
+    texts = [cmd.lower().strip() for cmd in cmds]
+    results: List[Optional[Action]] = [_rule_action(text) for text in texts]
+    pending = [i for i, act in enumerate(results) if act is None]
+    scored = _CATALOGUE.best_many([texts[i] for i in pending], 60)
+    for i, best in zip(pending, scored):
+        results[i] = _fuzzy_action(texts[i], best)
+    return results
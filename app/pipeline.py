@@ -0,0 +1,349 @@
+"""Voice pipeline: capture -> recognize -> route -> act.
+
+Capture and recognition each run on their own thread, so Kaldi decoding
+never competes with the event loop. Stages are linked by bounded queues.
+The mic ring drops the oldest audio only when recognition falls behind
+by more than its whole length. Per-stage timings and queue statistics
+make a slow stage visible as backpressure.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Tuple
+
+from app.capture import LoopHandoff, ThreadHandoff
+from app.constants import MIC_QUEUE_CHUNKS, VAD_ENABLED, WAKE_LISTEN_CHUNKS, WAKE_WORD
+from core import tracing
+
+logger = logging.getLogger(__name__)
+
+Event = Tuple[str, str]
+
+
+class StageTimer:
+    """Count, mean and max wall time of one pipeline stage."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.last_ms = ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record((time.perf_counter() - start) * 1000)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "last_ms": round(self.last_ms, 2),
+        }
+
+
+STAGES: Dict[str, StageTimer] = {
+    "recognize": StageTimer(),
+    "queue_wait": StageTimer(),
+    "route": StageTimer(),
+    "act": StageTimer(),
+}
+
+
+def capture_microphone(out: ThreadHandoff[bytes], stop: threading.Event) -> None:
+    """Read 250 ms chunks from the default input device into *out*."""
+    import pyaudio
+
+    pa = pyaudio.PyAudio()
+
+    def _open() -> Any:
+        stream = pa.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=16000,
+            input=True,
+            frames_per_buffer=8000,
+        )
+        stream.start_stream()
+        return stream
+
+    try:
+        stream = _open()
+    except Exception as e:
+        print(f"Microphone error: {e}")
+        return
+    while not stop.is_set():
+        try:
+            data = stream.read(4000, exception_on_overflow=False)
+        except OSError as exc:
+            logger.error(
+                "Mic read failed: %s. Check device index or reinitialise audio input.",
+                exc,
+            )
+            try:
+                stream.stop_stream()
+                stream.close()
+                stream = _open()
+            except Exception as exc2:
+                logger.error("Reopening mic failed: %s", exc2)
+                time.sleep(1)
+            continue
+        out.put_threadsafe(data)
+
+
+def wake_grammar(words: Iterable[str]) -> str:
+    """Vosk grammar that only knows *words*; everything else decodes as ``[unk]``."""
+    return json.dumps(sorted({w.lower() for w in words}) + ["[unk]"])
+
+
+class WakeSpotter:
+    """First stage: a grammar-restricted recognizer listening for the wake word.
+
+    Decoding against a handful of words is far cheaper than the full
+    vocabulary. The last *preroll* chunks are kept so the full recognizer
+    can be seeded with the audio that contained the wake word.
+    """
+
+    def __init__(self, recognizer: Any, words: Iterable[str], preroll: int = 6) -> None:
+        self.recognizer = recognizer
+        self.words = {w.lower() for w in words}
+        self.preroll: Deque[bytes] = deque(maxlen=preroll)
+
+    def feed(self, chunk: bytes) -> bool:
+        """Return True when *chunk* completes a wake word."""
+        self.preroll.append(chunk)
+        rec = self.recognizer
+        if rec.AcceptWaveform(chunk):
+            text = json.loads(rec.Result()).get("text", "")
+        else:
+            text = json.loads(rec.PartialResult()).get("partial", "")
+        if self.words.isdisjoint(text.lower().split()):
+            return False
+        rec.Reset()
+        return True
+
+    def drain(self) -> List[bytes]:
+        chunks = list(self.preroll)
+        self.preroll.clear()
+        return chunks
+
+
+class RecognitionWorker:
+    """Feed audio to a Vosk recognizer and turn its output into events.
+
+    Events are ``(kind, text)`` pairs. ``partial`` carries a partial
+    hypothesis and ``wake`` marks the wake word being heard. ``raw``
+    carries a final hypothesis, ``clear`` means the partial line should be
+    cleared, and ``final`` carries a command already stripped of the wake
+    word by *to_command*.
+
+    With a *spotter*, the full recognizer only runs from a wake until the
+    utterance ends or *listen_chunks* chunks pass. A wake whose utterance
+    yields no command is counted as a false wake.
+    """
+
+    def __init__(
+        self,
+        recognizer: Any,
+        to_command: Callable[[str], str | None],
+        spotter: WakeSpotter | None = None,
+        listen_chunks: int = 32,
+    ) -> None:
+        self.recognizer = recognizer
+        self.to_command = to_command
+        self.spotter = spotter
+        self.listen_chunks = listen_chunks
+        self.listening = spotter is None
+        self.awaiting = False
+        self.buffer = ""
+        self.last_part = ""
+        self.last_voice = time.monotonic()
+        self._ended = False
+        self._listened = 0
+        self.wakes = 0
+        self.false_wakes = 0
+        self.spot_chunks = 0
+        self.full_chunks = 0
+
+    def _finish(self, text: str) -> List[Event]:
+        events: List[Event] = []
+        if text:
+            events.append(("raw", text))
+            if self.last_part:
+                events.append(("clear", ""))
+        self.awaiting = False
+        self.buffer = ""
+        self.last_part = ""
+        self._ended = True
+        cmd = self.to_command(text)
+        if cmd is not None:
+            events.append(("final", cmd))
+        return events
+
+    def _decode(self, chunk: bytes) -> List[Event]:
+        rec = self.recognizer
+        if rec.AcceptWaveform(chunk):
+            res = json.loads(rec.Result())
+            return self._finish(res.get("text", "").strip())
+        part = json.loads(rec.PartialResult()).get("partial", "")
+        now = time.monotonic()
+        if part:
+            events: List[Event] = []
+            self.buffer = part
+            heard = WAKE_WORD.lower() in part.lower()
+            if heard and not self.awaiting:
+                events.append(("wake", part))
+            self.awaiting = heard or self.awaiting
+            self.last_voice = now
+            self.last_part = part
+            events.append(("partial", part))
+            return events
+        if self.awaiting and now - self.last_voice > 0.3:
+            res = json.loads(rec.FinalResult())
+            return self._finish((self.buffer + " " + res.get("text", "")).strip())
+        return []
+
+    def _listen(self, chunk: bytes) -> List[Event]:
+        self.full_chunks += 1
+        self._ended = False
+        events = self._decode(chunk)
+        if self.spotter is None:
+            return events
+        self._listened += 1
+        if not self._ended and self._listened >= self.listen_chunks:
+            res = json.loads(self.recognizer.FinalResult())
+            events += self._finish((self.buffer + " " + res.get("text", "")).strip())
+        if self._ended:
+            self.listening = False
+            if not any(kind == "final" for kind, _ in events):
+                self.false_wakes += 1
+        return events
+
+    def feed(self, chunk: bytes) -> List[Event]:
+        if self.listening:
+            return self._listen(chunk)
+        assert self.spotter is not None
+        self.spot_chunks += 1
+        if not self.spotter.feed(chunk):
+            return []
+        self.wakes += 1
+        self.listening = True
+        self._listened = 0
+        self.recognizer.Reset()
+        # Already awake: don't report the wake twice, and end the utterance
+        # on silence like any other.
+        self.awaiting = True
+        self.last_voice = time.monotonic()
+        events: List[Event] = [("wake", WAKE_WORD)]
+        for piece in self.spotter.drain():
+            if not self.listening:
+                break
+            events += self._listen(piece)
+        return events
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listening": self.listening,
+            "wakes": self.wakes,
+            "false_wakes": self.false_wakes,
+            "spot_chunks": self.spot_chunks,
+            "full_chunks": self.full_chunks,
+        }
+
+
+def _is_final(event: Event) -> bool:
+    return event[0] == "final"
+
+
+def make_vad() -> Any:
+    """Return an :class:`~app.vad.EnergyVAD`, or ``None`` if disabled or NumPy is missing."""
+    if not VAD_ENABLED:
+        return None
+    try:
+        from app.vad import EnergyVAD
+    except ImportError as exc:
+        logger.warning("Voice activity gate disabled: %s", exc)
+        return None
+    return EnergyVAD()
+
+
+class VoicePipeline:
+    """Own the capture and recognition threads and the queues between them."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        recognizer: Any,
+        to_command: Callable[[str], str | None],
+        audio_chunks: int = MIC_QUEUE_CHUNKS,
+        vad: Any = None,
+        spotter: WakeSpotter | None = None,
+    ) -> None:
+        self.vad = vad
+        self.audio: ThreadHandoff[bytes] = ThreadHandoff(audio_chunks)
+        # A lost partial is harmless; a lost final is a command never run.
+        self.events: LoopHandoff[Event] = LoopHandoff(loop, 256, keep=_is_final)
+        self.worker = RecognitionWorker(
+            recognizer, to_command, spotter, listen_chunks=WAKE_LISTEN_CHUNKS
+        )
+        self._stop = threading.Event()
+
+    def _recognize(self) -> None:
+        timer = STAGES["recognize"]
+        while not self._stop.is_set():
+            chunk = self.audio.get(timeout=0.5)
+            if chunk is None:
+                continue
+            if self.vad is None:
+                chunks = (chunk,)
+            else:
+                calibrated = self.vad.calibrated
+                chunks = self.vad.process(chunk)
+                if self.vad.calibrated and not calibrated:
+                    logger.info("VAD calibrated, noise floor %.1f", self.vad.floor)
+            for piece in chunks:
+                with timer.time():
+                    events = self.worker.feed(piece)
+                if any(kind == "wake" for kind, _ in events):
+                    # Capture of the chunk holding the wake word to its detection.
+                    tracing.record("wake", self.audio.lag_ms + timer.last_ms)
+                for event in events:
+                    self.events.put_threadsafe(event)
+
+    def start(self, capture: bool = True) -> None:
+        if capture:
+            threading.Thread(
+                target=capture_microphone, args=(self.audio, self._stop), name="capture", daemon=True
+            ).start()
+        threading.Thread(target=self._recognize, name="recognize", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "audio": self.audio.stats(),
+            "events": self.events.stats(),
+            "recognizer": self.worker.stats(),
+            **{name: timer.stats() for name, timer in STAGES.items()},
+        }
+        if self.vad is not None:
+            stats["vad"] = self.vad.stats(stats["recognize"]["mean_ms"])
+        return stats
@@ -0,0 +1,203 @@
+"""Single owner of the audio output device.
+
+Replies are queued as utterances and played strictly one at a time. Queued
+utterances start synthesizing while the current one plays. Higher-priority
+utterances jump the queue, and :meth:`PlaybackScheduler.interrupt` stops
+the device at once for barge-in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List
+
+import simpleaudio
+
+from core import tracing
+
+from .tts import Clip, load_sentence, split_sentences
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# How often a playing clip is checked for completion or interruption.
+_POLL_SECONDS = 0.02
+
+
+@dataclass(order=True)
+class _Utterance:
+    priority: int
+    seq: int
+    text: str = field(compare=False)
+    enqueued: float = field(compare=False)
+    done: "asyncio.Future[bool]" = field(compare=False)
+    clips: List["asyncio.Task[Clip]"] | None = field(default=None, compare=False)
+    trace_id: str | None = field(default=None, compare=False)
+    interrupted: bool = field(default=False, compare=False)
+
+
+class PlaybackScheduler:
+    """Bounded priority FIFO of utterances in front of one playback task."""
+
+    def __init__(
+        self,
+        maxsize: int = 8,
+        prefetch: int = 2,
+        load: Callable[[str], Awaitable[Clip]] = load_sentence,
+    ) -> None:
+        self.maxsize = maxsize
+        self.prefetch = prefetch
+        self._load = load
+        self._heap: List[_Utterance] = []
+        self._seq = itertools.count()
+        self._wake: asyncio.Event | None = None
+        self._synth: asyncio.Semaphore | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._current: _Utterance | None = None
+        self._play_obj: Any = None
+        self.played = 0
+        self.dropped = 0
+        self.interrupted = 0
+        self._ttfa_ms: Deque[float] = deque(maxlen=100)
+
+    # -- producer side -------------------------------------------------------
+
+    def submit(self, text: str, priority: int = PRIORITY_NORMAL) -> "asyncio.Future[bool]":
+        """Queue *text*; the future resolves to True once it has fully played."""
+        loop = asyncio.get_running_loop()
+        if self._wake is None:
+            self._wake = asyncio.Event()
+            self._synth = asyncio.Semaphore(self.prefetch)
+        item = _Utterance(priority, next(self._seq), text, time.monotonic(), loop.create_future())
+        item.trace_id = tracing.current()
+        if len(self._heap) >= self.maxsize:
+            worst = max(self._heap)
+            if item < worst:
+                self._heap.remove(worst)
+                heapq.heapify(self._heap)
+                self._discard(worst)
+            else:
+                self._discard(item)
+                return item.done
+        heapq.heappush(self._heap, item)
+        self._prefetch()
+        self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        return item.done
+
+    def interrupt(self, clear: bool = True) -> None:
+        """Stop playback immediately (barge-in) and optionally drop the queue."""
+        if self._play_obj is not None:
+            self._play_obj.stop()
+        if self._current is not None:
+            self._current.interrupted = True
+            self._cancel_clips(self._current)
+            self.interrupted += 1
+        if clear:
+            while self._heap:
+                item = heapq.heappop(self._heap)
+                item.interrupted = True
+                self._discard(item)
+                self.interrupted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        ttfa = list(self._ttfa_ms)
+        return {
+            "queued": len(self._heap),
+            "playing": self._current is not None,
+            "played": self.played,
+            "dropped": self.dropped,
+            "interrupted": self.interrupted,
+            "ttfa_ms_last": round(ttfa[-1], 1) if ttfa else None,
+            "ttfa_ms_avg": round(sum(ttfa) / len(ttfa), 1) if ttfa else None,
+        }
+
+    # -- internals ------------------------------------------------------------
+
+    def _discard(self, item: _Utterance) -> None:
+        self._cancel_clips(item)
+        if not item.done.done():
+            item.done.set_result(False)
+        if not item.interrupted:
+            self.dropped += 1
+
+    @staticmethod
+    def _cancel_clips(item: _Utterance) -> None:
+        for task in item.clips or []:
+            task.cancel()
+
+    async def _bounded_load(self, sentence: str, trace_id: str | None) -> Clip:
+        assert self._synth is not None
+        tracing.set_command(trace_id)
+        async with self._synth:
+            return await self._load(sentence)
+
+    def _start(self, item: _Utterance) -> None:
+        if item.clips is None:
+            item.clips = [
+                asyncio.ensure_future(self._bounded_load(s, item.trace_id))
+                for s in split_sentences(item.text)
+            ]
+
+    def _prefetch(self) -> None:
+        for item in heapq.nsmallest(self.prefetch, self._heap):
+            self._start(item)
+
+    async def _play(self, clip: Clip, item: _Utterance) -> None:
+        play = simpleaudio.play_buffer(
+            clip.samples, clip.nchannels, clip.sample_width, clip.sample_rate
+        )
+        self._play_obj = play
+        try:
+            # Poll rather than park an executor thread in wait_done().
+            while play.is_playing() and not item.interrupted:
+                await asyncio.sleep(_POLL_SECONDS)
+        finally:
+            self._play_obj = None
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            while not self._heap:
+                self._wake.clear()
+                await self._wake.wait()
+            item = heapq.heappop(self._heap)
+            self._current = item
+            self._start(item)
+            self._prefetch()
+            try:
+                for i, task in enumerate(item.clips or []):
+                    if item.interrupted:
+                        break
+                    clip = await task
+                    if i == 0:
+                        ttfa = (time.monotonic() - item.enqueued) * 1000
+                        self._ttfa_ms.append(ttfa)
+                        tracing.set_command(item.trace_id)
+                        tracing.record("first_audio", ttfa)
+                    await self._play(clip, item)
+                if not item.done.done():
+                    item.done.set_result(not item.interrupted)
+                if not item.interrupted:
+                    self.played += 1
+            except asyncio.CancelledError:
+                if not item.interrupted:
+                    raise
+                if not item.done.done():
+                    item.done.set_result(False)
+            except Exception as exc:
+                logger.error("playback failed: %s", exc)
+                if not item.done.done():
+                    item.done.set_result(False)
+            finally:
+                self._current = None
@@ -1,58 +1,301 @@
+"""Replay and load harness for the routing pipeline.
+
+A scenario file lists utterances together with the tool the LLM should pick.
+Each utterance goes through the same stages as
+:func:`app.assistant.handle_text_async`: the rule match, the LLM route
+(served by :class:`FakeLLM`), argument validation and the tool, which runs
+on the shared :class:`core.executor.ToolExecutor`. Every stage is timed.
+Tools are replaced by a recorder unless ``execute`` is set, so a run has no
+side effects.
+
+Scenario formats:
+
+* CSV: ``utterance,tool[,arguments_json]``
+* JSONL: ``{"utterance": ..., "tool": ..., "arguments": {...}}``. Use
+  ``"tool": null`` with ``"content"`` for a chat reply.
+
+Example::
+
+    python -m app.scenarios tests/intents.csv -n 1000 -c 32 --llm-latency 300 --llm-jitter 80
+"""
+
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import csv
 import argparse
+import json
+import math
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
 
 from core.intent_router import IntentRouter
+from core.route_cache import RouteCache
 from core.transcript import Transcript
-from core.tools import _REGISTRY
+from core.executor import default_executor
+
+STAGE_NAMES = ("rules", "route", "validate", "tool")
+
+
+_validate_ms: contextvars.ContextVar[float] = contextvars.ContextVar("validate_ms", default=0.0)
 
 
 class FakeLLM(IntentRouter):
-    def __init__(self, responses: dict[str, dict]):
+    """Router whose chat completions come from a dict, after an optional simulated delay.
+
+    Time spent validating tool arguments is added to ``_validate_ms`` so
+    :func:`replay` can report it apart from routing.
+    """
+
+    def __init__(
+        self,
+        responses: dict[str, dict],
+        latency: Callable[[], float] | None = None,
+    ):
         super().__init__()
+        # The canned replies are whole completions, never an SSE stream.
+        self.stream = False
         self.responses = responses
+        self.latency = latency
 
     def _post(self, payload):  # type: ignore[override]
+        if self.latency is not None:
+            time.sleep(self.latency())
         text = payload["messages"][-1]["content"]
         return self.responses[text]
 
+    async def _apost(self, payload):  # type: ignore[override]
+        if self.latency is not None:
+            await asyncio.sleep(self.latency())
+        text = payload["messages"][-1]["content"]
+        return self.responses[text]
+
+    def _validate(self, name, args):  # type: ignore[override]
+        start = time.perf_counter()
+        try:
+            super()._validate(name, args)
+        finally:
+            _validate_ms.set(_validate_ms.get() + (time.perf_counter() - start) * 1000)
+
 
-def run_file(path: str) -> None:
-    responses = {}
-    with open("tests/intents.csv", newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for utterance, tool in reader:
-            responses[utterance] = {
-                "choices": [
-                    {
-                        "finish_reason": "tool_calls",
-                        "message": {
-                            "tool_calls": [
-                                {
-                                    "function": {
-                                        "name": tool,
-                                        "arguments": "{}",
-                                    }
-                                }
-                            ]
-                        },
-                    }
-                ]
+def completion(tool: str | None, arguments: Dict[str, Any] | None = None, content: str = "") -> dict:
+    """Chat-completion body choosing *tool* (or replying with *content*)."""
+    if tool is None:
+        return {"choices": [{"finish_reason": "stop", "message": {"content": content}}]}
+    return {
+        "choices": [
+            {
+                "finish_reason": "tool_calls",
+                "message": {
+                    "tool_calls": [
+                        {
+                            "function": {
+                                "name": tool,
+                                "arguments": json.dumps(arguments or {}),
+                            }
+                        }
+                    ]
+                },
             }
+        ]
+    }
+
+
+Scenario = Tuple[str, str | None, Dict[str, Any], str]
+
+
+def load_scenarios(path: str) -> List[Scenario]:
+    """Read ``(utterance, tool, arguments, content)`` rows from a CSV or JSONL file."""
+    rows: List[Scenario] = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if not line.strip():
+                    continue
+                obj = json.loads(line)
+                rows.append(
+                    (obj["utterance"], obj.get("tool"), obj.get("arguments") or {}, obj.get("content", ""))
+                )
+        else:
+            for row in csv.reader(f):
+                if not row or row[0].startswith("#"):
+                    continue
+                args = json.loads(row[2]) if len(row) > 2 and row[2] else {}
+                rows.append((row[0], row[1] or None, args, ""))
+    return rows
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of *values* (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(max(samples), 2) if samples else 0.0,
+    }
+
+
+class DryRun:
+    """Stand-in for the tool registry that records calls instead of making them."""
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+
+    def __call__(self, name: str, args: Dict[str, Any]) -> Tuple[bool, str]:
+        self.calls.append((name, dict(args)))
+        return True, f"[dry-run] {name}"
+
+
+def _failures(executor: Any) -> int:
+    return sum(s["errors"] + s["timeouts"] for s in executor.stats().values())
+
+
+def _latency(mean_ms: float, jitter_ms: float, seed: int) -> Callable[[], float] | None:
+    if mean_ms <= 0 and jitter_ms <= 0:
+        return None
+    rng = random.Random(seed)
+    return lambda: max(0.0, rng.gauss(mean_ms, jitter_ms)) / 1000
+
+
+async def replay(
+    scenarios: List[Scenario],
+    n: int | None = None,
+    concurrency: int = 1,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    execute: bool = False,
+    cache: bool = False,
+    transcript: Transcript | None = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Run *n* utterances (cycling through *scenarios*) and return timing statistics."""
+    from app.assistant import _resolve_route, _resolve_rules
+
+    responses = {u: completion(tool, args, content) for u, tool, args, content in scenarios}
+    expected = {u: tool for u, tool, _, _ in scenarios}
+    router = FakeLLM(responses, _latency(latency_ms, jitter_ms, seed))
+    if not cache:
+        router.cache = RouteCache(0)
+    recorder = DryRun()
+    executor = default_executor()
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGE_NAMES}
+    total: List[float] = []
+    counts = {"rule_hits": 0, "llm_routes": 0, "mismatches": 0, "errors": 0}
+    sem = asyncio.Semaphore(max(1, concurrency))
+    total_n = len(scenarios) if n is None else n
+
+    async def one(utterance: str) -> None:
+        async with sem:
+            start = time.perf_counter()
+            if transcript is not None:
+                transcript.log("USER", utterance)
+            reply, act = _resolve_rules(utterance)
+            t_rules = time.perf_counter()
+            samples["rules"].append((t_rules - start) * 1000)
+            routed: str | None = act.name if act else None
+            if reply is None and act is None:
+                counts["llm_routes"] += 1
+                _validate_ms.set(0.0)
+                name, args_route, _ = await router.aroute(utterance)
+                route_ms = (time.perf_counter() - t_rules) * 1000
+                validate_ms = _validate_ms.get()
+                samples["route"].append(route_ms - validate_ms)
+                samples["validate"].append(validate_ms)
+                routed = name
+                reply, act = _resolve_route(name, args_route)
+            else:
+                counts["rule_hits"] += 1
+            if routed != expected[utterance]:
+                counts["mismatches"] += 1
+            if act:
+                t_tool = time.perf_counter()
+                if execute:
+                    ok, reply = await executor.run(act.name, act.args)
+                else:
+                    ok, reply = recorder(act.name, act.args)
+                samples["tool"].append((time.perf_counter() - t_tool) * 1000)
+            if transcript is not None and reply is not None:
+                transcript.log("BOT", reply)
+            total.append((time.perf_counter() - start) * 1000)
+
+    utterances = [scenarios[i % len(scenarios)][0] for i in range(total_n)]
+    # A tool that reports failure ran fine; only exceptions and timeouts are errors.
+    failed_before = _failures(executor)
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(u) for u in utterances))
+        wall = time.perf_counter() - started
+        counts["errors"] = _failures(executor) - failed_before
+    finally:
+        await router.aclose()
+    return {
+        "utterances": total_n,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(total_n / wall, 1) if wall else 0.0,
+        **counts,
+        "stages": {stage: summarize(samples[stage]) for stage in STAGE_NAMES},
+        "total": summarize(total),
+        "tool_calls": recorder.calls,
+    }
+
+
+def run_file(path: str, **options: Any) -> Dict[str, Any]:
+    """Replay the scenario file at *path*; see :func:`replay` for *options*."""
+    return asyncio.run(replay(load_scenarios(path), **options))
+
 
-    router = FakeLLM(responses)
-    transcript = Transcript(True)
-    for utterance in responses:
-        transcript.log("USER", utterance)
-        name, args, _ = router.route(utterance)
-        fn = _REGISTRY[name]["callable"]
-        ok, msg = fn(**args)
-        transcript.log("BOT", msg)
+def _report(result: Dict[str, Any]) -> None:
+    print(
+        f"{result['utterances']} utterances, concurrency {result['concurrency']}: "
+        f"{result['wall_s']} s, {result['throughput_per_s']}/s "
+        f"(rules {result['rule_hits']}, llm {result['llm_routes']}, "
+        f"mismatches {result['mismatches']}, errors {result['errors']})"
+    )
+    print(f"{'stage':10s} {'count':>6s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'max':>9s}")
+    for stage, s in [*result["stages"].items(), ("total", result["total"])]:
+        print(
+            f"{stage:10s} {s['count']:6d} {s['p50_ms']:9.2f} {s['p95_ms']:9.2f} "
+            f"{s['p99_ms']:9.2f} {s['max_ms']:9.2f}"
+        )
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("path", nargs="?", default="tests/intents.csv")
+    parser.add_argument("-n", type=int, default=None, help="utterances to run (default: one pass)")
+    parser.add_argument("-c", "--concurrency", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="mean simulated LLM latency in ms")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="std-dev of the simulated latency in ms")
+    parser.add_argument("--execute", action="store_true", help="really run the tools")
+    parser.add_argument("--cache", action="store_true", help="keep the router's decision cache on")
+    parser.add_argument("--transcript", action="store_true", help="log the conversation")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    parser.add_argument("--seed", type=int, default=0)
     args = parser.parse_args()
-    run_file(args.path)
+    result = run_file(
+        args.path,
+        n=args.n,
+        concurrency=args.concurrency,
+        latency_ms=args.llm_latency,
+        jitter_ms=args.llm_jitter,
+        execute=args.execute,
+        cache=args.cache,
+        transcript=Transcript(True) if args.transcript else None,
+        seed=args.seed,
+    )
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _report(result)
@@ -0,0 +1,144 @@
+"""Speculative routing on partial recognition results.
+
+A user says "Kyra, open github dot com" over a second or more. The
+recognizer's partial hypotheses usually settle on the full command a few
+hundred milliseconds before it declares the utterance final. Once the same
+command has been the partial for ``stable`` chunks in a row,
+:class:`Speculator` starts planning it in the background. Planning is the
+rule match and the LLM route. When a *synthesize* hook is given, a
+predicted spoken reply is handed to it once routing is done. The hook
+starts synthesis in the background and the plan does not wait for it.
+When the final transcript matches, that plan is handed to the act stage.
+Otherwise it is cancelled.
+
+A plan only decides what to do. Tools never run until the final text is
+committed, so a misheard partial cannot cause a side effect.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from core import tracing
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_command(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class _Speculation:
+    __slots__ = ("key", "task", "started", "done", "final")
+
+    task: "asyncio.Task[Any]"
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.started = time.perf_counter()
+        self.done: float | None = None
+        self.final: float | None = None
+
+
+class Speculator:
+    """Plan commands from stable partials; commit or cancel when the final arrives.
+
+    Must be used from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        plan: Callable[[str], Awaitable[Any]],
+        stable: int = 2,
+        min_words: int = 2,
+        synthesize: Callable[[str], None] | None = None,
+    ) -> None:
+        self.plan = plan
+        self.stable = stable
+        self.min_words = min_words
+        self.synthesize = synthesize
+        self._current: _Speculation | None = None
+        self._last = ""
+        self._streak = 0
+        self.launched = 0
+        self.committed = 0
+        self.cancelled = 0
+        self.finals = 0
+        self.saved_ms = 0.0
+
+    def observe(self, command: str) -> None:
+        """Note a partial *command* (wake word already stripped)."""
+        key = normalize_command(command)
+        if len(key.split()) < self.min_words:
+            self._last, self._streak = "", 0
+            return
+        if key == self._last:
+            self._streak += 1
+        else:
+            self._last, self._streak = key, 1
+        if self._streak < self.stable or (self._current and self._current.key == key):
+            return
+        self._cancel()
+        spec = _Speculation(key)
+        spec.task = asyncio.ensure_future(self._run(spec))
+        self._current = spec
+        self.launched += 1
+
+    async def _run(self, spec: _Speculation) -> Any:
+        plan = await self.plan(spec.key)
+        spec.done = time.perf_counter()
+        reply = plan[0] if isinstance(plan, tuple) else None
+        if self.synthesize is not None and reply:
+            try:
+                self.synthesize(reply)
+            except Exception as exc:
+                logger.info("speculative synthesis failed: %s", exc)
+        return plan
+
+    def _cancel(self) -> None:
+        if self._current is not None:
+            self._current.task.cancel()
+            self.cancelled += 1
+            self._current = None
+
+    def reset(self) -> None:
+        """Drop any speculation, e.g. when a new utterance starts."""
+        self._cancel()
+        self._last, self._streak = "", 0
+
+    def take(self, command: str) -> "asyncio.Task[Any] | None":
+        """Commit the speculation if it planned *command*; return a task yielding its plan."""
+        self.finals += 1
+        spec, self._current = self._current, None
+        self._last, self._streak = "", 0
+        if spec is None:
+            return None
+        if spec.key != normalize_command(command):
+            spec.task.cancel()
+            self.cancelled += 1
+            return None
+        spec.final = time.perf_counter()
+        self.committed += 1
+        return asyncio.ensure_future(self._commit(spec))
+
+    async def _commit(self, spec: _Speculation) -> Any:
+        plan = await spec.task
+        assert spec.final is not None and spec.done is not None
+        # Planning time that overlapped speech is time the act stage no longer waits.
+        saved = (min(spec.done, spec.final) - spec.started) * 1000
+        self.saved_ms += saved
+        tracing.record("speculation_saved", saved)
+        return plan
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "launched": self.launched,
+            "committed": self.committed,
+            "cancelled": self.cancelled,
+            "finals": self.finals,
+            "hit_rate": self.committed / self.finals if self.finals else 0.0,
+            "saved_ms_avg": round(self.saved_ms / self.committed, 2) if self.committed else 0.0,
+        }
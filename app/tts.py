@@ -1,38 +1,162 @@
 from __future__ import annotations
 
 import asyncio
-import hashlib
+import atexit
 import logging
+import re
 from pathlib import Path
+from collections import OrderedDict
+from typing import Iterable, List
 
 from edge_tts import Communicate
-import miniaudio
 import simpleaudio
 
-from .config import VOICE_NAME, VOICE_RATE, AUDIO_CACHE
+from core import tracing
+
+from .config import (
+    VOICE_NAME,
+    VOICE_RATE,
+    AUDIO_CACHE,
+    AUDIO_CACHE_MAX_BYTES,
+    AUDIO_CACHE_PCM,
+)
+from .voice_cache import Clip, VoiceCache, decode_mp3
 
 logger = logging.getLogger(__name__)
 
 _CACHE = Path(AUDIO_CACHE)
-_CACHE.mkdir(exist_ok=True)
 
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+# Sentences synthesized ahead of the one currently playing.
+_PREFETCH = 2
 
-async def speak(text: str) -> None:
-    """Synthesize *text* with Edge TTS and play it back."""
-    text = (text or "").strip()
-    if not text:
+_VOICE_CACHE: VoiceCache | None = None
+# Clips synthesized ahead of a reply that may never be spoken; memory only.
+_WARM: "OrderedDict[str, asyncio.Future[Clip]]" = OrderedDict()
+_WARM_MAX = 4
+
+
+def voice_cache() -> VoiceCache:
+    global _VOICE_CACHE
+    if _VOICE_CACHE is None:
+        _VOICE_CACHE = VoiceCache(_CACHE, AUDIO_CACHE_MAX_BYTES, AUDIO_CACHE_PCM)
+        atexit.register(_VOICE_CACHE.close)
+    return _VOICE_CACHE
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split *text* at sentence punctuation, dropping empty pieces."""
+    return [s.strip() for s in _SENTENCE_RE.split(text.strip()) if s.strip()]
+
+
+async def _synth_mp3(text: str) -> bytes:
+    """Collect Edge TTS audio chunks in memory as they arrive."""
+    comm = Communicate(text, VOICE_NAME, rate=VOICE_RATE)
+    chunks: List[bytes] = []
+    async for chunk in comm.stream():
+        if chunk.get("type") == "audio":
+            chunks.append(chunk["data"])
+    return b"".join(chunks)
+
+
+async def _synthesize(text: str) -> Clip:
+    loop = asyncio.get_running_loop()
+    with tracing.span("tts_synth"):
+        mp3 = await _synth_mp3(text)
+        return await loop.run_in_executor(None, decode_mp3, mp3)
+
+
+def warm(text: str) -> None:
+    """Start synthesizing the first sentence of a predicted reply, kept in memory only.
+
+    Unlike :func:`prewarm` nothing is written to the voice cache, so a
+    speculative reply that is never spoken leaves no trace on disk.
+    """
+    sentences = split_sentences(text or "")
+    if not sentences or sentences[0] in _WARM:
         return
-    h = hashlib.sha1(text.encode("utf-8")).hexdigest()
-    mp3 = _CACHE / f"{h}.mp3"
-    if not mp3.exists():
-        logger.info("TTS synth %s", mp3)
-        comm = Communicate(text, VOICE_NAME, rate=VOICE_RATE)
-        await comm.save(str(mp3))
-    logger.info("TTS play %s", mp3)
-    data = miniaudio.decode_file(str(mp3))
-    samples = data.samples.tobytes() if hasattr(data.samples, "tobytes") else data.samples
+    fut = asyncio.ensure_future(_synthesize(sentences[0]))
+    fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _WARM[sentences[0]] = fut
+    while len(_WARM) > _WARM_MAX:
+        _WARM.popitem(last=False)[1].cancel()
+
+
+async def load_sentence(text: str) -> Clip:
+    """Return decoded audio for one sentence, from cache or freshly synthesized."""
+    warmed = _WARM.pop(text, None)
+    if warmed is not None:
+        try:
+            return await warmed
+        except Exception as exc:
+            logger.info("TTS warm-up for %r failed: %s", text, exc)
+    loop = asyncio.get_running_loop()
+    cache = voice_cache()
+    clip = await loop.run_in_executor(None, cache.load, text)
+    if clip is not None:
+        logger.info("TTS cache hit %r", text)
+        return clip
+    logger.info("TTS synth %r", text)
+    with tracing.span("tts_synth"):
+        mp3 = await _synth_mp3(text)
+        clip = await loop.run_in_executor(None, decode_mp3, mp3)
+    if mp3:
+        # Populate the disk cache without delaying playback.
+        loop.run_in_executor(None, cache.store, text, mp3, clip)
+    return clip
+
+
+async def prewarm(phrases: Iterable[str]) -> int:
+    """Synthesize and cache fixed *phrases* ahead of use; return how many were new."""
+    cache = voice_cache()
+    loop = asyncio.get_running_loop()
+    added = 0
+    for phrase in phrases:
+        for sentence in split_sentences(phrase):
+            if sentence in cache:
+                continue
+            try:
+                mp3 = await _synth_mp3(sentence)
+            except Exception as exc:  # network down: warm up next time
+                logger.warning("TTS prewarm failed: %s", exc)
+                return added
+            if not mp3:
+                continue
+            clip = await loop.run_in_executor(None, decode_mp3, mp3)
+            await loop.run_in_executor(None, cache.store, sentence, mp3, clip)
+            added += 1
+    return added
+
+
+async def _play(clip: Clip) -> None:
     play = simpleaudio.play_buffer(
-        samples, data.nchannels, data.sample_width, data.sample_rate
+        clip.samples, clip.nchannels, clip.sample_width, clip.sample_rate
     )
     loop = asyncio.get_running_loop()
     await loop.run_in_executor(None, play.wait_done)
+
+
+async def speak(text: str) -> None:
+    """Synthesize *text* with Edge TTS and play it back sentence by sentence.
+
+    The first sentence starts playing as soon as it is decoded, while the
+    following ones are still being synthesized.
+    """
+    sentences = split_sentences(text or "")
+    if not sentences:
+        return
+    sem = asyncio.Semaphore(_PREFETCH)
+
+    async def _bounded(sentence: str) -> Clip:
+        async with sem:
+            return await load_sentence(sentence)
+
+    tasks = [asyncio.create_task(_bounded(s)) for s in sentences]
+    try:
+        for task in tasks:
+            clip = await task
+            logger.info("TTS play %d bytes", len(clip.samples))
+            await _play(clip)
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,111 @@
+"""Energy-based voice activity gate in front of the recognizer.
+
+Each 250 ms int16 chunk is reduced to its RMS and zero-crossing rate with
+a couple of vectorized NumPy operations. While the room is quiet, the
+noise floor follows the background level. A chunk counts as speech when
+its energy is well above that floor. A hangover keeps the gate open for a
+while after speech stops, so the recognizer still sees the trailing
+silence it needs to end an utterance. The most recent silent chunk is
+held back as pre-roll so word onsets are not clipped.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+class EnergyVAD:
+    """Decide per chunk whether audio should reach the recognizer."""
+
+    def __init__(
+        self,
+        ratio: float = 3.0,
+        min_rms: float = 120.0,
+        zcr_max: float = 0.35,
+        hangover: int = 4,
+        calibrate: int = 8,
+        adapt: float = 0.05,
+    ) -> None:
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.zcr_max = zcr_max
+        self.hangover = hangover
+        self.calibrate = calibrate
+        self.adapt = adapt
+        self.floor: float | None = None
+        self._calib: List[float] = []
+        self._hold = 0
+        self._preroll: bytes | None = None
+        self.chunks = 0
+        self.skipped = 0
+        self.cost_s = 0.0
+
+    @staticmethod
+    def measure(chunk: bytes) -> tuple[float, float]:
+        """Return ``(rms, zero_crossing_rate)`` of little-endian int16 *chunk*."""
+        frames = np.frombuffer(chunk, dtype="<i2")
+        if frames.size < 2:
+            return 0.0, 0.0
+        x = frames.astype(np.float32)
+        rms = float(np.sqrt(np.mean(x * x)))
+        zcr = float(np.count_nonzero(np.signbit(x[1:]) != np.signbit(x[:-1]))) / (x.size - 1)
+        return rms, zcr
+
+    @property
+    def calibrated(self) -> bool:
+        return self.floor is not None
+
+    def _is_speech(self, rms: float, zcr: float) -> bool:
+        assert self.floor is not None
+        threshold = max(self.floor * self.ratio, self.min_rms)
+        if rms < threshold:
+            return False
+        # Broadband hiss crosses zero constantly; only accept it when loud.
+        return zcr <= self.zcr_max or rms >= 2 * threshold
+
+    def process(self, chunk: bytes) -> List[bytes]:
+        """Return the chunks to forward for *chunk*: none, it, or pre-roll plus it."""
+        start = time.perf_counter()
+        self.chunks += 1
+        rms, zcr = self.measure(chunk)
+        if self.floor is None:
+            # Pass audio through while learning the room's noise floor.
+            self._calib.append(rms)
+            if len(self._calib) >= self.calibrate:
+                self.floor = float(np.median(self._calib))
+            self.cost_s += time.perf_counter() - start
+            return [chunk]
+        out: List[bytes]
+        if self._is_speech(rms, zcr):
+            out = [chunk]
+            if self._preroll is not None:
+                out.insert(0, self._preroll)
+                self._preroll = None
+                self.skipped -= 1
+            self._hold = self.hangover
+        elif self._hold > 0:
+            self._hold -= 1
+            out = [chunk]
+        else:
+            self.floor += self.adapt * (rms - self.floor)
+            self._preroll = chunk
+            self.skipped += 1
+            out = []
+        self.cost_s += time.perf_counter() - start
+        return out
+
+    def stats(self, decode_ms: float = 0.0) -> Dict[str, Any]:
+        """Skip rate and CPU saved, given the mean recognizer cost per chunk."""
+        saved = self.skipped * decode_ms - self.cost_s * 1000
+        return {
+            "calibrated": self.calibrated,
+            "noise_floor": round(self.floor, 1) if self.floor is not None else None,
+            "chunks": self.chunks,
+            "skipped": self.skipped,
+            "skipped_pct": round(100 * self.skipped / self.chunks, 1) if self.chunks else 0.0,
+            "vad_ms": round(self.cost_s * 1000, 1),
+            "cpu_saved_ms": round(saved, 1),
+        }
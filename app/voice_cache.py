@@ -0,0 +1,226 @@
+"""Size-bounded on-disk cache of synthesized speech.
+
+Each entry is stored either as the MP3 Edge TTS produced or, with
+``store_pcm``, as raw decoded PCM. PCM hits are memory-mapped and handed
+to the player without any decode. ``index.json`` records the size, last
+use, hit count and audio format of every entry. Least recently used
+entries are evicted once the cache exceeds its byte budget. Hits update
+the index in memory. It is written every ``save_every`` hits and on
+:meth:`VoiceCache.close`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict
+
+import miniaudio
+
+logger = logging.getLogger(__name__)
+
+_INDEX = "index.json"
+
+
+@dataclass
+class Clip:
+    """Decoded PCM ready for ``simpleaudio.play_buffer``."""
+
+    samples: Any
+    nchannels: int
+    sample_width: int
+    sample_rate: int
+
+
+def decode_mp3(mp3: bytes) -> Clip:
+    data = miniaudio.decode(mp3)
+    samples = data.samples.tobytes() if hasattr(data.samples, "tobytes") else data.samples
+    return Clip(samples, data.nchannels, data.sample_width, data.sample_rate)
+
+
+def cache_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class VoiceCache:
+    def __init__(
+        self, root: Path, max_bytes: int, store_pcm: bool = True, save_every: int = 16
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.store_pcm = store_pcm
+        self.save_every = save_every
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._unsaved_hits = 0
+        # Maps handed out for PCM hits; closed on close() if still alive.
+        self._maps: "weakref.WeakSet[mmap.mmap]" = weakref.WeakSet()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+
+    # -- index --------------------------------------------------------------
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.root / _INDEX, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        # Adopt MP3s written before the index existed so they count
+        # against the budget and can be evicted.
+        for path in self.root.glob("*.mp3"):
+            if path.stem not in index:
+                st = path.stat()
+                index[path.stem] = {
+                    "file": path.name,
+                    "format": "mp3",
+                    "bytes": st.st_size,
+                    "last_use": st.st_mtime,
+                    "hits": 0,
+                }
+        index = {k: v for k, v in index.items() if (self.root / v["file"]).exists()}
+        # PCM files whose unlink failed while memory-mapped (Windows) are
+        # orphans without format metadata; drop them now.
+        known = {v["file"] for v in index.values()}
+        for path in self.root.glob("*.pcm"):
+            if path.name not in known:
+                self._unlink(path.name)
+        return index
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._index)
+            self._dirty = False
+            self._unsaved_hits = 0
+        tmp = self.root / (_INDEX + ".tmp")
+        try:
+            tmp.write_text(data, encoding="utf-8")
+            tmp.replace(self.root / _INDEX)
+        except OSError as exc:  # pragma: no cover - disk full, permissions
+            logger.warning("voice cache index not saved: %s", exc)
+
+    # -- entries ------------------------------------------------------------
+
+    def __contains__(self, text: str) -> bool:
+        return cache_key(text) in self._index
+
+    def load(self, text: str) -> Clip | None:
+        """Return a playable clip for *text*, or ``None`` on a miss."""
+        key = cache_key(text)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry["last_use"] = time.time()
+            entry["hits"] += 1
+            self.hits += 1
+            self._dirty = True
+            self._unsaved_hits += 1
+            flush = self._unsaved_hits >= self.save_every
+            entry = dict(entry)
+        if flush:
+            self.save()
+        path = self.root / entry["file"]
+        try:
+            if entry["format"] == "pcm":
+                with open(path, "rb") as f:
+                    samples = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                with self._lock:
+                    self._maps.add(samples)
+                return Clip(
+                    samples, entry["nchannels"], entry["sample_width"], entry["sample_rate"]
+                )
+            return decode_mp3(path.read_bytes())
+        except (OSError, ValueError):
+            with self._lock:
+                self._index.pop(key, None)
+            return None
+
+    def store(self, text: str, mp3: bytes, decoded: Clip | None = None) -> None:
+        """Add *text* to the cache, as PCM when enabled and *decoded* is given."""
+        key = cache_key(text)
+        if self.store_pcm and decoded is not None:
+            data = bytes(decoded.samples)
+            entry = {
+                "file": f"{key}.pcm",
+                "format": "pcm",
+                "nchannels": decoded.nchannels,
+                "sample_width": decoded.sample_width,
+                "sample_rate": decoded.sample_rate,
+            }
+        else:
+            data = mp3
+            entry = {"file": f"{key}.mp3", "format": "mp3"}
+        if not data:
+            return
+        path = self.root / entry["file"]
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        except OSError as exc:  # pragma: no cover - disk full, permissions
+            logger.warning("voice cache write failed: %s", exc)
+            return
+        entry.update(bytes=len(data), last_use=time.time(), hits=0)
+        with self._lock:
+            old = self._index.get(key)
+            if old and old["file"] != entry["file"]:
+                self._unlink(old["file"])
+            self._index[key] = entry
+            self._evict()
+            self._dirty = True
+        self.save()
+
+    def _unlink(self, name: str) -> None:
+        try:
+            os.remove(self.root / name)
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        total = sum(e["bytes"] for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]["last_use"]):
+            if total <= self.max_bytes:
+                break
+            self._unlink(entry["file"])
+            del self._index[key]
+            total -= entry["bytes"]
+            self.evictions += 1
+
+    def close(self) -> None:
+        """Write the index and close the memory maps of PCM hits."""
+        self.save()
+        with self._lock:
+            maps = list(self._maps)
+            self._maps.clear()
+        for m in maps:
+            try:
+                m.close()
+            except BufferError:  # still being played
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": sum(e["bytes"] for e in self._index.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,246 @@
+"""Resolve a music query to a YouTube watch URL for :func:`play_music`.
+
+The search results page is several hundred kilobytes, and the first
+``/watch?v=`` link usually appears early. The resolver therefore streams
+the response and stops reading at the first video ID. IDs are cached per
+query with a TTL, in a JSON file so they survive restarts, and requests go
+through one pooled keep-alive session. When no ID arrives before the
+deadline the search page itself is returned, so the browser opens without
+further waiting.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from .config import YOUTUBE_CACHE, YOUTUBE_CACHE_TTL, YOUTUBE_DEADLINE
+
+logger = logging.getLogger(__name__)
+
+SEARCH_URL = "https://www.youtube.com/results?search_query={}"
+WATCH_URL = "https://www.youtube.com/watch?v={}"
+
+_WATCH_RE = re.compile(rb"/watch\?v=([\w-]{11})")
+# Bytes kept from the previous chunk so an ID split across chunks still matches.
+_OVERLAP = 24
+_HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Language": "en"}
+# Guards lazy creation of the shared resolver and its HTTP session.
+_INIT_LOCK = threading.Lock()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def search_url(query: str) -> str:
+    return SEARCH_URL.format(urllib.parse.quote_plus(query))
+
+
+class VideoIdCache:
+    """LRU map of normalized query to video ID, optionally persisted as JSON."""
+
+    def __init__(self, max_size: int = 512, ttl: float = YOUTUBE_CACHE_TTL, path: str | None = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def get(self, query: str) -> str | None:
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored, video_id = entry
+            if self.ttl and time.time() - stored > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return video_id
+
+    def put(self, query: str, video_id: str) -> None:
+        with self._lock:
+            key = normalize_query(query)
+            self._data[key] = (time.time(), video_id)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+            if self.path:
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:  # type: ignore[arg-type]
+                rows = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            logger.warning("youtube cache unreadable: %s", exc)
+            return
+        now = time.time()
+        skipped = 0
+        for row in rows[-self.max_size :] if isinstance(rows, list) else ():
+            try:
+                key, stored, video_id = row
+                if not isinstance(key, str) or not isinstance(video_id, str):
+                    raise TypeError(row)
+                if not self.ttl or now - float(stored) <= self.ttl:
+                    self._data[key] = (float(stored), video_id)
+            except (TypeError, ValueError):
+                skipped += 1
+        if skipped:
+            logger.warning("youtube cache: skipped %d bad rows", skipped)
+
+    def _save(self) -> None:
+        rows = [[key, stored, video_id] for key, (stored, video_id) in self._data.items()]
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rows, f)
+            os.replace(tmp, self.path)  # type: ignore[arg-type]
+        except OSError as exc:
+            logger.warning("youtube cache not saved: %s", exc)
+
+
+class YouTubeResolver:
+    """Streams YouTube search pages through a pooled session, caching video IDs."""
+
+    def __init__(
+        self,
+        cache: VideoIdCache | None = None,
+        deadline: float = YOUTUBE_DEADLINE,
+        chunk_size: int = 16 * 1024,
+    ) -> None:
+        self.cache = cache if cache is not None else VideoIdCache()
+        self.deadline = deadline
+        self.chunk_size = chunk_size
+        self._session: Any | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.fetches = 0
+        self.bytes_read = 0
+        self.last_bytes = 0
+
+    @property
+    def session(self) -> Any:
+        if self._session is None:
+            with _INIT_LOCK:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+                    session.mount("https://", adapter)
+                    session.headers.update(_HEADERS)
+                    self._session = session
+        return self._session
+
+    def resolve(self, query: str) -> str:
+        """Watch URL for the first result of *query*, or the search URL as fallback."""
+        video_id = self.cache.get(query)
+        with self._lock:
+            if video_id is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if video_id is None:
+            video_id = self.fetch(query)
+            if video_id is None:
+                with self._lock:
+                    self.fallbacks += 1
+                return search_url(query)
+            self.cache.put(query, video_id)
+        return WATCH_URL.format(video_id)
+
+    def fetch(self, query: str) -> str | None:
+        """Stream the results page until the first video ID or the deadline.
+
+        The deadline covers the whole lookup. Connecting and waiting for the
+        headers use it as their socket timeouts, and a timer closes the
+        response when it runs out, so a slow body cannot hold on longer.
+        """
+        start = time.monotonic()
+        read = 0
+        timer: threading.Timer | None = None
+        try:
+            budget = (self.deadline, self.deadline)
+            resp = self.session.get(search_url(query), stream=True, timeout=budget)
+            try:
+                remaining = self.deadline - (time.monotonic() - start)
+                if remaining <= 0:
+                    logger.info("youtube lookup for %r passed its deadline", query)
+                    return None
+                timer = threading.Timer(remaining, resp.close)
+                timer.daemon = True
+                timer.start()
+                tail = b""
+                for chunk in resp.iter_content(self.chunk_size):
+                    read += len(chunk)
+                    m = _WATCH_RE.search(tail + chunk)
+                    if m:
+                        return m.group(1).decode("ascii")
+                    if time.monotonic() - start > self.deadline:
+                        logger.info("youtube lookup for %r passed its deadline", query)
+                        return None
+                    tail = chunk[-_OVERLAP:]
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                resp.close()
+        except Exception as exc:
+            logger.info("youtube lookup for %r failed: %s", query, exc)
+        finally:
+            with self._lock:
+                self.fetches += 1
+                self.bytes_read += read
+                self.last_bytes = read
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "fallbacks": self.fallbacks,
+                "fetches": self.fetches,
+                "bytes_read": self.bytes_read,
+                "bytes_per_fetch": self.bytes_read // self.fetches if self.fetches else 0,
+                "last_bytes": self.last_bytes,
+            }
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+_RESOLVER: YouTubeResolver | None = None
+
+
+def resolver() -> YouTubeResolver:
+    """The shared resolver, backed by the ``YOUTUBE_CACHE`` file."""
+    global _RESOLVER
+    if _RESOLVER is None:
+        with _INIT_LOCK:
+            if _RESOLVER is None:
+                _RESOLVER = YouTubeResolver(VideoIdCache(path=YOUTUBE_CACHE))
+    return _RESOLVER
@@ -0,0 +1,55 @@
+"""Per-utterance cost of the rule stage: keyword-prefiltered vs. linear scan.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_intent_matcher
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from app.intent_router import _RULES as ASSISTANT_RULES
+from core.dispatcher import _RULES as DISPATCH_RULES
+from core.matcher import RuleSet
+
+UTTERANCES = [
+    "open google.com",
+    "open explorer to desktop",
+    "please close discord",
+    "play bohemian rhapsody on youtube",
+    "remember to buy milk",
+    "install vlc",
+    "what time is it",
+    "tell me a joke about cats",
+    "search for python tutorials",
+    "how is the weather today",
+]
+
+
+def _linear(rules: RuleSet, text: str):
+    for rule in rules.rules:
+        m = rule.pattern.search(text)
+        if m:
+            return rule, m
+    return None
+
+
+def _per_utterance_us(fn, rules: RuleSet, number: int) -> float:
+    def run() -> None:
+        for text in UTTERANCES:
+            fn(text) if fn is not _linear else _linear(rules, text)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return best / (number * len(UTTERANCES)) * 1e6
+
+
+def main(number: int = 2000) -> None:
+    for label, rules in (("fuzzy_match rules", ASSISTANT_RULES), ("match_intent rules", DISPATCH_RULES)):
+        before = _per_utterance_us(_linear, rules, number)
+        after = _per_utterance_us(rules.match, rules, number)
+        print(f"{label:20s} linear {before:7.2f} us  prefiltered {after:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Time-to-plan with and without speculative routing, measured on replayed audio.
+
+WAV files (16 kHz mono, 16-bit) are decoded with Vosk through the real
+:class:`~app.pipeline.RecognitionWorker`. That gives a timeline of
+partial and final events, each stamped with its position in the audio.
+The timeline is then replayed at real-time speed twice. The first pass
+plans each command only when its final arrives. The second pass runs the
+:class:`~app.speculation.Speculator`. The report shows how long each pass
+waited after every final before the command's plan was ready::
+
+    python -m benchmarks.bench_speculation kyra_open_github.wav --llm-latency 400
+    python -m benchmarks.bench_speculation *.wav --save timeline.jsonl
+    python -m benchmarks.bench_speculation --timeline timeline.jsonl
+
+``--llm-latency`` stands in for the LLM server with a fixed delay, so the
+result depends only on the audio. Without it, the LLM configured in
+``core/config.py`` is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import wave
+from typing import Any, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (milliseconds into the audio, event kind, text)
+Timeline = List[Tuple[float, str, str]]
+
+
+def timeline_from_wav(path: str, model_path: str, chunk_ms: int = 250) -> Timeline:
+    """Run *path* through the recognition worker and stamp each event."""
+    from vosk import KaldiRecognizer, Model
+
+    from app.assistant import _to_command
+    from app.pipeline import RecognitionWorker
+
+    events: Timeline = []
+    with wave.open(path, "rb") as wav:
+        rate = wav.getframerate()
+        worker = RecognitionWorker(KaldiRecognizer(Model(model_path), rate), _to_command)
+        frames = rate * chunk_ms // 1000
+        pos = 0.0
+        while True:
+            chunk = wav.readframes(frames)
+            if not chunk:
+                break
+            pos += chunk_ms
+            events += [(pos, kind, text) for kind, text in worker.feed(chunk)]
+    return events
+
+
+async def replay(timeline: Timeline, router: Any, speculate: bool) -> List[float]:
+    """Replay *timeline* in real time; return ms from each final to its ready plan."""
+    from app.assistant import _to_command, plan_command
+    from app.speculation import Speculator
+
+    speculator = Speculator(lambda cmd: plan_command(cmd, router)) if speculate else None
+    waits: List[float] = []
+    start = time.perf_counter()
+    for at, kind, text in timeline:
+        delay = at / 1000 - (time.perf_counter() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if speculator is not None and kind == "wake":
+            speculator.reset()
+        elif speculator is not None and kind == "partial":
+            cmd = _to_command(text)
+            if cmd:
+                speculator.observe(cmd)
+        if kind == "final":
+            final = time.perf_counter()
+            task = speculator.take(text) if speculator is not None else None
+            if task is not None:
+                await task
+            else:
+                await plan_command(text, router)
+            waits.append((time.perf_counter() - final) * 1000)
+    return waits
+
+
+def _router(latency_ms: float | None) -> Any:
+    """The LLM router, or a stand-in answering every request after *latency_ms*."""
+    from app.scenarios import FakeLLM, completion
+    from core.intent_router import IntentRouter
+    from core.route_cache import RouteCache
+
+    if latency_ms is None:
+        router = IntentRouter()
+        # Both passes route the same commands; a warm cache would favour the second.
+        router.cache = RouteCache(0)
+        return router
+
+    class Chat(FakeLLM):
+        def __init__(self) -> None:
+            super().__init__({}, lambda: latency_ms / 1000)
+
+        async def _apost(self, payload):  # type: ignore[override]
+            await asyncio.sleep(self.latency())
+            return completion(None, content="ok")
+
+    router = Chat()
+    router.cache = RouteCache(0)
+    return router
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wavs", nargs="*")
+    parser.add_argument("--model", default="vosk-model-small-en-us-0.15")
+    parser.add_argument("--timeline", help="replay events saved with --save instead of audio")
+    parser.add_argument("--save", help="write the decoded timeline as JSONL")
+    parser.add_argument("--llm-latency", type=float, default=None, help="simulated LLM delay in ms")
+    args = parser.parse_args(argv)
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    timelines: List[Timeline] = []
+    if args.timeline:
+        with open(args.timeline, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    timelines.append([tuple(e) for e in json.loads(line)])  # type: ignore[misc]
+    timelines += [timeline_from_wav(path, args.model) for path in args.wavs]
+    if not timelines:
+        parser.error("give WAV files or --timeline")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            for tl in timelines:
+                f.write(json.dumps(tl) + "\n")
+
+    router = _router(args.llm_latency)
+    try:
+        for label, speculate in (("final only", False), ("speculative", True)):
+            waits = [w for tl in timelines for w in asyncio.run(replay(tl, router, speculate))]
+            mean = sum(waits) / len(waits) if waits else 0.0
+            print(f"{label:12s} commands {len(waits):4d}  mean wait {mean:8.1f} ms  max {max(waits, default=0):8.1f} ms")
+    finally:
+        router.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Startup cost per mode: wall time to the first routed command and import breakdown.
+
+Each mode runs in a fresh interpreter. It imports what that mode needs
+and routes ``open https://github.com``, which takes the URL shortcut and
+so needs no LLM server. The voice mode also imports the audio stack but
+does not load a Vosk model. Run from the repository root::
+
+    python -m benchmarks.bench_startup
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_ROUTE = "from app.assistant import IntentRouter; IntentRouter().route('open https://github.com')"
+
+MODES: Dict[str, str] = {
+    "oneshot": _ROUTE,
+    "console": "from core.transcript import Transcript; Transcript(False); " + _ROUTE,
+    "voice": "import vosk, app.playback, app.pipeline; " + _ROUTE,
+}
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _run(code: str, *flags: str) -> Tuple[float, str]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000, proc.stderr
+
+
+def wall_ms(code: str, repeat: int = 5) -> float:
+    """Best-of-*repeat* wall time of a fresh interpreter running *code*."""
+    return min(_run(code)[0] for _ in range(repeat))
+
+
+def import_breakdown(code: str, top: int = 10) -> List[Tuple[str, float]]:
+    """Top-level packages imported by *code*, by cumulative ``-X importtime`` ms."""
+    _, err = _run(code, "-X", "importtime")
+    totals: Dict[str, float] = {}
+    for m in _LINE.finditer(err):
+        if len(m.group(3)) != 1:  # only modules imported directly by the script
+            continue
+        name = m.group(4).split(".")[0]
+        totals[name] = totals.get(name, 0.0) + int(m.group(2)) / 1000
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+def main(repeat: int = 5) -> None:
+    baseline = wall_ms("pass", repeat)
+    print(f"{'interpreter':10s} {baseline:8.1f} ms")
+    for mode, code in MODES.items():
+        try:
+            total = wall_ms(code, repeat)
+        except subprocess.CalledProcessError as exc:
+            print(f"{mode:10s}   failed: {exc.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{mode:10s} {total:8.1f} ms  (+{total - baseline:.1f} over bare interpreter)")
+        for name, ms in import_breakdown(code):
+            print(f"    {name:24s} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
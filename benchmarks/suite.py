@@ -0,0 +1,354 @@
+"""Microbenchmarks for the routing and tool hot paths, checked against baselines.
+
+Run from the repository root::
+
+    python -m benchmarks.suite               # compare with benchmarks/baselines.json
+    python -m benchmarks.suite --update      # record new baselines
+    python -m benchmarks.suite --quick       # skip the 100k-file trees
+    python -m benchmarks.suite -k search     # only cases whose name contains "search"
+
+Third-party packages that are not installed are replaced by the stubs in
+``tests/conftest.py``, so the suite runs offline. The stubbed packages are
+printed and stored with the baselines. Numbers measured against a stub
+(the fuzzy scorer, for example) are only comparable with baselines taken
+the same way. Baselines are only meaningful on the machine that recorded
+them, so re-record with ``--update`` after changing hardware. The exit
+status is 1 when a case is slower than its baseline by more than
+``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import runpy
+import shutil
+import sys
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+
+def install_stubs() -> List[str]:
+    """Load the test stubs for packages that cannot be imported; return their names."""
+    before = set(sys.modules)
+    runpy.run_path(os.path.join(ROOT, "tests", "conftest.py"))
+    added: Dict[str, List[str]] = {}
+    for name in set(sys.modules) - before:
+        added.setdefault(name.split(".")[0], []).append(name)
+    stubbed = []
+    for top, names in sorted(added.items()):
+        for name in names:
+            del sys.modules[name]
+        if importlib.util.find_spec(top) is not None:
+            continue  # the real package is available; leave it to be imported
+        stubbed.append(top)
+    if stubbed:
+        runpy.run_path(os.path.join(ROOT, "tests", "conftest.py"))
+        for name in set(sys.modules) - before:
+            if name.split(".")[0] not in stubbed:
+                del sys.modules[name]
+    return stubbed
+
+
+# -- cases ------------------------------------------------------------------
+
+Case = Tuple[Callable[[], Any], int]
+CASES: Dict[str, Callable[[], Iterator[Case]]] = {}
+
+
+def case(name: str) -> Callable[[Callable[[], Iterator[Case]]], Callable[[], Iterator[Case]]]:
+    """Register a generator that sets up, yields ``(fn, number)`` once, then cleans up.
+
+    The generator is closed after timing, so cleanup belongs in ``finally``.
+    """
+
+    def register(fn: Callable[[], Iterator[Case]]) -> Callable[[], Iterator[Case]]:
+        CASES[name] = fn
+        return fn
+
+    return register
+
+
+def _each(fn: Callable[[Any], Any], inputs: List[Any]) -> Callable[[], None]:
+    def run() -> None:
+        for item in inputs:
+            fn(item)
+
+    return run
+
+
+@case("fuzzy_match")
+def _fuzzy_match() -> Iterator[Case]:
+    from app.intent_router import fuzzy_match
+    from benchmarks.bench_intent_matcher import UTTERANCES
+
+    yield _each(fuzzy_match, UTTERANCES), 200
+
+
+@case("match_intent")
+def _match_intent() -> Iterator[Case]:
+    from benchmarks.bench_intent_matcher import UTTERANCES
+    from core.dispatcher import match_intent
+
+    yield _each(match_intent, UTTERANCES), 200
+
+
+@case("summarise_router_reply")
+def _summarise() -> Iterator[Case]:
+    from app.assistant import summarise_router_reply
+
+    replies = [
+        {"function": {"name": "open_website", "arguments": {"url": "github.com"}}},
+        {"function": {"name": "play_music", "arguments": '{"query": "lofi beats"}'}},
+        '{"function": {"name": "launch_app", "arguments": {"app": "notepad"}}}',
+        'Sure! {"function": "kill_process", "arguments": {"name": "discord"}} done',
+        '{"function": null}',
+    ]
+    yield _each(summarise_router_reply, replies), 500
+
+
+@case("safe_json_load[large]")
+def _json_large() -> Iterator[Case]:
+    from app.assistant import _safe_json_load
+
+    raw = json.dumps({"function": {"name": "create_note", "arguments": {"content": "x" * 200_000}}})
+    yield (lambda: _safe_json_load(raw)), 50
+
+
+@case("safe_json_load[malformed]")
+def _json_malformed() -> Iterator[Case]:
+    from app.assistant import _safe_json_load
+
+    prose = "Here is the call you asked for. " * 2000
+    replies = [
+        prose + '{"function": {"name": "open_website", "arguments": {"url": "a.com"}}}' + prose,
+        "{" + prose + "}",
+        prose + "{ not json at all " * 500,
+    ]
+    yield _each(_safe_json_load, replies), 20
+
+
+@case("sanitize_domain")
+def _sanitize() -> Iterator[Case]:
+    from core.tools import sanitize_domain
+
+    inputs = ["github.com", "Open YouTube dot com", "https://www.example.org/path?q=1", "google", "docs.python.org/3"]
+    yield _each(sanitize_domain, inputs), 2000
+
+
+@case("derive_glob_from_phrase")
+def _derive_glob() -> Iterator[Case]:
+    from core.utils import derive_glob_from_phrase
+
+    inputs = ["python files", "quarterly report", "my holiday png images", "budget 2024 final draft"]
+    yield _each(derive_glob_from_phrase, inputs), 5000
+
+
+@case("route[parse]")
+def _route_parse() -> Iterator[Case]:
+    from app.scenarios import FakeLLM, completion
+    from core.route_cache import RouteCache
+
+    utterances = {
+        "fire up the calculator": completion("launch_app", {"app": "calc"}),
+        "write down buy milk": completion("create_note", {"content": "buy milk"}),
+        "how are you": completion(None, content="Fine, thanks."),
+    }
+    router = FakeLLM(utterances)
+    router.cache = RouteCache(0)
+    try:
+        yield _each(router.route, list(utterances)), 500
+    finally:
+        router.close()
+
+
+@case("router.encode")
+def _router_encode() -> Iterator[Case]:
+    from core.intent_router import IntentRouter
+
+    router = IntentRouter()
+    texts = ["open the quarterly report", "what's the weather like tomorrow", "play lofi beats"]
+
+    def run() -> None:
+        for text in texts:
+            prompt = router.prompt()
+            prompt.encode(prompt.payload(text))
+
+    try:
+        yield run, 2000
+    finally:
+        router.close()
+
+
+@case("transcript.log")
+def _transcript_log() -> Iterator[Case]:
+    from core.transcript import Transcript
+
+    tmp = tempfile.mkdtemp(prefix="kyra-bench-")
+    t = Transcript(True, os.path.join(tmp, "transcript.txt"), console=False)
+    try:
+        yield (lambda: t.log("USER", "open github dot com please")), 5000
+    finally:
+        t.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _span_case(enabled: bool) -> Iterator[Case]:
+    from core import tracing
+
+    tracer = tracing.TRACER
+    tracing.TRACER = tracing.Tracer(enabled)
+
+    def run() -> None:
+        with tracing.span("rules"):
+            pass
+
+    try:
+        yield run, 20000
+    finally:
+        tracing.TRACER = tracer
+
+
+case("tracing.span[disabled]")(lambda: _span_case(False))
+case("tracing.span[enabled]")(lambda: _span_case(True))
+
+
+NEEDLE = "quarterly_needle.doc"
+
+
+def make_tree(root: str, files: int, per_dir: int = 100, fanout: int = 10) -> None:
+    """Create *files* empty files under *root*, *per_dir* per directory, *NEEDLE* last."""
+    exts = (".txt", ".py", ".md", ".png", ".json")
+    dirs = max(1, files // per_dir)
+    for d in range(dirs):
+        path = os.path.join(root, f"d{d // (fanout * fanout)}", f"d{d // fanout % fanout}", f"d{d % fanout}")
+        os.makedirs(path, exist_ok=True)
+        for i in range(per_dir):
+            name = NEEDLE if d == dirs - 1 and i == per_dir - 1 else f"file_{d}_{i}{exts[i % len(exts)]}"
+            open(os.path.join(path, name), "wb").close()
+
+
+def _tree_cases(files: int, label: str) -> None:
+    @contextlib.contextmanager
+    def tree() -> Iterator[str]:
+        tmp = tempfile.mkdtemp(prefix="kyra-bench-")
+        try:
+            make_tree(tmp, files)
+            yield tmp
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @case(f"search_files[{label}]")
+    def _search() -> Iterator[Case]:
+        from core import tools
+
+        with tree() as root:
+            yield (lambda: tools.search_files(root, "quarterly needle")), 1
+
+    @case(f"find_file_and_open[{label}]")
+    def _find() -> Iterator[Case]:
+        from core import tools
+
+        opened = tools.open_explorer
+        tools.open_explorer = lambda path: (True, path)
+        try:
+            with tree() as root:
+                yield (lambda: tools.find_file_and_open(NEEDLE, root)), 1
+        finally:
+            tools.open_explorer = opened
+
+    @case(f"search_files[{label},indexed]")
+    def _search_indexed() -> Iterator[Case]:
+        from core import file_index, tools
+
+        with tree() as root:
+            index = file_index.FileIndex()
+            index.build(root)
+            active, file_index._ACTIVE = file_index._ACTIVE, index
+            try:
+                yield (lambda: tools.search_files(root, "quarterly needle")), 20
+            finally:
+                file_index._ACTIVE = active
+
+
+_tree_cases(10_000, "10k")
+_tree_cases(100_000, "100k")
+
+
+# -- runner -----------------------------------------------------------------
+
+
+def measure(name: str, repeat: int = 5) -> float:
+    """Best per-call time of case *name* in microseconds."""
+    gen = CASES[name]()
+    fn, number = next(gen)
+    try:
+        best = min(timeit.repeat(fn, number=number, repeat=repeat))
+    finally:
+        gen.close()
+    return best / number * 1e6
+
+
+def compare(results: Dict[str, float], baselines: Dict[str, float], threshold: float) -> List[str]:
+    """Names of cases slower than their baseline by more than *threshold*."""
+    return [
+        name
+        for name, us in results.items()
+        if name in baselines and us > baselines[name] * (1 + threshold)
+    ]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-k", dest="pattern", default="", help="run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k-file trees")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed slowdown, 0.3 = 30%%")
+    parser.add_argument("--update", action="store_true", help="write the results as new baselines")
+    parser.add_argument("--baselines", default=BASELINES)
+    args = parser.parse_args(argv)
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    stubbed = install_stubs()
+    print(f"stubbed packages: {', '.join(stubbed) or 'none'}")
+
+    stored: Dict[str, Any] = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines, encoding="utf-8") as f:
+            stored = json.load(f)
+    baselines: Dict[str, float] = stored.get("cases", {})
+    if stored and stored.get("stubbed") != stubbed:
+        print(f"warning: baselines were recorded with stubs {stored.get('stubbed')}")
+
+    names = [n for n in CASES if args.pattern in n and not (args.quick and "100k" in n)]
+    results: Dict[str, float] = {}
+    for name in names:
+        results[name] = measure(name, args.repeat)
+        base = baselines.get(name)
+        delta = f"{(results[name] / base - 1) * 100:+7.1f}%" if base else "    new"
+        print(f"{name:34s} {results[name]:12.2f} us  {delta}")
+
+    if args.update:
+        with open(args.baselines, "w", encoding="utf-8") as f:
+            json.dump(
+                {"stubbed": stubbed, "cases": {**baselines, **results}}, f, indent=2, sort_keys=True
+            )
+            f.write("\n")
+        print(f"baselines written to {args.baselines}")
+        return 0
+    slow = compare(results, baselines, args.threshold)
+    for name in slow:
+        print(f"REGRESSION {name}: {results[name]:.2f} us vs baseline {baselines[name]:.2f} us")
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,8 +11,43 @@ _DEFAULT = {
     "debug": True,
     "tts_engine": "gtts",
     "conversational_mode": True,
+    "llm_timeout": 4.0,
+    "llm_connect_timeout": 2.0,
+    "llm_pool_size": 4,
+    "llm_keepalive": True,
+    "llm_stream": False,
+    "llm_compact_tools": False,
+    "llm_compact_exclude": ["install_cmd", "uninstall_cmd"],
+    "route_cache_size": 256,
+    "route_cache_ttl": 86400,
+    "route_cache_path": None,
+    "file_index": True,
+    "file_index_path": None,
+    "file_index_roots": ["~"],
+    "file_index_refresh": 300,
+    "file_search_workers": 4,
+    "file_search_deadline": 5.0,
+    "file_search_excludes": [".git", "node_modules", "venv", ".venv", "__pycache__"],
+    "transcript_max_bytes": 1_000_000,
+    "transcript_max_age": None,
+    "transcript_backups": 3,
+    "trace": False,
+    "trace_jsonl": None,
+    "trace_prometheus": None,
+    "tool_workers": 4,
+    "tool_timeout": 10.0,
 }
 
+
+def user_cache_dir() -> str:
+    """Per-user cache directory for Kyra's data files."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "kyra")
+
+
 _CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.json")
 
 try:  # pragma: no cover - file may not exist in tests
@@ -30,6 +65,50 @@ CONVERSATIONAL_MODE: bool = bool(
     _CONFIG.get("conversational_mode", _DEFAULT["conversational_mode"])
 )
 
+LLM_TIMEOUT: float = float(_CONFIG.get("llm_timeout", _DEFAULT["llm_timeout"]))
+LLM_CONNECT_TIMEOUT: float = float(
+    _CONFIG.get("llm_connect_timeout", _DEFAULT["llm_connect_timeout"])
+)
+LLM_POOL_SIZE: int = int(_CONFIG.get("llm_pool_size", _DEFAULT["llm_pool_size"]))
+LLM_KEEPALIVE: bool = bool(_CONFIG.get("llm_keepalive", _DEFAULT["llm_keepalive"]))
+LLM_STREAM: bool = bool(_CONFIG.get("llm_stream", _DEFAULT["llm_stream"]))
+LLM_COMPACT_TOOLS: bool = bool(_CONFIG.get("llm_compact_tools", _DEFAULT["llm_compact_tools"]))
+LLM_COMPACT_EXCLUDE: list = list(
+    _CONFIG.get("llm_compact_exclude", _DEFAULT["llm_compact_exclude"])
+)
+ROUTE_CACHE_SIZE: int = int(_CONFIG.get("route_cache_size", _DEFAULT["route_cache_size"]))
+ROUTE_CACHE_TTL: float = float(_CONFIG.get("route_cache_ttl", _DEFAULT["route_cache_ttl"]))
+ROUTE_CACHE_PATH: str | None = _CONFIG.get("route_cache_path", _DEFAULT["route_cache_path"])
+FILE_INDEX: bool = bool(_CONFIG.get("file_index", _DEFAULT["file_index"]))
+FILE_INDEX_PATH: str = _CONFIG.get("file_index_path") or os.path.join(
+    user_cache_dir(), "index.sqlite"
+)
+FILE_INDEX_ROOTS: list = list(_CONFIG.get("file_index_roots", _DEFAULT["file_index_roots"]))
+FILE_INDEX_REFRESH: float = float(
+    _CONFIG.get("file_index_refresh", _DEFAULT["file_index_refresh"])
+)
+FILE_SEARCH_WORKERS: int = int(
+    _CONFIG.get("file_search_workers", _DEFAULT["file_search_workers"])
+)
+FILE_SEARCH_DEADLINE: float = float(
+    _CONFIG.get("file_search_deadline", _DEFAULT["file_search_deadline"])
+)
+FILE_SEARCH_EXCLUDES: list = list(
+    _CONFIG.get("file_search_excludes", _DEFAULT["file_search_excludes"])
+)
+TRANSCRIPT_MAX_BYTES: int = int(
+    _CONFIG.get("transcript_max_bytes", _DEFAULT["transcript_max_bytes"])
+)
+TRANSCRIPT_MAX_AGE: float | None = _CONFIG.get(
+    "transcript_max_age", _DEFAULT["transcript_max_age"]
+)
+TRANSCRIPT_BACKUPS: int = int(_CONFIG.get("transcript_backups", _DEFAULT["transcript_backups"]))
+TRACE: bool = bool(_CONFIG.get("trace", _DEFAULT["trace"]))
+TRACE_JSONL: str | None = _CONFIG.get("trace_jsonl", _DEFAULT["trace_jsonl"])
+TRACE_PROMETHEUS: str | None = _CONFIG.get("trace_prometheus", _DEFAULT["trace_prometheus"])
+TOOL_WORKERS: int = int(_CONFIG.get("tool_workers", _DEFAULT["tool_workers"]))
+TOOL_TIMEOUT: float = float(_CONFIG.get("tool_timeout", _DEFAULT["tool_timeout"]))
+
 __all__ = [
     "LLM_BASE_URL",
     "MODEL_NAME",
@@ -37,4 +116,30 @@ __all__ = [
     "DEBUG",
     "TTS_ENGINE",
     "CONVERSATIONAL_MODE",
+    "LLM_TIMEOUT",
+    "LLM_CONNECT_TIMEOUT",
+    "LLM_POOL_SIZE",
+    "LLM_KEEPALIVE",
+    "LLM_STREAM",
+    "LLM_COMPACT_TOOLS",
+    "LLM_COMPACT_EXCLUDE",
+    "ROUTE_CACHE_SIZE",
+    "ROUTE_CACHE_TTL",
+    "ROUTE_CACHE_PATH",
+    "FILE_INDEX",
+    "FILE_INDEX_PATH",
+    "user_cache_dir",
+    "FILE_INDEX_ROOTS",
+    "FILE_INDEX_REFRESH",
+    "FILE_SEARCH_WORKERS",
+    "FILE_SEARCH_DEADLINE",
+    "FILE_SEARCH_EXCLUDES",
+    "TRANSCRIPT_MAX_BYTES",
+    "TRANSCRIPT_MAX_AGE",
+    "TRANSCRIPT_BACKUPS",
+    "TRACE",
+    "TRACE_JSONL",
+    "TRACE_PROMETHEUS",
+    "TOOL_WORKERS",
+    "TOOL_TIMEOUT",
 ]
@@ -7,11 +7,44 @@ from typing import Dict, Tuple, Optional
 
 from rapidfuzz import fuzz
 
+from .matcher import FuzzyCatalogue, Rule, RuleSet
 from .tools import sanitize_domain
 
 logger = logging.getLogger(__name__)
 
 FILLER_RE = re.compile(r"\b(?:please|can you|could you|would you|i want to|i wanna|i want|\s+)\b", re.I)
+_ON_YOUTUBE_RE = re.compile(r" on youtube$", re.I)
+
+_RULES = RuleSet(
+    [
+        Rule(
+            "play_music",
+            re.compile(r"(?:play|listen to|hear) (?P<song>.+)"),
+            ("play", "listen to", "hear"),
+            "query",
+            "song",
+        ),
+        Rule(
+            "search",
+            re.compile(r"(?:search for|look up) (?P<query>.+)"),
+            ("search for", "look up"),
+            "url",
+            "query",
+        ),
+        Rule(
+            "open_website",
+            re.compile(r"(?:open|visit|go to) (?P<site>.+)"),
+            ("open", "visit", "go to"),
+            "url",
+            "site",
+        ),
+    ]
+)
+
+_FALLBACK = FuzzyCatalogue(
+    {"open_website": ("open",), "play_music": ("play",), "open_search": ("search",)},
+    fuzz.partial_ratio,
+)
 
 
 def _clean(text: str) -> str:
@@ -24,39 +57,33 @@ def match_intent(text: str) -> Tuple[Optional[str], Dict[str, str]]:
     """Return tool name and arguments if recognised."""
     cleaned = _clean(text)
 
-    m = re.search(r"(?:play|listen to|hear) (?P<song>.+)", cleaned)
-    if m:
-        song = re.sub(r" on youtube$", "", m.group("song"), flags=re.I).strip()
-        logger.debug(
-            "Mapped input '%s' to play_music with arg: '%s'", text, song
-        )
-        return "play_music", {"url": None, "query": song}
-
-    m = re.search(r"(?:search for|look up) (?P<query>.+)", cleaned)
-    if m:
-        q = m.group("query").strip()
-        url = f"https://www.google.com/search?q={urllib.parse.quote(q)}"
-        logger.debug("Mapped input '%s' to open_website search with arg: '%s'", text, q)
-        return "open_website", {"url": url}
-
-    m = re.search(r"(?:open|visit|go to) (?P<site>.+)", cleaned)
-    if m:
-        site = m.group("site").strip()
+    hit = _RULES.match(cleaned)
+    if hit:
+        rule, m = hit
+        value = m.group(rule.group)
+        if rule.name == "play_music":
+            song = _ON_YOUTUBE_RE.sub("", value).strip()
+            logger.debug(
+                "Mapped input '%s' to play_music with arg: '%s'", text, song
+            )
+            return "play_music", {"url": None, "query": song}
+        if rule.name == "search":
+            q = value.strip()
+            url = f"https://www.google.com/search?q={urllib.parse.quote(q)}"
+            logger.debug("Mapped input '%s' to open_website search with arg: '%s'", text, q)
+            return "open_website", {"url": url}
+        site = value.strip()
         logger.debug("Mapped input '%s' to open_website with arg: '%s'", text, site)
         return "open_website", {"url": site}
 
     # Similarity fallback for one-word commands
-    scores = {
-        "open_website": fuzz.partial_ratio(cleaned, "open"),
-        "play_music": fuzz.partial_ratio(cleaned, "play"),
-        "open_search": fuzz.partial_ratio(cleaned, "search"),
-    }
-    best = max(scores, key=scores.get)
-    if scores[best] > 60:
-        if best == "open_search":
+    best = _FALLBACK.best(cleaned, 60)
+    if best and best[2] > 60:
+        name = best[0]
+        if name == "open_search":
             url = f"https://www.google.com/search?q={urllib.parse.quote(cleaned)}"
             return "open_website", {"url": url}
-        elif best == "open_website":
+        elif name == "open_website":
             dom = sanitize_domain(cleaned)
             arg = dom if dom else cleaned
             return "open_website", {"url": arg}
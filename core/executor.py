@@ -0,0 +1,265 @@
+"""Run registered tools on a bounded worker pool with per-tool deadlines.
+
+Tools run on a dedicated thread pool, so a slow one (a YouTube lookup, a
+long file walk) never blocks the event loop. It also cannot starve the
+default executor used for audio decoding. Coroutine tools are awaited on
+the loop directly. Each call is bounded by the ``timeout`` declared with
+``@tool(timeout=...)``. A call that runs out of time or is cancelled
+returns ``(False, reason)``. If it had not started yet, it never runs. A
+call that is already running on a thread is abandoned, because Python
+threads cannot be killed, and its result is discarded. A fresh worker
+takes the abandoned one's place, so hung tools cannot starve the pool.
+Workers are daemon threads and never hold up interpreter exit. Tools
+with side effects call :func:`abandoned` before acting, so a late call
+does not open a browser after its caller has already replied.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import inspect
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from . import tracing
+from .config import TOOL_TIMEOUT, TOOL_WORKERS
+
+logger = logging.getLogger(__name__)
+
+Result = Tuple[bool, str]
+
+_local = threading.local()
+
+
+def abandoned() -> bool:
+    """True inside a tool call whose caller has timed out or been cancelled."""
+    call = getattr(_local, "call", None)
+    return call is not None and call.abandoned
+
+
+class _Call:
+    __slots__ = ("fn", "future", "abandoned", "done")
+
+    def __init__(self, fn: Callable[[], Any]) -> None:
+        self.fn = fn
+        self.future: "concurrent.futures.Future[Any]" = concurrent.futures.Future()
+        self.abandoned = False
+        self.done = False
+
+
+class _WorkerPool:
+    """Fixed number of daemon worker threads fed from one queue.
+
+    :meth:`abandon` marks a call as given up. If the call is already
+    running, a replacement worker is started, and the stuck worker exits
+    once its call returns.
+    """
+
+    def __init__(self, workers: int, name: str) -> None:
+        self.name = name
+        self.replaced = 0
+        self._q: "queue.SimpleQueue[_Call | None]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._workers = workers
+        for _ in range(workers):
+            self._spawn()
+
+    def _spawn(self) -> None:
+        threading.Thread(target=self._work, name=f"{self.name}_{next(self._ids)}", daemon=True).start()
+
+    def _work(self) -> None:
+        while True:
+            call = self._q.get()
+            if call is None:
+                return
+            if not call.future.set_running_or_notify_cancel():
+                continue
+            _local.call = call
+            try:
+                result = call.fn()
+            except BaseException as exc:
+                call.future.set_exception(exc)
+            else:
+                call.future.set_result(result)
+            finally:
+                _local.call = None
+            with self._lock:
+                call.done = True
+                if call.abandoned:
+                    return  # a replacement already took this worker's place
+
+    def submit(self, fn: Callable[[], Any]) -> _Call:
+        call = _Call(fn)
+        self._q.put(call)
+        return call
+
+    def abandon(self, call: _Call) -> None:
+        with self._lock:
+            if call.done or call.abandoned:
+                return
+            call.abandoned = True
+        if not call.future.cancel():
+            self.replaced += 1
+            self._spawn()
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                call = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if call is not None:
+                call.future.cancel()
+        for _ in range(self._workers):
+            self._q.put(None)
+
+
+class _ToolStats:
+    __slots__ = ("calls", "errors", "timeouts", "cancelled", "queue_ms", "max_queue_ms", "exec_ms", "max_exec_ms")
+
+    def __init__(self) -> None:
+        self.calls = self.errors = self.timeouts = self.cancelled = 0
+        self.queue_ms = self.max_queue_ms = self.exec_ms = self.max_exec_ms = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        n = self.calls or 1
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "queue_ms_avg": round(self.queue_ms / n, 2),
+            "queue_ms_max": round(self.max_queue_ms, 2),
+            "exec_ms_avg": round(self.exec_ms / n, 2),
+            "exec_ms_max": round(self.max_exec_ms, 2),
+        }
+
+
+class ToolExecutor:
+    """Bounded pool that executes entries of the tool registry."""
+
+    def __init__(self, registry: Dict[str, Dict[str, Any]], workers: int = TOOL_WORKERS) -> None:
+        self.registry = registry
+        self._pool = _WorkerPool(workers, "kyra-tool")
+        self._stats: Dict[str, _ToolStats] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, name: str) -> Tuple[Callable[..., Any], float | None]:
+        meta = self.registry[name]
+        return meta["callable"], meta.get("timeout", TOOL_TIMEOUT)
+
+    def _observe(self, name: str, queued_ms: float, exec_ms: float, outcome: str | None) -> None:
+        with self._lock:
+            s = self._stats.setdefault(name, _ToolStats())
+            s.calls += 1
+            s.queue_ms += queued_ms
+            s.max_queue_ms = max(s.max_queue_ms, queued_ms)
+            s.exec_ms += exec_ms
+            s.max_exec_ms = max(s.max_exec_ms, exec_ms)
+            if outcome is not None:
+                setattr(s, outcome, getattr(s, outcome) + 1)
+        tracing.record("tool_queue", queued_ms, tool=name)
+        tracing.record("tool", exec_ms, tool=name, outcome=outcome or "ok")
+
+    def _job(self, fn: Callable[..., Any], args: Dict[str, Any], marks: Dict[str, float]) -> Any:
+        marks["start"] = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(fn):
+                return asyncio.run(fn(**args))
+            return fn(**args)
+        finally:
+            marks["end"] = time.perf_counter()
+
+    def _finish(
+        self, name: str, submitted: float, marks: Dict[str, float], outcome: str | None
+    ) -> None:
+        now = time.perf_counter()
+        start = marks.get("start", now)
+        self._observe(name, (start - submitted) * 1000, (marks.get("end", now) - start) * 1000, outcome)
+
+    async def run(self, name: str, args: Dict[str, Any], timeout: float | None = None) -> Result:
+        """Execute tool *name* without blocking the loop; cancelling the caller cancels the call."""
+        fn, default_timeout = self._entry(name)
+        timeout = default_timeout if timeout is None else timeout
+        submitted = time.perf_counter()
+        marks: Dict[str, float] = {}
+        job: _Call | None = None
+        outcome: str | None = None
+        try:
+            if inspect.iscoroutinefunction(fn):
+                marks["start"] = submitted
+                call: Any = fn(**args)
+            else:
+                ctx = contextvars.copy_context()
+                job = self._pool.submit(functools.partial(ctx.run, self._job, fn, args, marks))
+                call = asyncio.wrap_future(job.future)
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            outcome = "timeouts"
+            logger.warning("tool %s timed out after %.1fs", name, timeout)
+            return False, f"{name} timed out"
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception as exc:
+            outcome = "errors"
+            logger.exception("tool %s failed", name)
+            return False, str(exc)
+        finally:
+            if job is not None and outcome in ("timeouts", "cancelled"):
+                self._pool.abandon(job)
+            self._finish(name, submitted, marks, outcome)
+
+    def run_sync(self, name: str, args: Dict[str, Any], timeout: float | None = None) -> Result:
+        """Blocking :meth:`run` for callers without an event loop."""
+        fn, default_timeout = self._entry(name)
+        timeout = default_timeout if timeout is None else timeout
+        submitted = time.perf_counter()
+        marks: Dict[str, float] = {}
+        ctx = contextvars.copy_context()
+        job = self._pool.submit(functools.partial(ctx.run, self._job, fn, args, marks))
+        outcome: str | None = None
+        try:
+            return job.future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            outcome = "timeouts"
+            self._pool.abandon(job)
+            logger.warning("tool %s timed out after %.1fs", name, timeout)
+            return False, f"{name} timed out"
+        except Exception as exc:
+            outcome = "errors"
+            logger.exception("tool %s failed", name)
+            return False, str(exc)
+        finally:
+            self._finish(name, submitted, marks, outcome)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: s.summary() for name, s in sorted(self._stats.items())}
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+
+
+_EXECUTOR: ToolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def default_executor() -> ToolExecutor:
+    """The shared executor over the global tool registry."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                from .tools import _REGISTRY
+
+                _EXECUTOR = ToolExecutor(_REGISTRY)
+    return _EXECUTOR
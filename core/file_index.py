@@ -0,0 +1,291 @@
+"""Persistent SQLite index of file names used by the file-search tools.
+
+The index stores one row per file (directory, name, lower-cased name and
+extension) plus the mtime of every directory it has listed. It is built once
+in a background thread and then refreshed incrementally: only directories
+whose mtime changed since the last pass are listed again. Directories named
+in ``file_search_excludes`` (``.git``, ``node_modules``, virtualenvs) are
+skipped, as they are by the walker.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from .config import FILE_SEARCH_EXCLUDES
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY, built REAL);
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime REAL);
+CREATE TABLE IF NOT EXISTS files (dir TEXT, name TEXT, lname TEXT, ext TEXT);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+CREATE INDEX IF NOT EXISTS files_ext ON files(ext);
+"""
+
+_EXT_ONLY = re.compile(r"^\*\.([a-z0-9]+)$")
+
+
+def _norm(path: str) -> str:
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def _ext(name: str) -> str:
+    return os.path.splitext(name)[1][1:].lower()
+
+
+def _sqlite_glob(pattern: str) -> str:
+    """Translate an ``fnmatch`` pattern to SQLite ``GLOB`` syntax."""
+    return pattern.replace("[!", "[^")
+
+
+class FileIndex:
+    """File-name index for one or more directory trees."""
+
+    def __init__(self, path: str = ":memory:", excludes: Iterable[str] = FILE_SEARCH_EXCLUDES) -> None:
+        self.path = path
+        self.excludes = frozenset(excludes)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._ready: set[str] = set()
+        self.build_seconds = 0.0
+        self.refresh_seconds = 0.0
+        self.last_query_ms = 0.0
+
+    # -- building -----------------------------------------------------------
+
+    def _list_dir(self, path: str) -> Tuple[float, List[Tuple[str, str, str, str]], List[str]]:
+        files: List[Tuple[str, str, str, str]] = []
+        subdirs: List[str] = []
+        mtime = os.stat(path).st_mtime
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Same rule as os.walk(followlinks=False).
+                    if entry.name not in self.excludes and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                    continue
+                name = entry.name
+                files.append((path, name, name.lower(), _ext(name)))
+        return mtime, files, subdirs
+
+    def _store_dir(self, path: str, mtime: float, files: Iterable[Tuple[str, str, str, str]]) -> None:
+        self._conn.execute("DELETE FROM files WHERE dir = ?", (path,))
+        self._conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?)", files)
+        self._conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (path, mtime))
+
+    def _scan_tree(self, root: str) -> None:
+        stack = [root]
+        while stack and not self._stop.is_set():
+            path = stack.pop()
+            try:
+                mtime, files, subdirs = self._list_dir(path)
+            except OSError:
+                continue
+            with self._lock:
+                self._store_dir(path, mtime, files)
+            # Reverse so the walk stays pre-order like os.walk.
+            stack.extend(reversed(subdirs))
+
+    def _drop_tree(self, path: str) -> None:
+        prefix = path.rstrip(os.sep) + os.sep
+        n = len(prefix)
+        self._conn.execute(
+            "DELETE FROM files WHERE dir = ? OR substr(dir, 1, ?) = ?", (path, n, prefix)
+        )
+        self._conn.execute(
+            "DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?", (path, n, prefix)
+        )
+
+    def build(self, root: str) -> None:
+        """Index *root* from scratch."""
+        root = _norm(root)
+        start = time.perf_counter()
+        with self._lock:
+            self._drop_tree(root)
+        self._scan_tree(root)
+        with self._lock:
+            if not self._stop.is_set():
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO roots VALUES (?, ?)", (root, time.time())
+                )
+            self._conn.commit()
+        self.build_seconds = time.perf_counter() - start
+        if self._stop.is_set():
+            return
+        with self._lock:
+            self._ready.add(root)
+        logger.info(
+            "file index built root=%s seconds=%.2f %s", root, self.build_seconds, self.stats()
+        )
+
+    def refresh(self, root: str) -> int:
+        """Re-list directories under *root* whose mtime changed; return how many."""
+        root = _norm(root)
+        start = time.perf_counter()
+        prefix = root.rstrip(os.sep) + os.sep
+        with self._lock:
+            known: Dict[str, float] = dict(
+                self._conn.execute(
+                    "SELECT path, mtime FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (root, len(prefix), prefix),
+                ).fetchall()
+            )
+        changed = 0
+        for path, mtime in known.items():
+            if self._stop.is_set():
+                break
+            if os.path.basename(path) in self.excludes:
+                # Indexed before it was excluded.
+                with self._lock:
+                    self._drop_tree(path)
+                continue
+            try:
+                current = os.stat(path).st_mtime
+            except OSError:
+                with self._lock:
+                    self._drop_tree(path)
+                continue
+            if current == mtime:
+                continue
+            try:
+                mtime, files, subdirs = self._list_dir(path)
+            except OSError:
+                continue
+            changed += 1
+            with self._lock:
+                self._store_dir(path, mtime, files)
+            for sub in subdirs:
+                if sub not in known:
+                    self._scan_tree(sub)
+        with self._lock:
+            self._conn.commit()
+            self._ready.add(root)
+        self.refresh_seconds = time.perf_counter() - start
+        return changed
+
+    def is_built(self, root: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM roots WHERE path = ?", (_norm(root),)
+            ).fetchone()
+        return row is not None
+
+    # -- background maintenance -------------------------------------------
+
+    def start(self, roots: Iterable[str], interval: float = 300.0) -> None:
+        """Build or refresh *roots* in a daemon thread, then keep them fresh."""
+        roots = [_norm(r) for r in roots]
+
+        def _run() -> None:
+            for root in roots:
+                if self.is_built(root):
+                    self.refresh(root)
+                else:
+                    self.build(root)
+            while not self._stop.wait(interval):
+                for root in roots:
+                    self.refresh(root)
+
+        self._thread = threading.Thread(target=_run, name="file-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # -- queries ------------------------------------------------------------
+
+    def covers(self, directory: str) -> bool:
+        """Return True if a ready indexed root contains *directory*."""
+        directory = _norm(directory)
+        with self._lock:
+            ready = list(self._ready)
+        for root in ready:
+            if directory == root or directory.startswith(root.rstrip(os.sep) + os.sep):
+                return True
+        return False
+
+    def search(self, directory: str, pattern: str, limit: int | None = None) -> List[str] | None:
+        """Return paths under *directory* whose name matches the glob *pattern*.
+
+        Matching is case-insensitive. Returns ``None`` when *directory* is not
+        covered by a ready index so callers can fall back to walking.
+        """
+        if not self.covers(directory):
+            return None
+        directory = _norm(directory)
+        prefix = directory.rstrip(os.sep) + os.sep
+        pattern = pattern.lower()
+        sql = "SELECT dir, name FROM files WHERE (dir = ? OR substr(dir, 1, ?) = ?)"
+        params: List[object] = [directory, len(prefix), prefix]
+        ext = _EXT_ONLY.match(pattern)
+        if ext:
+            sql += " AND ext = ?"
+            params.append(ext.group(1))
+        else:
+            sql += " AND lname GLOB ?"
+            params.append(_sqlite_glob(pattern))
+        sql += " ORDER BY rowid"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        start = time.perf_counter()
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        self.last_query_ms = (time.perf_counter() - start) * 1000
+        return [os.path.join(d, n) for d, n in rows]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            dirs = self._conn.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+            pages = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "files": files,
+            "dirs": dirs,
+            "bytes": pages * page_size,
+            "build_seconds": round(self.build_seconds, 3),
+            "refresh_seconds": round(self.refresh_seconds, 3),
+            "last_query_ms": round(self.last_query_ms, 3),
+        }
+
+
+_ACTIVE: FileIndex | None = None
+
+
+def active() -> FileIndex | None:
+    return _ACTIVE
+
+
+def start_background_index(path: str, roots: Iterable[str], interval: float = 300.0) -> FileIndex:
+    """Open the index at *path* and keep *roots* indexed in the background."""
+    global _ACTIVE
+    if _ACTIVE is None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        _ACTIVE = FileIndex(path)
+        _ACTIVE.start(roots, interval)
+    return _ACTIVE
+
+
+def query(directory: str, pattern: str, limit: int | None = None) -> List[str] | None:
+    """Search the active index, or return ``None`` if it cannot answer yet."""
+    index = _ACTIVE
+    if index is None:
+        return None
+    return index.search(directory, pattern, limit)
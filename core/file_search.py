@@ -0,0 +1,95 @@
+"""Parallel ``os.scandir`` walker used when the file index cannot answer."""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Tuple
+
+from .utils import compile_glob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXCLUDES = (".git", "node_modules", "venv")
+
+
+def _list(path: str, exclude: frozenset[str]) -> Tuple[List[Tuple[str, str]], List[str]]:
+    files: List[Tuple[str, str]] = []
+    dirs: List[str] = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # Same rule as os.walk(followlinks=False).
+                if entry.name not in exclude and not entry.is_symlink():
+                    dirs.append(entry.path)
+            else:
+                files.append((entry.name, entry.path))
+    return files, dirs
+
+
+def find_files(
+    root: str,
+    pattern: str,
+    limit: int | None = None,
+    deadline: float | None = None,
+    excludes: Iterable[str] = DEFAULT_EXCLUDES,
+    workers: int = 4,
+) -> List[str]:
+    """Return paths under *root* whose name matches the glob *pattern*.
+
+    Results come back in ``os.walk`` order. Each top-level subdirectory is
+    walked by its own worker. A worker stops as soon as the subdirectories
+    before it, plus its own hits, already fill *limit*. If *deadline*
+    seconds pass first, the hits found so far are returned.
+    """
+    match = compile_glob(pattern).match
+    exclude = frozenset(excludes)
+    stop_at = time.monotonic() + deadline if deadline else None
+    try:
+        files, subdirs = _list(root, exclude)
+    except OSError:
+        return []
+    hits = [path for name, path in files if match(name)]
+    if (limit and len(hits) >= limit) or not subdirs:
+        return hits[:limit] if limit else hits
+
+    base = len(hits)
+    counts = [0] * len(subdirs)
+    buckets: List[List[str]] = [[] for _ in subdirs]
+
+    def _walk(i: int) -> None:
+        stack = [subdirs[i]]
+        bucket = buckets[i]
+        while stack:
+            if stop_at is not None and time.monotonic() > stop_at:
+                logger.debug("file search deadline hit under %s", subdirs[i])
+                return
+            if limit and base + sum(counts[: i + 1]) >= limit:
+                return
+            path = stack.pop()
+            try:
+                files, dirs = _list(path, exclude)
+            except OSError:
+                continue
+            for name, full in files:
+                if match(name):
+                    bucket.append(full)
+                    counts[i] += 1
+            stack.extend(reversed(dirs))
+
+    if workers > 1 and len(subdirs) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(subdirs))) as pool:
+            list(pool.map(_walk, range(len(subdirs))))
+    else:
+        for i in range(len(subdirs)):
+            _walk(i)
+
+    for bucket in buckets:
+        hits.extend(bucket)
+    return hits[:limit] if limit else hits
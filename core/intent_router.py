@@ -1,25 +1,120 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
 import logging
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
-from pydantic import BaseModel
-from jsonschema import ValidationError
 
 import os
 
-from .config import MODEL_NAME, DEBUG
-from .tools import _REGISTRY, get_openai_tools, validate_tool_args
+from .config import (
+    MODEL_NAME,
+    DEBUG,
+    LLM_TIMEOUT,
+    LLM_CONNECT_TIMEOUT,
+    LLM_POOL_SIZE,
+    LLM_KEEPALIVE,
+    LLM_STREAM,
+    LLM_COMPACT_TOOLS,
+    LLM_COMPACT_EXCLUDE,
+    ROUTE_CACHE_SIZE,
+    ROUTE_CACHE_TTL,
+    ROUTE_CACHE_PATH,
+)
+from . import tracing
+from .prompt import PreparedPrompt, compact_tools
+from .route_cache import Decision, RouteCache
+from .tools import _REGISTRY, get_openai_tools, registry_version, validate_tool_args
 import re
 
 
-class ToolCall(BaseModel):
-    name: str
-    arguments: Dict[str, Any]
+def __getattr__(name: str) -> Any:
+    # ``ToolCall`` is defined on first use so routing never imports pydantic.
+    if name == "ToolCall":
+        from pydantic import BaseModel
+
+        class ToolCall(BaseModel):
+            name: str
+            arguments: Dict[str, Any]
+
+        globals()["ToolCall"] = ToolCall
+        return ToolCall
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class StreamAccumulator:
+    """Assemble an OpenAI-style ``stream: true`` SSE reply into one choice.
+
+    :meth:`feed` returns ``True`` as soon as the reply is actionable: either the
+    first tool call has a name and a complete JSON arguments object, or the
+    server reported a finish reason. Content deltas are forwarded to
+    *on_token* as they arrive.
+    """
+
+    def __init__(self, on_token: Callable[[str], None] | None = None) -> None:
+        self.on_token = on_token
+        self.content: List[str] = []
+        self.name: str | None = None
+        self.arguments = ""
+        self.finish_reason: str | None = None
+
+    def feed(self, line: str | bytes) -> bool:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "replace")
+        line = line.strip()
+        if not line.startswith("data:"):
+            return False
+        data = line[5:].strip()
+        if data == "[DONE]":
+            self.finish_reason = self.finish_reason or "stop"
+            return True
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            return False
+        choice = (event.get("choices") or [{}])[0]
+        delta = choice.get("delta") or {}
+        token = delta.get("content")
+        if token:
+            self.content.append(token)
+            if self.on_token:
+                self.on_token(token)
+        for call in delta.get("tool_calls") or []:
+            if call.get("index", 0) != 0:
+                continue  # only the first call is ever dispatched
+            fn = call.get("function") or {}
+            if fn.get("name"):
+                self.name = fn["name"]
+            self.arguments += fn.get("arguments") or ""
+        if choice.get("finish_reason"):
+            self.finish_reason = choice["finish_reason"]
+            return True
+        return self.name is not None and self._arguments_complete()
+
+    def _arguments_complete(self) -> bool:
+        if not self.arguments.rstrip().endswith("}"):
+            return False
+        try:
+            json.loads(self.arguments)
+        except json.JSONDecodeError:
+            return False
+        return True
+
+    def choice(self) -> Dict[str, Any]:
+        """Return the assembled reply shaped like a non-streaming ``choice``."""
+        message: Dict[str, Any] = {"content": "".join(self.content)}
+        if self.name:
+            message["tool_calls"] = [
+                {"function": {"name": self.name, "arguments": self.arguments}}
+            ]
+            return {"finish_reason": "tool_calls", "message": message}
+        return {"finish_reason": self.finish_reason or "stop", "message": message}
 
 
 class IntentRouter:
@@ -31,6 +126,35 @@ class IntentRouter:
             "Respond conversationally unless a tool should be used. "
             "When an action is required, respond with the appropriate tool call."
         )
+        self.tools = self._build_tools()
+        self._built_tools = self.tools
+        self.compact_tools = LLM_COMPACT_TOOLS
+        self.logger = logging.getLogger(__name__)
+
+        openai_key = os.getenv("OPENAI_API_KEY")
+        api_base = os.getenv("API_BASE_URL") or (
+            "https://api.openai.com" if openai_key else "http://localhost:11434"
+        )
+        self.url = f"{api_base.rstrip('/')}/v1/chat/completions"
+        self.headers = {"Content-Type": "application/json"}
+        if openai_key:
+            self.headers["Authorization"] = f"Bearer {openai_key}"
+        if not LLM_KEEPALIVE:
+            self.headers["Connection"] = "close"
+        self.timeout = (LLM_CONNECT_TIMEOUT, LLM_TIMEOUT)
+        self._stats_lock = threading.Lock()
+        self.stream = LLM_STREAM
+        self.session = self._make_session()
+        self._aclient: Any | None = None
+        self._aclient_loop: asyncio.AbstractEventLoop | None = None
+        self.cache = RouteCache(ROUTE_CACHE_SIZE, ROUTE_CACHE_TTL, ROUTE_CACHE_PATH)
+        self._prompt: PreparedPrompt | None = None
+        self._prompt_src: Tuple[Any, ...] = ()
+        self.prompt_tokens: int | None = None
+
+    @staticmethod
+    def _build_tools() -> List[Dict[str, Any]]:
+        """Tool definitions from the registry, with the richer ``play_music`` schema."""
         base = [t for t in get_openai_tools() if t.get("function", {}).get("name") != "play_music"]
         base.append(
             {
@@ -55,62 +179,322 @@ class IntentRouter:
                 },
             }
         )
-        self.tools = base
-        self.logger = logging.getLogger(__name__)
+        return base
+
+    def _make_session(self) -> requests.Session:
+        """Create the pooled keep-alive session shared by every request."""
+        session = requests.Session()
+        # One pool for the single LLM host; ``pool_maxsize`` bounds how many
+        # sockets concurrent callers may keep open to it.
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=LLM_POOL_SIZE)
+        session.mount("http://", self._adapter)
+        session.mount("https://", self._adapter)
+        session.headers.update(self.headers)
+        return session
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Return counts of LLM connections opened versus reused."""
+        opened = sent = 0
+        with self._stats_lock:
+            pools = self._adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                try:
+                    pool = pools[key]
+                except KeyError:
+                    continue
+                opened += getattr(pool, "num_connections", 0)
+                sent += getattr(pool, "num_requests", 0)
+        return {"opened": opened, "reused": max(sent - opened, 0), "requests": sent}
+
+    def close(self) -> None:
+        """Release pooled connections and write pending cache changes."""
+        self.session.close()
+        self._release_aclient()
+        self.cache.flush()
+
+    def _release_aclient(self) -> None:
+        """Close the async client on the loop that owns its connections."""
+        client, loop = self._aclient, self._aclient_loop
+        self._aclient = self._aclient_loop = None
+        if client is None or loop is None:
+            return
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        elif not loop.is_closed():
+            loop.run_until_complete(client.aclose())
+        else:
+            # Its sockets cannot be shut down without their loop; dropping
+            # the client lets the transports close them when collected.
+            self.logger.debug("dropping async LLM client of a closed event loop")
 
     def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         if DEBUG:
             print("[POST]", payload)
 
-        openai_key = os.getenv("OPENAI_API_KEY")
-        api_base = os.getenv("API_BASE_URL") or (
-            "https://api.openai.com" if openai_key else "http://localhost:11434"
+        prompt = self.prompt()
+        body = prompt.encode(payload)
+        opened_before = self.connection_stats()["opened"]
+        start = time.time()
+        resp = self.session.post(self.url, data=body, timeout=self.timeout)
+        latency = (time.time() - start) * 1000
+        reused = self.connection_stats()["opened"] == opened_before
+        tokens = prompt.count(payload)
+        self.logger.info(
+            "llm_request latency_ms=%d reused=%s prompt_tokens~%d",
+            latency,
+            reused,
+            tokens,
+            extra={"latency_ms": int(latency), "reused": reused, "prompt_tokens_est": tokens},
         )
-        endpoint = "/v1/chat/completions"
-        url = f"{api_base}{endpoint}"
+        if resp.status_code >= 400:
+            raise RuntimeError(f"LLM error {resp.status_code}: {resp.text}")
+        return resp.json()
 
-        headers = {"Content-Type": "application/json"}
-        if openai_key:
-            headers["Authorization"] = f"Bearer {openai_key}"
+    def prompt(self) -> PreparedPrompt:
+        """The prepared request body, rebuilt only when the prompt or tools change."""
+        version = registry_version()
+        if self.tools is self._built_tools and self._prompt_src and self._prompt_src[-1] != version:
+            self.tools = self._built_tools = self._build_tools()
+        src = (self.system_prompt, id(self.tools), len(self.tools), self.compact_tools, version)
+        if self._prompt is None or src != self._prompt_src:
+            tools = self.tools
+            if self.compact_tools:
+                tools = compact_tools(tools, _REGISTRY, LLM_COMPACT_EXCLUDE)
+            self._prompt = PreparedPrompt(self.system_prompt, tools)
+            self._prompt_src = src
+            self.logger.debug("router prompt prepared: %s", self._prompt.stats())
+        return self._prompt
+
+    def _schema_fingerprint(self) -> str:
+        """Digest of the prompt and tool schemas, recomputed only when they change."""
+        return self.prompt().fingerprint
 
+    def prompt_stats(self) -> Dict[str, Any]:
+        """Size of the static prompt, plus the prompt tokens the server last reported."""
+        return {
+            **self.prompt().stats(),
+            "compact": self.compact_tools,
+            "prompt_tokens": self.prompt_tokens,
+        }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters of the routing cache."""
+        return self.cache.stats()
+
+    def _post_stream(
+        self, payload: Dict[str, Any], on_token: Callable[[str], None] | None = None
+    ) -> Dict[str, Any]:
+        """POST with ``stream: true`` and return as soon as the reply is actionable."""
+        if DEBUG:
+            print("[POST]", payload)
+
+        body = self.prompt().encode(payload, stream=True)
         start = time.time()
-        resp = requests.post(url, json=payload, timeout=4, headers=headers)
+        resp = self.session.post(self.url, data=body, timeout=self.timeout, stream=True)
+        if resp.status_code >= 400:
+            text = resp.text
+            resp.close()
+            raise RuntimeError(f"LLM error {resp.status_code}: {text}")
+        acc = StreamAccumulator(on_token)
+        lines = resp.iter_lines()
+        done = False
+        try:
+            for line in lines:
+                if line and acc.feed(line):
+                    done = True
+                    break
+        except BaseException:
+            resp.close()
+            raise
         latency = (time.time() - start) * 1000
-        self.logger.info("llm_request", extra={"latency_ms": int(latency)})
+        self.logger.info(
+            "llm_stream latency_ms=%d", latency, extra={"latency_ms": int(latency)}
+        )
+        if done:
+            # Drain the tail (finish chunk and ``[DONE]``) off the caller's
+            # thread so the connection goes back to the pool.
+            threading.Thread(target=self._drain, args=(resp, lines), daemon=True).start()
+        else:
+            resp.close()
+        return {"choices": [acc.choice()]}
+
+    @staticmethod
+    def _drain(resp: Any, lines: Iterator[Any]) -> None:
+        try:
+            for _ in lines:
+                pass
+        except Exception:
+            pass
+        finally:
+            resp.close()
+
+    def _async_client(self) -> Any | None:
+        """Return the pooled ``httpx.AsyncClient`` for the running loop, if available."""
+        try:
+            import httpx
+        except ImportError:  # pragma: no cover - optional dependency
+            return None
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._release_aclient()
+            keepalive = LLM_POOL_SIZE if LLM_KEEPALIVE else 0
+            self._aclient = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=LLM_POOL_SIZE,
+                    max_keepalive_connections=keepalive,
+                ),
+            )
+            self._aclient_loop = loop
+        return self._aclient
+
+    async def _apost(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        client = self._async_client()
+        if client is None:
+            return await asyncio.to_thread(self._post, payload)
+        import httpx
+
+        if DEBUG:
+            print("[POST]", payload)
+        prompt = self.prompt()
+        body = prompt.encode(payload)
+        start = time.time()
+        try:
+            resp = await client.post(self.url, content=body)
+        except httpx.HTTPError as exc:
+            raise RequestException(str(exc)) from exc
+        latency = (time.time() - start) * 1000
+        tokens = prompt.count(payload)
+        self.logger.info(
+            "llm_request latency_ms=%d prompt_tokens~%d",
+            latency,
+            tokens,
+            extra={"latency_ms": int(latency), "prompt_tokens_est": tokens},
+        )
         if resp.status_code >= 400:
             raise RuntimeError(f"LLM error {resp.status_code}: {resp.text}")
         return resp.json()
 
-    def route(self, text: str) -> Tuple[str | None, Dict[str, Any], str]:
+    async def _apost_stream(
+        self, payload: Dict[str, Any], on_token: Callable[[str], None] | None = None
+    ) -> Dict[str, Any]:
+        client = self._async_client()
+        if client is None:
+            return await asyncio.to_thread(self._post_stream, payload, on_token)
+        import httpx
+
+        if DEBUG:
+            print("[POST]", payload)
+        body = self.prompt().encode(payload, stream=True)
+        start = time.time()
+        acc = StreamAccumulator(on_token)
+        try:
+            async with client.stream("POST", self.url, content=body) as resp:
+                if resp.status_code >= 400:
+                    await resp.aread()
+                    raise RuntimeError(f"LLM error {resp.status_code}: {resp.text}")
+                async for line in resp.aiter_lines():
+                    if line and acc.feed(line):
+                        break
+        except httpx.HTTPError as exc:
+            raise RequestException(str(exc)) from exc
+        latency = (time.time() - start) * 1000
+        self.logger.info(
+            "llm_stream latency_ms=%d", latency, extra={"latency_ms": int(latency)}
+        )
+        return {"choices": [acc.choice()]}
+
+    async def aclose(self) -> None:
+        """Release pooled connections of both the sync and async clients."""
+        client = self._aclient if self._aclient_loop is asyncio.get_running_loop() else None
+        if client is not None:
+            self._aclient = self._aclient_loop = None
+            await client.aclose()
+        self.close()
+
+    def _prepare(
+        self, text: str
+    ) -> Tuple[Decision | None, str, Tuple[str, Dict[str, Any]] | None, Dict[str, Any]]:
+        """Return ``(early_result, cache_key, fallback, payload)`` for *text*."""
         if m := re.search(r"(https?://\S+)", text):
-            return "open_website", {"url": m.group(1)}, "open_website"
+            return ("open_website", {"url": m.group(1)}, "open_website"), "", None, {}
+
+        cache_key = self.cache.key(text, MODEL_NAME, self._schema_fingerprint())
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached, cache_key, None, {}
 
         fallback: Tuple[str, Dict[str, Any]] | None = None
         if text.lower().startswith("play "):
             fallback = ("play_music", {"url": None, "query": text[5:].strip()})
 
-        tools = self.tools
-
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": text},
-        ]
-        payload = {
-            "model": MODEL_NAME,
-            "messages": messages,
-            "tools": tools,
-            "tool_choice": "auto",
-            "max_tokens": 64,
-        }
+        payload = self.prompt().payload(text)
+        return None, cache_key, fallback, payload
+
+    def _failed(
+        self, exc: Exception, fallback: Tuple[str, Dict[str, Any]] | None
+    ) -> Tuple[str | None, Dict[str, Any], str]:
+        self.logger.error("llm_request_failed", extra={"error": str(exc)})
+        if fallback:
+            name, args = fallback
+            return name, args, name
+        return None, {"error": str(exc)}, "error"
+
+    def _finish(self, cache_key: str, data: Dict[str, Any]) -> Tuple[str | None, Dict[str, Any], str]:
+        usage = data.get("usage") or {}
+        if "prompt_tokens" in usage:
+            self.prompt_tokens = usage["prompt_tokens"]
+        result = self._parse_response(data)
+        # Only tool decisions are stable; chat replies ("what time is it")
+        # would be served stale for the whole TTL.
+        if result[2] not in ("chat", "error", "unknown"):
+            self.cache.put(cache_key, result)
+        return result
+
+    def route(
+        self, text: str, on_token: Callable[[str], None] | None = None
+    ) -> Tuple[str | None, Dict[str, Any], str]:
+        """Map *text* to a tool call or chat reply.
+
+        In streaming mode conversational tokens are passed to *on_token* as
+        they arrive; the full reply is still returned.
+        """
+        early, cache_key, fallback, payload = self._prepare(text)
+        if early is not None:
+            return early
         try:
-            data = self._post(payload)
+            with tracing.span("llm_route"):
+                if self.stream:
+                    data = self._post_stream(payload, on_token)
+                else:
+                    data = self._post(payload)
         except RequestException as exc:
-            self.logger.error("llm_request_failed", extra={"error": str(exc)})
-            if fallback:
-                name, args = fallback
-                return name, args, name
-            return None, {"error": str(exc)}, "error"
+            return self._failed(exc, fallback)
+        return self._finish(cache_key, data)
 
+    async def aroute(
+        self, text: str, on_token: Callable[[str], None] | None = None
+    ) -> Tuple[str | None, Dict[str, Any], str]:
+        """Asynchronous :meth:`route` that never blocks the event loop."""
+        early, cache_key, fallback, payload = self._prepare(text)
+        if early is not None:
+            return early
+        try:
+            with tracing.span("llm_route"):
+                if self.stream:
+                    data = await self._apost_stream(payload, on_token)
+                else:
+                    data = await self._apost(payload)
+        except RequestException as exc:
+            return self._failed(exc, fallback)
+        return self._finish(cache_key, data)
+
+    def _validate(self, name: str, args: Dict[str, Any]) -> None:
+        """Check *args* against the schema of tool *name*; raises ``ValidationError``."""
+        validate_tool_args(name, args)
+
+    def _parse_response(self, data: Dict[str, Any]) -> Tuple[str | None, Dict[str, Any], str]:
         choice = data.get("choices", [{}])[0]
         finish = choice.get("finish_reason")
         msg = choice.get("message", {})
@@ -128,8 +512,11 @@ class IntentRouter:
                 args = json.loads(args_json)
             except json.JSONDecodeError:
                 args = {}
+            from jsonschema import ValidationError
+
             try:
-                validate_tool_args(name or "", args)
+                with tracing.span("validate", tool=name):
+                    self._validate(name or "", args)
             except ValidationError as exc:
                 self.logger.warning(
                     "schema_validation_failed",
@@ -0,0 +1,132 @@
+"""Ordered regex rule sets behind a single keyword prefilter."""
+
+from __future__ import annotations
+
+import functools
+import operator
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Match, Pattern, Sequence, Tuple
+
+from rapidfuzz import process
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    pattern: Pattern[str]
+    keywords: Tuple[str, ...]
+    arg: str
+    group: int | str = 1
+
+
+class RuleSet:
+    """Evaluate *rules* in order, but only those whose keywords occur in the text.
+
+    Every rule's pattern must require at least one of its keywords, so a rule
+    whose keywords are all absent cannot match. All keywords are compiled into
+    one lookahead alternation and found in a single scan of the lower-cased
+    text. The scan tests every position, so overlapping keywords are all
+    seen. The longest keyword at a position also carries the rules of any
+    keyword that is a prefix of it.
+    """
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules: Tuple[Rule, ...] = tuple(rules)
+        masks: Dict[str, int] = {}
+        for i, rule in enumerate(self.rules):
+            for kw in rule.keywords:
+                masks[kw.lower()] = masks.get(kw.lower(), 0) | (1 << i)
+        self._masks = {
+            kw: functools.reduce(
+                operator.or_, (m for other, m in masks.items() if kw.startswith(other))
+            )
+            for kw in masks
+        }
+        alternation = "|".join(
+            re.escape(kw) for kw in sorted(masks, key=len, reverse=True)
+        )
+        # Case-sensitive on lower-cased input: re.I makes the scan ~4x slower.
+        self._prefilter = re.compile(f"(?=({alternation}))")
+        self._by_mask: Dict[int, List[Rule]] = {}
+
+    def candidates(self, text: str) -> List[Rule]:
+        """Return the rules that could match *text*, in priority order."""
+        mask = 0
+        masks = self._masks
+        for kw in self._prefilter.findall(text.lower()):
+            mask |= masks[kw]
+        found = self._by_mask.get(mask)
+        if found is None:
+            found = [rule for i, rule in enumerate(self.rules) if mask >> i & 1]
+            self._by_mask[mask] = found
+        return found
+
+    def match(self, text: str) -> Tuple[Rule, Match[str]] | None:
+        """Return the first rule (by priority) matching *text* and its match."""
+        for rule in self.candidates(text):
+            m = rule.pattern.search(text)
+            if m:
+                return rule, m
+        return None
+
+
+class FuzzyCatalogue:
+    """Phrase variants per intent, flattened once for batched rapidfuzz scoring.
+
+    Phrases are lower-cased and de-duplicated up front so queries skip
+    rapidfuzz's per-call preprocessing. ``extractOne`` and ``cdist`` with
+    ``score_cutoff`` drop weak candidates early, so the catalogue can hold
+    hundreds of variants per intent. Ties go to the first intent in
+    catalogue order, as the old ``max`` over a dict did.
+    """
+
+    def __init__(self, choices: Mapping[str, Iterable[str]], scorer: Callable[..., float]) -> None:
+        self.scorer = scorer
+        self.labels: List[str] = []
+        self.phrases: List[str] = []
+        seen: set[str] = set()
+        for name, variants in choices.items():
+            if isinstance(variants, str):
+                variants = (variants,)
+            for phrase in variants:
+                phrase = " ".join(phrase.lower().split())
+                if phrase and phrase not in seen:
+                    seen.add(phrase)
+                    self.labels.append(name)
+                    self.phrases.append(phrase)
+
+    def best(self, text: str, cutoff: float = 0) -> Tuple[str, str, float] | None:
+        """Return ``(intent, phrase, score)`` of the best variant scoring >= *cutoff*."""
+        hit = process.extractOne(
+            text, self.phrases, scorer=self.scorer, processor=None, score_cutoff=cutoff
+        )
+        if hit is None:
+            return None
+        phrase, score, index = hit
+        return self.labels[index], phrase, score
+
+    def best_many(
+        self, texts: Sequence[str], cutoff: float = 0
+    ) -> List[Tuple[str, str, float] | None]:
+        """:meth:`best` for many texts at once via ``process.cdist``."""
+        if not texts:
+            return []
+        matrix = process.cdist(
+            list(texts),
+            self.phrases,
+            scorer=self.scorer,
+            processor=None,
+            score_cutoff=cutoff,
+            workers=-1,
+        )
+        out: List[Tuple[str, str, float] | None] = []
+        for row in matrix:
+            # First maximum on ties, like extractOne.
+            index = int(row.argmax())
+            score = row[index]
+            if score >= cutoff:
+                out.append((self.labels[index], self.phrases[index], float(score)))
+            else:
+                out.append(None)
+        return out
@@ -0,0 +1,136 @@
+"""Static parts of the router's chat request, encoded once.
+
+Every routing request sends the same model name, system prompt and tool
+definitions, and only the user's text changes. :class:`PreparedPrompt`
+serializes everything except the user's text into two byte strings when
+it is built. Encoding a request then takes one small ``json.dumps`` and
+two concatenations. :func:`compact_tools` shrinks the tool definitions for
+small local models, whose prompt-eval time grows with every token.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Iterable, List
+
+from .config import MODEL_NAME
+from .route_cache import schema_hash
+
+_USER_SLOT = "\x00kyra-user\x00"
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d|[^\sA-Za-z\d]")
+
+
+def dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE token count: one per digit or symbol and per ~6 letters of a word.
+
+    Close enough to the Llama/Mistral tokenizers to track prompt size;
+    prefer ``usage.prompt_tokens`` from the server when it reports one.
+    """
+    return sum(1 + len(m) // 6 for m in _TOKEN_RE.findall(text))
+
+
+def _strip_descriptions(schema: Any) -> Any:
+    if not isinstance(schema, dict):
+        return schema
+    out: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key == "description" or (key == "required" and not value):
+            continue
+        if key == "properties" and isinstance(value, dict):
+            out[key] = {prop: _strip_descriptions(sub) for prop, sub in value.items()}
+        else:
+            out[key] = _strip_descriptions(value)
+    return out
+
+
+def compact_tools(
+    tools: List[Dict[str, Any]], registered: Iterable[str], exclude: Iterable[str] = ()
+) -> List[Dict[str, Any]]:
+    """Trim *tools* to what a small model needs to pick one.
+
+    Tools that are not *registered* or are in *exclude* are dropped. Each
+    description is cut to its first sentence. Parameter descriptions and
+    empty ``required`` lists are removed.
+    """
+    registered, exclude = set(registered), set(exclude)
+    out = []
+    for t in tools:
+        fn = t.get("function", {})
+        name = fn.get("name")
+        if name not in registered or name in exclude:
+            continue
+        desc = fn.get("description", "").split(". ")[0].strip().rstrip(".")
+        out.append(
+            {
+                "type": "function",
+                "function": {
+                    "name": name,
+                    "description": desc,
+                    "parameters": _strip_descriptions(fn.get("parameters", {})),
+                },
+            }
+        )
+    return out
+
+
+class PreparedPrompt:
+    """A chat-completion body with a slot for the user's text."""
+
+    def __init__(self, system_prompt: str, tools: List[Dict[str, Any]], max_tokens: int = 64) -> None:
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.tools = tools
+        self.max_tokens = max_tokens
+        doc = dumps(self.payload(_USER_SLOT))
+        head, tail = doc.split(dumps(_USER_SLOT))
+        self.head = head.encode("utf-8")
+        self.tail = tail.encode("utf-8")
+        self.stream_tail = (tail[:-1] + ',"stream":true}').encode("utf-8")
+        self.fingerprint = schema_hash(system_prompt, tools)
+        self.tokens = estimate_tokens(head + tail)
+
+    def payload(self, text: str) -> Dict[str, Any]:
+        return {
+            "model": MODEL_NAME,
+            "tools": self.tools,
+            "tool_choice": "auto",
+            "max_tokens": self.max_tokens,
+            "messages": [self.system_message, {"role": "user", "content": text}],
+        }
+
+    def _owns(self, payload: Dict[str, Any]) -> bool:
+        messages = payload.get("messages")
+        return (
+            len(payload) == 5
+            and payload.get("model") == MODEL_NAME
+            and payload.get("tool_choice") == "auto"
+            and payload.get("tools") is self.tools
+            and payload.get("max_tokens") == self.max_tokens
+            and isinstance(messages, list)
+            and len(messages) == 2
+            and messages[0] is self.system_message
+        )
+
+    def encode(self, payload: Dict[str, Any], stream: bool = False) -> bytes:
+        """JSON body for *payload*, reusing the prepared bytes when it came from :meth:`payload`."""
+        if self._owns(payload):
+            user = dumps(payload["messages"][1]["content"]).encode("utf-8")
+            return self.head + user + (self.stream_tail if stream else self.tail)
+        return dumps({**payload, "stream": True} if stream else payload).encode("utf-8")
+
+    def count(self, payload: Dict[str, Any]) -> int:
+        """Estimated prompt tokens of *payload*."""
+        if self._owns(payload):
+            return self.tokens + estimate_tokens(payload["messages"][1]["content"])
+        return estimate_tokens(dumps(payload))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tools": len(self.tools),
+            "bytes": len(self.head) + len(self.tail),
+            "tokens_est": self.tokens,
+        }
@@ -0,0 +1,177 @@
+"""LRU/TTL cache of LLM routing decisions with optional on-disk persistence."""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+Decision = Tuple[Optional[str], Dict[str, Any], str]
+
+logger = logging.getLogger(__name__)
+
+_PUNCT_RE = re.compile(r"[?!,;\"']+")
+
+
+def normalize_utterance(text: str) -> str:
+    """Lower-case *text* and strip punctuation that does not change intent."""
+    text = _PUNCT_RE.sub(" ", text.lower())
+    return " ".join(text.split()).rstrip(".")
+
+
+def schema_hash(*parts: Any) -> str:
+    """Return a short stable digest of JSON-serialisable *parts*."""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class RouteCache:
+    """Size-bounded LRU map of ``(name, args, intent)`` routing decisions.
+
+    Entries older than *ttl* seconds are treated as misses. When *path* is
+    given the cache is loaded from a JSON file and saved back to it so it
+    survives restarts. Saves run on a timer thread *save_delay* seconds
+    after the first change, so a burst of misses costs one write and
+    :meth:`put` never touches the disk on the caller's thread. Pending
+    changes are written by :meth:`flush` and at exit.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl: float = 86400.0,
+        path: str | None = None,
+        save_delay: float = 1.0,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.save_delay = save_delay
+        self._data: "OrderedDict[str, Tuple[float, Decision]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        if path:
+            self._load()
+            atexit.register(self.flush)
+
+    @staticmethod
+    def key(text: str, model: str, schema: str) -> str:
+        return f"{model}\x1f{schema}\x1f{normalize_utterance(text)}"
+
+    def get(self, key: str) -> Decision | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored, (name, args, intent) = entry
+            if self.ttl and time.time() - stored > self.ttl:
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        # Callers mutate the returned args, so hand out a copy.
+        return name, dict(args), intent
+
+    def put(self, key: str, decision: Decision) -> None:
+        name, args, intent = decision
+        with self._lock:
+            self._data[key] = (time.time(), (name, dict(args), intent))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            self._schedule_save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        # Called with the lock held.
+        if not self.path:
+            return
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes to *path* now."""
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                rows = [
+                    [key, stored, name, args, intent]
+                    for key, (stored, (name, args, intent)) in self._data.items()
+                ]
+            self._save(rows)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:  # type: ignore[arg-type]
+                rows = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            logger.warning("route cache unreadable: %s", exc)
+            return
+        now = time.time()
+        skipped = 0
+        for row in rows[-self.max_size :] if isinstance(rows, list) else ():
+            try:
+                key, stored, name, args, intent = row
+                if not isinstance(key, str) or not isinstance(args, dict):
+                    raise TypeError(row)
+                if self.ttl and now - float(stored) > self.ttl:
+                    continue
+                self._data[key] = (float(stored), (name, args, intent))
+            except (TypeError, ValueError):
+                skipped += 1
+        if skipped:
+            logger.warning("route cache: skipped %d bad rows", skipped)
+
+    def _save(self, rows: List[List[Any]]) -> None:
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rows, f)
+            os.replace(tmp, self.path)  # type: ignore[arg-type]
+        except OSError as exc:
+            logger.warning("route cache not saved: %s", exc)
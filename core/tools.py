@@ -2,11 +2,19 @@ from __future__ import annotations
 
 import inspect
 import functools
-import fnmatch
 from typing import Callable, Dict, Tuple, Any, List
 import re
 import urllib.parse
 
+from . import file_index
+from .config import (
+    FILE_SEARCH_DEADLINE,
+    FILE_SEARCH_EXCLUDES,
+    FILE_SEARCH_WORKERS,
+    TOOL_TIMEOUT,
+)
+from .executor import abandoned
+from .file_search import find_files
 from .utils import derive_glob_from_phrase
 
 __all__ = [
@@ -22,12 +30,14 @@ __all__ = [
     "install_cmd",
     "uninstall_cmd",
     "list_tools",
+    "registry_version",
     "get_openai_tools",
     "validate_tool_args",
     "derive_glob_from_phrase",
 ]
 
 _REGISTRY: Dict[str, Dict[str, Any]] = {}
+_REGISTRY_VERSION = 0
 
 # Tool schemas used for OpenAI function calling
 TOOL_SCHEMAS: List[Dict[str, Any]] = [
@@ -76,19 +86,38 @@ TOOL_SCHEMAS: List[Dict[str, Any]] = [
 _TOOL_SCHEMA_MAP = {s["name"]: s["parameters"] for s in TOOL_SCHEMAS}
 
 
-def tool(fn: Callable[..., Tuple[bool, str]]) -> Callable[..., Tuple[bool, str]]:
-    """Register a function as an assistant tool."""
-    _REGISTRY[fn.__name__] = {
-        "signature": str(inspect.signature(fn)),
-        "doc": inspect.getdoc(fn) or "",
-        "callable": fn,
-    }
+def tool(
+    fn: Callable[..., Any] | None = None, *, timeout: float | None = TOOL_TIMEOUT
+) -> Any:
+    """Register a function as an assistant tool.
+
+    Use as ``@tool`` or ``@tool(timeout=seconds)``; *timeout* is the deadline
+    :class:`core.executor.ToolExecutor` applies (``None`` for no limit).
+    Coroutine functions are accepted and awaited on the event loop.
+    """
+
+    def register(fn: Callable[..., Any]) -> Callable[..., Any]:
+        global _REGISTRY_VERSION
+        _REGISTRY_VERSION += 1
+        _REGISTRY[fn.__name__] = {
+            "signature": str(inspect.signature(fn)),
+            "doc": inspect.getdoc(fn) or "",
+            "callable": fn,
+            "timeout": timeout,
+        }
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return fn(*args, **kwargs)
+
+        return wrapper
 
-    @functools.wraps(fn)
-    def wrapper(*args: Any, **kwargs: Any) -> Tuple[bool, str]:
-        return fn(*args, **kwargs)
+    return register if fn is None else register(fn)
 
-    return wrapper
+
+def registry_version() -> int:
+    """Counter bumped on every registration, for caches derived from the registry."""
+    return _REGISTRY_VERSION
 
 
 def list_tools() -> Dict[str, Dict[str, str]]:
@@ -199,18 +228,26 @@ def launch_app(*, app: str | None = None, program: str | None = None, path: str
         return False, str(exc)
 
 
-@tool
+@tool(timeout=FILE_SEARCH_DEADLINE + 2)
 def search_files(directory: str, pattern: str, **_unused: Any) -> Tuple[bool, str]:
     """Search for files under a directory."""
     root = os.path.expanduser(directory)
     glob_pattern = derive_glob_from_phrase(pattern)
-    matches: List[str] = []
-    for dirpath, _dirs, files in os.walk(root):
-        for f in files:
-            if fnmatch.fnmatch(f.lower(), glob_pattern.lower()):
-                matches.append(os.path.join(dirpath, f))
+    # An index miss may be a file newer than the last refresh, and a hit one
+    # deleted since, so drop vanished paths and walk when none are left.
+    indexed = [p for p in file_index.query(root, glob_pattern, limit=5) or () if os.path.exists(p)]
+    if indexed:
+        return True, "; ".join(indexed)
+    matches = find_files(
+        root,
+        glob_pattern,
+        limit=5,
+        deadline=FILE_SEARCH_DEADLINE,
+        excludes=FILE_SEARCH_EXCLUDES,
+        workers=FILE_SEARCH_WORKERS,
+    )
     if matches:
-        return True, "; ".join(matches[:5])
+        return True, "; ".join(matches)
     return False, "No files found"
 
 
@@ -249,14 +286,25 @@ def open_explorer(path: str) -> Tuple[bool, str]:
         return False, str(exc)
 
 
-@tool
+@tool(timeout=FILE_SEARCH_DEADLINE + 2)
 def find_file_and_open(name: str, directory: str | None = None) -> Tuple[bool, str]:
     """Search for *name* under *directory* and open the first match."""
     root = os.path.expanduser(directory or ".")
-    for dirpath, _dirs, files in os.walk(root):
-        for f in files:
-            if fnmatch.fnmatch(f.lower(), name.lower()):
-                return open_explorer(os.path.join(dirpath, f))
+    indexed = [p for p in file_index.query(root, name, limit=5) or () if os.path.exists(p)]
+    if indexed:
+        return open_explorer(indexed[0])
+    matches = find_files(
+        root,
+        name,
+        limit=1,
+        deadline=FILE_SEARCH_DEADLINE,
+        excludes=FILE_SEARCH_EXCLUDES,
+        workers=FILE_SEARCH_WORKERS,
+    )
+    if abandoned():
+        return False, "Search cancelled"
+    if matches:
+        return open_explorer(matches[0])
     return False, "No file found"
 
 
@@ -274,7 +322,7 @@ def create_note(content: str, directory: str = "notes") -> Tuple[bool, str]:
     except Exception as exc:  # pragma: no cover - platform dependent
         return False, str(exc)
 
-@tool
+@tool(timeout=None)
 def install_cmd() -> Tuple[bool, str]:
     """Install Kyra system-wide with a `Kyra` command."""
     import shutil
@@ -299,7 +347,7 @@ def install_cmd() -> Tuple[bool, str]:
             with open(launcher, "w", newline="") as f:
                 f.write("@echo off\n")
                 f.write(f'cd /d "{target}"\n')
-                f.write(f'"{os.path.join(venv_dir, "Scripts", "python.exe")}" -m app.assistant %*\n')
+                f.write(f'"{os.path.join(venv_dir, "Scripts", "python.exe")}" -m app.client %*\n')
             return True, f"Installed to {target}"
         except Exception as exc:  # pragma: no cover - platform dependent
             return False, str(exc)
@@ -316,7 +364,7 @@ def install_cmd() -> Tuple[bool, str]:
             content = (
                 "#!/bin/sh\n"
                 f'cd "{dest}"\n'
-                f'exec {sys.executable} -m app.assistant "$@"\n'
+                f'exec {sys.executable} -m app.client "$@"\n'
             )
             with open(script, "w", newline="") as f:
                 f.write(content)
@@ -0,0 +1,258 @@
+"""Per-command spans aggregated into latency histograms.
+
+Each command gets a short ID when the wake word fires, or when typed text
+arrives. Pipeline stages record spans against it: wake, ASR final, rules,
+LLM route, validation, tool, TTS synth and first audio. Spans feed
+fixed-bucket histograms in memory. They can optionally be appended to a
+JSONL file, and :func:`prometheus_text` renders the histograms in the
+Prometheus text format.
+
+When tracing is off, :func:`span` returns a shared no-op context manager and
+:func:`record` returns at once, so instrumented code pays one attribute
+check.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import itertools
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, TextIO
+
+from .config import TRACE, TRACE_JSONL, TRACE_PROMETHEUS
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets in milliseconds; the last is +Inf.
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_NULL = contextlib.nullcontext()
+_command: contextvars.ContextVar[str | None] = contextvars.ContextVar("kyra_command", default=None)
+_ids = itertools.count(1)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the *q* quantile (max for +Inf)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class Tracer:
+    """Histogram registry plus an optional JSONL span writer."""
+
+    def __init__(
+        self, enabled: bool = False, jsonl: str | None = None, prometheus: str | None = None
+    ) -> None:
+        self.enabled = enabled
+        self.jsonl = jsonl
+        self.prometheus = prometheus
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._q: "queue.SimpleQueue[Any] | None" = None
+
+    def record(self, name: str, ms: float, **attrs: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(ms)
+        if self.jsonl:
+            item = {"ts": round(time.time(), 3), "cmd": _command.get(), "span": name}
+            self._write({**item, "ms": round(ms, 3), **attrs})
+
+    def _write(self, item: Dict[str, Any]) -> None:
+        if self._q is None:
+            with self._lock:
+                if self._q is None:
+                    self._q = queue.SimpleQueue()
+                    threading.Thread(target=self._writer, name="trace-jsonl", daemon=True).start()
+        self._q.put(item)
+
+    def _writer(self) -> None:
+        assert self._q is not None and self.jsonl
+        with open(self.jsonl, "a", encoding="utf-8") as fh:
+            while True:
+                item = self._q.get()
+                if isinstance(item, threading.Event):
+                    fh.flush()
+                    item.set()
+                    continue
+                fh.write(json.dumps(item) + "\n")
+                if self._q.empty():
+                    fh.flush()
+
+    def flush(self, timeout: float = 2.0) -> None:
+        if self._q is not None:
+            done = threading.Event()
+            self._q.put(done)
+            done.wait(timeout)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: h.summary() for name, h in sorted(self.histograms.items())}
+
+    def prometheus_text(self) -> str:
+        lines = [
+            "# HELP kyra_span_ms Latency of Kyra pipeline stages in milliseconds.",
+            "# TYPE kyra_span_ms histogram",
+        ]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip([*BUCKETS_MS, "+Inf"], h.counts):
+                    cumulative += n
+                    lines.append(f'kyra_span_ms_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'kyra_span_ms_sum{{span="{name}"}} {h.sum_ms:.3f}')
+                lines.append(f'kyra_span_ms_count{{span="{name}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+
+
+TRACER = Tracer(TRACE, TRACE_JSONL, TRACE_PROMETHEUS)
+
+
+def enable(jsonl: str | None = None, prometheus: str | None = None) -> None:
+    TRACER.enabled = True
+    TRACER.jsonl = jsonl or TRACER.jsonl
+    TRACER.prometheus = prometheus or TRACER.prometheus
+
+
+def begin() -> str:
+    """Start a new command and make it current in this context; return its ID."""
+    cmd = f"{next(_ids):06x}"
+    _command.set(cmd)
+    return cmd
+
+
+def set_command(cmd: str | None) -> None:
+    _command.set(cmd)
+
+
+def current() -> str | None:
+    return _command.get()
+
+
+def record(name: str, ms: float, **attrs: Any) -> None:
+    """Record a span of *ms* milliseconds that was timed elsewhere."""
+    if TRACER.enabled:
+        TRACER.record(name, ms, **attrs)
+
+
+@contextlib.contextmanager
+def _timed(name: str, attrs: Dict[str, Any]) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        TRACER.record(name, (time.perf_counter() - start) * 1000, **attrs)
+
+
+def span(name: str, **attrs: Any) -> Any:
+    """Context manager timing the enclosed block as span *name*."""
+    if not TRACER.enabled:
+        return _NULL
+    return _timed(name, attrs)
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    return TRACER.snapshot()
+
+
+def prometheus_text() -> str:
+    return TRACER.prometheus_text()
+
+
+def dump(out: TextIO | None = None) -> None:
+    """Print a per-span summary to *out* and write the configured export files."""
+    out = out or sys.stderr
+    stats = snapshot()
+    out.write(f"{'span':14s} {'count':>6s} {'mean':>9s} {'p50':>7s} {'p95':>7s} {'p99':>7s} {'max':>9s}\n")
+    for name, s in stats.items():
+        out.write(
+            f"{name:14s} {s['count']:6d} {s['mean_ms']:9.2f} {s['p50_ms']:7g} "
+            f"{s['p95_ms']:7g} {s['p99_ms']:7g} {s['max_ms']:9.2f}\n"
+        )
+    out.flush()
+    TRACER.flush()
+    if TRACER.prometheus:
+        with open(TRACER.prometheus, "w", encoding="utf-8") as fh:
+            fh.write(prometheus_text())
+
+
+_dump_requests: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+_dump_thread: threading.Thread | None = None
+
+
+def _dump_on_request() -> None:
+    while True:
+        _dump_requests.get()
+        try:
+            dump()
+        except Exception as exc:
+            logger.warning("trace dump failed: %s", exc)
+
+
+def install_signal_handler() -> bool:
+    """Dump the histograms on ``SIGUSR1`` where the platform has it.
+
+    The handler only queues a request (``SimpleQueue.put`` is reentrant);
+    a daemon thread does the dump. The main thread never takes the tracer
+    lock or waits on the JSONL writer inside a signal handler.
+    """
+    import signal
+
+    global _dump_thread
+    sig = getattr(signal, "SIGUSR1", None)
+    if sig is None or threading.current_thread() is not threading.main_thread():
+        return False
+    if _dump_thread is None:
+        _dump_thread = threading.Thread(target=_dump_on_request, name="trace-dump", daemon=True)
+        _dump_thread.start()
+    signal.signal(sig, lambda *_: _dump_requests.put(sig))
+    return True
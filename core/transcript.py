@@ -1,36 +1,177 @@
 from __future__ import annotations
 
+import atexit
+import contextlib
 import os
-from rich.console import Console
-from rich.text import Text
+import queue
+import threading
+import time
+from typing import Any, List
+
+from .config import TRANSCRIPT_BACKUPS, TRANSCRIPT_MAX_AGE, TRANSCRIPT_MAX_BYTES
+
+_COLORS = {
+    "PART": "grey50",
+    "USER": "cyan",
+    "BOT": "green",
+    "SAY": "magenta",
+    "ERR": "red",
+}
 
 
 class Transcript:
-    def __init__(self, enable: bool) -> None:
+    """Console and file log of the conversation.
+
+    :meth:`log` only enqueues. The console and the file each have their own
+    background thread, so a slow ``rich`` render or a disk stall never
+    holds up the caller. The file writer batches lines every
+    *flush_interval* seconds. It rotates the segment by renaming it once it
+    passes *max_bytes* or *max_age* seconds, and keeps at most *backups*
+    old segments.
+    """
+
+    def __init__(
+        self,
+        enable: bool,
+        file: str | None = "transcript.txt",
+        *,
+        console: bool = True,
+        max_bytes: int = TRANSCRIPT_MAX_BYTES,
+        max_age: float | None = TRANSCRIPT_MAX_AGE,
+        backups: int = TRANSCRIPT_BACKUPS,
+        flush_interval: float = 0.5,
+    ) -> None:
         self.enable = enable
-        self.console = Console()
-        self.file = "transcript.txt"
-
-    def _append(self, line: str) -> None:
-        with open(self.file, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-        if os.path.getsize(self.file) > 1_000_000:
-            with open(self.file, "rb") as f:
-                f.seek(-1_000_000, os.SEEK_END)
-                data = f.read()
-            with open(self.file, "wb") as f:
-                f.write(data)
+        self.console: Any = None  # rich is imported by the console thread
+        self.file = file
+        self.to_console = console
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.rotations = 0
+        self._console_q: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._file_q: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._wake = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            if self.to_console:
+                threading.Thread(
+                    target=self._console_worker, name="transcript-console", daemon=True
+                ).start()
+            if self.file:
+                threading.Thread(
+                    target=self._file_worker, name="transcript-file", daemon=True
+                ).start()
+            atexit.register(self.close)
+            self._started = True
 
     def log(self, tag: str, msg: str) -> None:
         if not self.enable:
             return
-        colors = {
-            "PART": "grey50",
-            "USER": "cyan",
-            "BOT": "green",
-            "SAY": "magenta",
-            "ERR": "red",
-        }
-        style = colors.get(tag, "white")
-        self.console.print(Text(f"[{tag}] {msg}", style=style))
-        self._append(f"[{tag}] {msg}")
+        self._ensure_started()
+        line = f"[{tag}] {msg}"
+        if self.to_console:
+            self._console_q.put((tag, line))
+        if self.file:
+            self._file_q.put(line)
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Block until everything logged so far has been written."""
+        if not self._started:
+            return
+        done: List[threading.Event] = []
+        if self.to_console:
+            done.append(threading.Event())
+            self._console_q.put(done[-1])
+        if self.file:
+            done.append(threading.Event())
+            self._file_q.put(done[-1])
+            self._wake.set()
+        for event in done:
+            event.wait(timeout)
+
+    def close(self) -> None:
+        self.flush()
+
+    # -- workers ------------------------------------------------------------
+
+    def _console_worker(self) -> None:
+        from rich.text import Text
+
+        if self.console is None:
+            from rich.console import Console
+
+            self.console = Console()
+        while True:
+            item = self._console_q.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            tag, line = item
+            try:
+                self.console.print(Text(line, style=_COLORS.get(tag, "white")))
+            except Exception:  # pragma: no cover - terminal went away
+                pass
+
+    def _file_worker(self) -> None:
+        fh = None
+        size = 0
+        opened = 0.0
+        while True:
+            first = self._file_q.get()
+            # Let a burst of lines accumulate before touching the disk.
+            if not isinstance(first, threading.Event):
+                self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            batch = [first]
+            while True:
+                try:
+                    batch.append(self._file_q.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [item for item in batch if isinstance(item, str)]
+            if lines:
+                try:
+                    if fh is None:
+                        fh = open(self.file, "ab")  # type: ignore[arg-type]
+                        size = fh.tell()
+                        opened = time.monotonic()
+                    data = ("\n".join(lines) + "\n").encode("utf-8")
+                    fh.write(data)
+                    fh.flush()
+                    size += len(data)
+                    if size >= self.max_bytes or (
+                        self.max_age and time.monotonic() - opened >= self.max_age
+                    ):
+                        fh.close()
+                        fh = None
+                        self._rotate()
+                except OSError:  # pragma: no cover - disk full, permissions
+                    if fh is not None:
+                        with contextlib.suppress(OSError):
+                            fh.close()
+                    fh = None
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _rotate(self) -> None:
+        path = self.file
+        assert path
+        if self.backups <= 0:
+            os.remove(path)
+        else:
+            for i in range(self.backups - 1, 0, -1):
+                src = f"{path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{path}.{i + 1}")
+            os.replace(path, f"{path}.1")
+        self.rotations += 1
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Dict
+import fnmatch
+import functools
+import re
+from typing import Dict, Pattern
 
 _EXTENSION_MAP: Dict[str, str] = {
     "text": "*.txt",
@@ -21,3 +24,9 @@ def derive_glob_from_phrase(phrase: str) -> str:
         if w in _EXTENSION_MAP:
             return _EXTENSION_MAP[w]
     return "*" + "*".join(words) + "*"
+
+
+@functools.lru_cache(maxsize=128)
+def compile_glob(pattern: str) -> Pattern[str]:
+    """Compile a glob *pattern* into a case-insensitive regular expression."""
+    return re.compile(fnmatch.translate(pattern), re.IGNORECASE)
@@ -15,7 +15,7 @@ if not exist "%TARGET%\venv\Scripts\python.exe" (
 
 echo @echo off>"%LAUNCH%"
 echo cd /d "%TARGET%" >>"%LAUNCH%"
-echo "%TARGET%\venv\Scripts\python.exe" -m app.assistant %%* >>"%LAUNCH%"
+echo "%TARGET%\venv\Scripts\python.exe" -m app.client %%* >>"%LAUNCH%"
 
 echo Kyra installed. You can run it with: Kyra
 pause
@@ -3,21 +3,53 @@ import types as _types
 
 sys.modules.setdefault('vosk', types.SimpleNamespace(Model=lambda *a, **k: None, KaldiRecognizer=lambda *a, **k: None))
 sys.modules.setdefault('pyaudio', types.SimpleNamespace(PyAudio=lambda: None, paInt16=0))
-sys.modules.setdefault('rapidfuzz', types.SimpleNamespace(fuzz=types.SimpleNamespace(partial_ratio=lambda a, b: 0)))
+_fuzz = types.SimpleNamespace(partial_ratio=lambda a, b, **k: 0)
+
+def _extract_one(query, choices, scorer=None, processor=None, score_cutoff=None, **k):
+    best = None
+    for i, choice in enumerate(choices):
+        score = scorer(query, choice)
+        if score_cutoff is not None and score < score_cutoff:
+            continue
+        if best is None or score > best[1]:
+            best = (choice, score, i)
+    return best
+
+class _Row(list):
+    """Stands in for a row of the NumPy matrix ``cdist`` returns."""
+
+    def argmax(self):
+        return max(range(len(self)), key=self.__getitem__)
+
+def _cdist(queries, choices, scorer=None, processor=None, score_cutoff=None, **k):
+    rows = []
+    for q in queries:
+        row = [scorer(q, c) for c in choices]
+        rows.append(_Row(s if score_cutoff is None or s >= score_cutoff else 0 for s in row))
+    return rows
+
+sys.modules.setdefault('rapidfuzz', types.SimpleNamespace(
+    fuzz=_fuzz,
+    process=types.SimpleNamespace(extractOne=_extract_one, cdist=_cdist),
+))
 sys.modules.setdefault('pydantic', types.SimpleNamespace(BaseModel=object))
 async def _dummy_save(path: str) -> None:
     return None
 
-sys.modules.setdefault('edge_tts', types.SimpleNamespace(Communicate=lambda *a, **k: types.SimpleNamespace(save=_dummy_save)))
+async def _dummy_stream():
+    return
+    yield
+
+sys.modules.setdefault('edge_tts', types.SimpleNamespace(Communicate=lambda *a, **k: types.SimpleNamespace(save=_dummy_save, stream=_dummy_stream)))
 sys.modules.setdefault('pyttsx3', types.SimpleNamespace(init=lambda: types.SimpleNamespace(say=lambda t: None, runAndWait=lambda: None)))
-sys.modules.setdefault('simpleaudio', types.SimpleNamespace(play_buffer=lambda *a, **k: types.SimpleNamespace(wait_done=lambda: None)))
+sys.modules.setdefault('simpleaudio', types.SimpleNamespace(play_buffer=lambda *a, **k: types.SimpleNamespace(wait_done=lambda: None, is_playing=lambda: False, stop=lambda: None)))
 class _DummyDecoded:
     samples = b""
     nchannels = 1
     sample_rate = 16000
     sample_width = 2
 
-sys.modules.setdefault('miniaudio', types.SimpleNamespace(decode_file=lambda *a, **k: _DummyDecoded()))
+sys.modules.setdefault('miniaudio', types.SimpleNamespace(decode_file=lambda *a, **k: _DummyDecoded(), decode=lambda *a, **k: _DummyDecoded()))
 sys.modules.setdefault('rich.console', types.SimpleNamespace(Console=lambda *a, **k: types.SimpleNamespace(print=lambda *a, **k: None)))
 sys.modules.setdefault('rich.text', types.SimpleNamespace(Text=lambda *a, **k: None))
 
@@ -36,5 +68,25 @@ dummy_requests = _types.ModuleType('requests')
 dummy_requests.get = lambda *a, **k: _DummyResp()
 dummy_requests.post = lambda *a, **k: _DummyResp()
 dummy_requests.exceptions = _types.SimpleNamespace(RequestException=Exception)
+
+class _DummyAdapter:
+    def __init__(self, *a, **k):
+        self.poolmanager = _types.SimpleNamespace(pools={})
+
+class _DummySession:
+    def __init__(self):
+        self.headers = {}
+    def mount(self, prefix, adapter):
+        pass
+    def get(self, *a, **k):
+        return _DummyResp()
+    def post(self, *a, **k):
+        return _DummyResp()
+    def close(self):
+        pass
+
+dummy_requests.Session = _DummySession
+dummy_requests.adapters = _types.SimpleNamespace(HTTPAdapter=_DummyAdapter)
 sys.modules.setdefault('requests', dummy_requests)
+sys.modules.setdefault('requests.adapters', dummy_requests.adapters)
 sys.modules.setdefault('requests.exceptions', dummy_requests.exceptions)
@@ -0,0 +1,22 @@
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from benchmarks import suite
+
+
+def test_compare_flags_slowdowns_over_threshold():
+    baselines = {"a": 10.0, "b": 10.0}
+    results = {"a": 12.0, "b": 14.0, "new": 99.0}
+    assert suite.compare(results, baselines, 0.3) == ["b"]
+
+
+def test_make_tree_places_needle_last(tmp_path):
+    suite.make_tree(str(tmp_path), 250, per_dir=50, fanout=2)
+    files = [os.path.join(d, f) for d, _, fs in os.walk(tmp_path) for f in fs]
+    assert len(files) == 250
+    assert sum(f.endswith(suite.NEEDLE) for f in files) == 1
+
+
+def test_cases_run_and_clean_up():
+    for name in ("derive_glob_from_phrase", "route[parse]", "transcript.log"):
+        assert suite.measure(name, repeat=1) > 0
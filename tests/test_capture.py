@@ -0,0 +1,77 @@
+import asyncio
+import os, sys, threading
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app.capture import LoopHandoff
+
+
+def test_drop_oldest_when_full():
+    async def main():
+        q = LoopHandoff(asyncio.get_running_loop(), maxsize=3)
+        for i in range(5):
+            q.put_threadsafe(i)
+        got = [await q.get() for _ in range(3)]
+        return got, q.stats()
+
+    got, stats = asyncio.run(main())
+    assert got == [2, 3, 4]
+    assert stats["dropped"] == 2
+    assert stats["received"] == 5
+    assert stats["depth"] == 0
+
+
+def test_wakes_consumer_from_thread():
+    async def main():
+        q = LoopHandoff(asyncio.get_running_loop(), maxsize=8)
+
+        def produce():
+            for i in range(100):
+                q.put_threadsafe(i)
+
+        threading.Thread(target=produce).start()
+        got = []
+        while len(got) < 100 - q.dropped:
+            got.append(await asyncio.wait_for(q.get(), 2))
+        return got, q
+
+    got, q = asyncio.run(main())
+    assert got == sorted(got)
+    assert len(got) + q.dropped == 100
+
+
+def test_thread_handoff_timeout_and_wake():
+    from app.capture import ThreadHandoff
+
+    q = ThreadHandoff(maxsize=2)
+    assert q.get(timeout=0.01) is None
+    threading.Timer(0.05, q.put_threadsafe, args=(b"x",)).start()
+    assert q.get(timeout=2) == b"x"
+
+
+def test_kept_items_are_never_dropped():
+    async def main():
+        q = LoopHandoff(asyncio.get_running_loop(), maxsize=3, keep=lambda e: e[0] == "final")
+        q.put_threadsafe(("partial", "a"))
+        q.put_threadsafe(("final", "open notes"))
+        for i in range(5):
+            q.put_threadsafe(("partial", str(i)))
+        q.put_threadsafe(("final", "x"))
+        q.put_threadsafe(("final", "y"))
+        q.put_threadsafe(("final", "z"))
+        got = []
+        while len(q):
+            got.append(await q.get())
+        return got, q.stats()
+
+    got, stats = asyncio.run(main())
+    assert [t for k, t in got if k == "final"] == ["open notes", "x", "y", "z"]
+    assert got[0] == ("final", "open notes")
+    assert stats["dropped"] == 6
+
+
+def test_ring_is_abstract():
+    import pytest
+    from app.capture import _Ring
+
+    with pytest.raises(TypeError):
+        _Ring(4)
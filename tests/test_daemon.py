@@ -0,0 +1,121 @@
+import os, sys, threading
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import client, daemon
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="uses a Unix socket path")
+
+
+def test_request_round_trip(tmp_path):
+    addr = str(tmp_path / "kyra.sock")
+    seen = []
+
+    def handle(text):
+        seen.append(threading.current_thread().name)
+        return text.upper()
+
+    d = daemon.Daemon(handle, addr).start()
+    try:
+        assert daemon.request("open notes", addr) == "OPEN NOTES"
+        assert daemon.request("again", addr) == "AGAIN"
+        assert d.stats()["served"] == 2
+        assert all(name.startswith("kyra-daemon") for name in seen)
+    finally:
+        d.close()
+
+
+def test_handler_errors_are_returned(tmp_path):
+    addr = str(tmp_path / "kyra.sock")
+
+    def handle(text):
+        raise ValueError("boom")
+
+    d = daemon.Daemon(handle, addr).start()
+    try:
+        assert daemon.request("x", addr) == "boom"
+        assert d.stats()["errors"] == 1
+    finally:
+        d.close()
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    addr = tmp_path / "kyra.sock"
+    addr.write_text("")
+    d = daemon.Daemon(lambda t: "ok", str(addr)).start()
+    try:
+        assert daemon.request("x", str(addr)) == "ok"
+        with pytest.raises(RuntimeError):
+            daemon.Daemon(lambda t: "", str(addr)).bind()
+    finally:
+        d.close()
+
+
+def test_client_falls_back_in_process(tmp_path, monkeypatch):
+    monkeypatch.setenv("KYRA_SOCKET", str(tmp_path / "missing.sock"))
+    assert daemon.request("x") is None
+    calls = []
+    monkeypatch.setattr("app.assistant.main", lambda argv: calls.append(argv))
+    client.main(["open", "notes"])
+    client.main(["--mode", "console"])
+    assert calls == [["open", "notes"], ["--mode", "console"]]
+
+
+def test_client_uses_daemon(tmp_path, monkeypatch, capsys):
+    addr = str(tmp_path / "kyra.sock")
+    monkeypatch.setenv("KYRA_SOCKET", addr)
+    d = daemon.Daemon(lambda t: f"Opening {t}", addr).start()
+    try:
+        client.main(["notes"])
+    finally:
+        d.close()
+    assert capsys.readouterr().out == "Assistant: Opening notes\n"
+
+
+def test_socket_and_key_are_private(tmp_path):
+    import stat
+    from multiprocessing.connection import Client
+
+    addr = str(tmp_path / "kyra.sock")
+    d = daemon.Daemon(lambda t: "ok", addr).start()
+    try:
+        assert stat.S_IMODE(os.stat(addr).st_mode) & 0o077 == 0
+        assert stat.S_IMODE(os.stat(addr + ".key").st_mode) == 0o600
+        with pytest.raises(Exception):
+            Client(addr, authkey=b"wrong").close()
+        # A rejected client does not stop the daemon.
+        assert daemon.request("x", addr) == "ok"
+    finally:
+        d.close()
+
+
+def test_default_address_is_in_a_private_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("KYRA_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    addr = daemon.default_address()
+    parent = os.path.dirname(addr)
+    assert os.stat(parent).st_mode & 0o777 == 0o700
+    os.chmod(parent, 0o755)
+    with pytest.raises(PermissionError):
+        daemon.default_address()
+    assert daemon.request("x") is None
+
+
+def test_slow_daemon_is_reported_not_rerun(tmp_path, monkeypatch, capsys):
+    addr = str(tmp_path / "kyra.sock")
+    release = threading.Event()
+    d = daemon.Daemon(lambda t: (release.wait(2), "late")[1], addr).start()
+    ran_here = []
+    monkeypatch.setattr("app.assistant.main", lambda argv: ran_here.append(argv))
+    monkeypatch.setattr(client, "request", lambda text: daemon.request(text, addr, timeout=0.05))
+    try:
+        with pytest.raises(daemon.DaemonError):
+            daemon.request("x", addr, timeout=0.05)
+        with pytest.raises(SystemExit):
+            client.main(["install", "things"])
+    finally:
+        release.set()
+        d.close()
+    assert ran_here == []
+    assert "may still be running" in capsys.readouterr().err
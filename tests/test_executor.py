@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from core import executor
+from core.executor import ToolExecutor
+from core.tools import _REGISTRY, tool
+
+
+def _entry(fn, timeout=5.0):
+    return {"callable": fn, "timeout": timeout}
+
+
+def test_tool_decorator_records_timeout():
+    @tool(timeout=1.5)
+    def _exec_probe_slow():
+        return True, "ok"
+
+    @tool
+    def _exec_probe_default():
+        return True, "ok"
+
+    try:
+        assert _REGISTRY["_exec_probe_slow"]["timeout"] == 1.5
+        assert _REGISTRY["_exec_probe_default"]["timeout"] > 0
+        assert _exec_probe_slow() == (True, "ok")
+    finally:
+        del _REGISTRY["_exec_probe_slow"], _REGISTRY["_exec_probe_default"]
+
+
+def test_run_keeps_loop_free_and_reports_stats():
+    ex = ToolExecutor({"slow": _entry(lambda: (time.sleep(0.05), (True, "done"))[1])}, workers=2)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        t = asyncio.create_task(ticker())
+        result = await ex.run("slow", {})
+        t.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    ex.shutdown()
+    assert result == (True, "done")
+    assert ticks >= 3
+    stats = ex.stats()["slow"]
+    assert stats["calls"] == 1
+    assert stats["exec_ms_avg"] >= 40
+
+
+def test_bounded_pool_queues_and_deadline():
+    release = threading.Event()
+    ex = ToolExecutor({"block": _entry(lambda: (release.wait(1), (True, "x"))[1], timeout=0.05)}, workers=1)
+
+    async def main():
+        return await asyncio.gather(ex.run("block", {}), ex.run("block", {}, timeout=2))
+
+    first, second = None, None
+    try:
+        threading.Timer(0.2, release.set).start()
+        first, second = asyncio.run(main())
+    finally:
+        release.set()
+        ex.shutdown()
+    assert first == (False, "block timed out")
+    assert second == (True, "x")
+    stats = ex.stats()["block"]
+    assert stats["timeouts"] == 1
+    # The second call waited for the single worker only until the first was
+    # abandoned and a replacement worker started, not for the hung call.
+    assert 40 <= stats["queue_ms_max"] < 150
+
+
+def test_async_tool_cancellation_and_errors():
+
+    async def sleepy():
+        await asyncio.sleep(5)
+        return True, "late"
+
+    def broken():
+        raise RuntimeError("no device")
+
+    ex = ToolExecutor({"sleepy": _entry(sleepy), "broken": _entry(broken)})
+
+    async def main():
+        task = asyncio.create_task(ex.run("sleepy", {}))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(main())
+    assert ex.run_sync("broken", {}) == (False, "no device")
+    ex.shutdown()
+    stats = ex.stats()
+    assert stats["sleepy"]["cancelled"] == 1
+    assert stats["broken"]["errors"] == 1
+
+
+def test_abandoned_call_skips_side_effect_and_exits_cleanly():
+    from core.executor import abandoned
+
+    opened = []
+    release = threading.Event()
+
+    def open_browser():
+        release.wait(1)
+        if abandoned():
+            return False, "cancelled"
+        opened.append(True)
+        return True, "opened"
+
+    async def coro_tool(x):
+        return True, x
+
+    ex = ToolExecutor({"open": _entry(open_browser, timeout=0.05), "coro": _entry(coro_tool)}, workers=1)
+    assert ex.run_sync("open", {}) == (False, "open timed out")
+    assert all(t.daemon for t in threading.enumerate() if t.name.startswith("kyra-tool"))
+    # The hung worker was replaced, so the pool still has a free slot.
+    assert ex.run_sync("open", {}, timeout=0.01) == (False, "open timed out")
+    release.set()
+    time.sleep(0.05)
+    assert opened == []
+    assert ex._pool.replaced == 2
+    # Bad arguments to a coroutine tool are an error result, not an exception.
+    ok, msg = asyncio.run(ex.run("coro", {"y": 1}))
+    assert not ok and "argument" in msg
+    assert ex.stats()["coro"]["errors"] == 1
+    ex.shutdown()
+
+
+def test_default_executor_is_created_once(monkeypatch):
+    monkeypatch.setattr(executor, "_EXECUTOR", None)
+    barrier = threading.Barrier(8)
+    seen = []
+
+    def grab():
+        barrier.wait()
+        seen.append(executor.default_executor())
+
+    threads = [threading.Thread(target=grab) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(e) for e in seen}) == 1
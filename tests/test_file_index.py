@@ -0,0 +1,88 @@
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from core import file_index, tools
+from core.file_index import FileIndex
+
+
+def _tree(root):
+    (root / "docs").mkdir()
+    (root / "docs" / "Report.PDF").write_text("x")
+    (root / "notes.txt").write_text("x")
+    (root / "docs" / "todo.txt").write_text("x")
+
+
+def test_build_and_search(tmp_path):
+    _tree(tmp_path)
+    index = FileIndex()
+    assert index.search(str(tmp_path), "*.txt") is None
+    index.build(str(tmp_path))
+    assert index.search(str(tmp_path), "*.txt") == [
+        str(tmp_path / "notes.txt"),
+        str(tmp_path / "docs" / "todo.txt"),
+    ]
+    assert index.search(str(tmp_path / "docs"), "*report*") == [str(tmp_path / "docs" / "Report.PDF")]
+    assert index.search(str(tmp_path), "*.txt", limit=1) == [str(tmp_path / "notes.txt")]
+    stats = index.stats()
+    assert stats["files"] == 3
+    assert stats["dirs"] == 2
+
+
+def test_refresh_picks_up_changes(tmp_path):
+    _tree(tmp_path)
+    index = FileIndex(str(tmp_path / "index.sqlite"))
+    index.build(str(tmp_path / "docs"))
+    new_dir = tmp_path / "docs" / "sub"
+    new_dir.mkdir()
+    (new_dir / "new.txt").write_text("x")
+    os.remove(tmp_path / "docs" / "todo.txt")
+    os.utime(tmp_path / "docs", (1, 1))
+    assert index.refresh(str(tmp_path / "docs")) == 1
+    assert index.search(str(tmp_path / "docs"), "*.txt") == [str(new_dir / "new.txt")]
+
+
+def test_tools_query_index(monkeypatch, tmp_path):
+    _tree(tmp_path)
+    index = FileIndex()
+    index.build(str(tmp_path))
+    monkeypatch.setattr(file_index, "_ACTIVE", index)
+    monkeypatch.setattr(tools.os, "walk", lambda root: (_ for _ in ()).throw(AssertionError("walked")))
+    ok, msg = tools.search_files(str(tmp_path), "pdf")
+    assert ok
+    assert msg == str(tmp_path / "docs" / "Report.PDF")
+
+
+def test_index_skips_excluded_dirs(tmp_path):
+    _tree(tmp_path)
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.txt").write_text("x")
+    index = FileIndex(excludes=["node_modules"])
+    index.build(str(tmp_path))
+    assert str(tmp_path / "node_modules" / "dep.txt") not in index.search(str(tmp_path), "*.txt")
+
+
+def test_index_miss_falls_back_to_walk(monkeypatch, tmp_path):
+    _tree(tmp_path)
+    index = FileIndex()
+    index.build(str(tmp_path))
+    monkeypatch.setattr(file_index, "_ACTIVE", index)
+    # Created after the index was built, as by create_note.
+    (tmp_path / "docs" / "fresh_note.md").write_text("x")
+    ok, msg = tools.search_files(str(tmp_path), "fresh note")
+    assert ok
+    assert msg == str(tmp_path / "docs" / "fresh_note.md")
+
+
+def test_deleted_index_hit_falls_back_to_walk(monkeypatch, tmp_path):
+    _tree(tmp_path)
+    index = FileIndex()
+    index.build(str(tmp_path))
+    monkeypatch.setattr(file_index, "_ACTIVE", index)
+    (tmp_path / "notes.txt").unlink()
+    opened = []
+    monkeypatch.setattr(tools, "open_explorer", lambda path: (opened.append(path), (True, path))[1])
+    ok, msg = tools.search_files(str(tmp_path), "txt")
+    assert ok and msg == str(tmp_path / "docs" / "todo.txt")
+    (tmp_path / "docs" / "notes.txt").write_text("x")  # moved after the index was built
+    ok, msg = tools.find_file_and_open("notes.txt", str(tmp_path))
+    assert ok and opened == [str(tmp_path / "docs" / "notes.txt")]
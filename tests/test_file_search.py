@@ -0,0 +1,51 @@
+import fnmatch
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from core.file_search import find_files
+
+
+def _reference(root, pattern):
+    out = []
+    for dirpath, _dirs, files in os.walk(root):
+        for f in files:
+            if fnmatch.fnmatch(f.lower(), pattern.lower()):
+                out.append(os.path.join(dirpath, f))
+    return out
+
+
+def _tree(root):
+    (root / "top.txt").write_text("x")
+    for d in ("a", "b", "c"):
+        sub = root / d / "deep"
+        sub.mkdir(parents=True)
+        (root / d / f"{d}.TXT").write_text("x")
+        (sub / f"{d}_deep.txt").write_text("x")
+        (sub / "skip.pdf").write_text("x")
+
+
+def test_matches_os_walk(tmp_path):
+    _tree(tmp_path)
+    for pattern in ("*.txt", "*deep*", "*.pdf", "nothing*"):
+        expected = sorted(_reference(str(tmp_path), pattern))
+        assert sorted(find_files(str(tmp_path), pattern, excludes=())) == expected
+
+
+def test_limit_keeps_walk_order(tmp_path):
+    _tree(tmp_path)
+    ref = _reference(str(tmp_path), "*.txt")
+    for limit in (1, 2, 4):
+        assert find_files(str(tmp_path), "*.txt", limit=limit, workers=1) == ref[:limit]
+        assert find_files(str(tmp_path), "*.txt", limit=limit) == ref[:limit]
+
+
+def test_excludes(tmp_path):
+    _tree(tmp_path)
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "pkg.txt").write_text("x")
+    got = find_files(str(tmp_path), "*.txt")
+    assert not any("node_modules" in p for p in got)
+
+
+def test_missing_root(tmp_path):
+    assert find_files(str(tmp_path / "missing"), "*") == []
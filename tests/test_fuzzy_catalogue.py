@@ -0,0 +1,35 @@
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import intent_router
+from app.intent_router import fuzzy_match, match_many
+from core.matcher import FuzzyCatalogue
+
+
+def _overlap(a, b):
+    words = set(b.split())
+    return 100.0 * len(words & set(a.split())) / len(words)
+
+
+def test_best_picks_variant_and_intent():
+    cat = FuzzyCatalogue(
+        {"kill_process": ("kill process", "close app"), "create_note": ["Create  Note"]},
+        _overlap,
+    )
+    assert cat.phrases == ["kill process", "close app", "create note"]
+    assert cat.best("please close app now", 60) == ("kill_process", "close app", 100.0)
+    assert cat.best("nothing useful", 60) is None
+
+
+def test_ties_go_to_first_intent():
+    cat = FuzzyCatalogue({"a": ("x y",), "b": ("x z",)}, _overlap)
+    assert cat.best("x", 10)[0] == "a"
+    assert cat.best_many(["x"], 10)[0][0] == "a"
+
+
+def test_match_many_agrees_with_fuzzy_match(monkeypatch):
+    cat = FuzzyCatalogue(intent_router._CHOICES, _overlap)
+    monkeypatch.setattr(intent_router, "_CATALOGUE", cat)
+    cmds = ["open google", "kill process discord", "note milk", "folder stuff", "hello there"]
+    assert match_many(cmds) == [fuzzy_match(c) for c in cmds]
+    assert match_many(["hello there"]) == [None]
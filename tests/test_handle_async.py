@@ -0,0 +1,90 @@
+import asyncio
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import assistant
+from app.scenarios import FakeLLM
+
+
+class Log:
+    def __init__(self):
+        self.lines = []
+
+    def log(self, tag, msg):
+        self.lines.append((tag, msg))
+
+
+def test_aroute_matches_route():
+    responses = {
+        "close discord": {
+            "choices": [
+                {
+                    "finish_reason": "tool_calls",
+                    "message": {
+                        "tool_calls": [
+                            {"function": {"name": "kill_process", "arguments": '{"name": "discord"}'}}
+                        ]
+                    },
+                }
+            ]
+        }
+    }
+    router = FakeLLM(responses)
+    result = asyncio.run(router.aroute("close discord"))
+    assert result == ("kill_process", {"name": "discord"}, "kill_process")
+
+
+def test_handle_text_async_runs_tool_off_loop(monkeypatch):
+    responses = {
+        "shut it": {
+            "choices": [
+                {
+                    "finish_reason": "tool_calls",
+                    "message": {
+                        "tool_calls": [
+                            {"function": {"name": "kill_process", "arguments": '{"name": "the discord"}'}}
+                        ]
+                    },
+                }
+            ]
+        }
+    }
+    called = {}
+
+    def fake_kill(name):
+        called["name"] = name
+        return True, f"Killed {name}"
+
+    router = FakeLLM(responses)
+    monkeypatch.setitem(assistant._REGISTRY, "kill_process", {"callable": fake_kill})
+    transcript = Log()
+    asyncio.run(assistant.handle_text_async("shut it", router, False, transcript))
+    assert called["name"] == "discord"
+    assert ("BOT", "Killed discord") in transcript.lines
+
+
+class StreamingRouter:
+    stream = True
+
+    async def aroute(self, text, on_token=None):
+        def post():
+            for token in ["Sure", ". Here", " it is", "."]:
+                on_token(token)
+
+        # The requests backend streams on a worker thread.
+        await asyncio.to_thread(post)
+        return None, {"content": "Sure. Here it is."}, "chat"
+
+
+def test_streamed_reply_is_spoken_by_sentence(monkeypatch):
+    spoken = []
+    monkeypatch.setattr(assistant, "speak", lambda text, tts: spoken.append(text.strip()))
+    transcript = Log()
+    asyncio.run(assistant.handle_text_async("hello", StreamingRouter(), True, transcript))
+    assert spoken == ["Sure.", "Here it is."]
+    assert ("BOT", "Sure. Here it is.") in transcript.lines
+
+
+def test_streamed_reply_is_printed_once(capsys):
+    asyncio.run(assistant.handle_text_async("hello", StreamingRouter(), False, Log()))
+    assert capsys.readouterr().out == "Assistant: Sure. Here it is.\n"
@@ -21,7 +21,7 @@ def test_install_and_uninstall_cmd(monkeypatch, tmp_path):
     assert launcher.exists()
     assert target.exists()
     content = launcher.read_text()
-    assert 'app.assistant' in content
+    assert 'app.client' in content
 
     ok2, msg2 = tools.uninstall_cmd()
     assert ok2
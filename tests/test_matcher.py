@@ -0,0 +1,37 @@
+import os, sys, re
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from core.matcher import Rule, RuleSet
+from app.intent_router import _RULES
+
+
+def _linear(rules, text):
+    for rule in rules.rules:
+        m = rule.pattern.search(text)
+        if m:
+            return rule.name, m.group(rule.group)
+    return None
+
+
+def test_prefilter_matches_linear_scan():
+    words = ["open", "show", "close", "reopen", "go", "to", "note", "play", "listen to",
+             "desktop", "folder", "x", "start", "kill", "install", "visit"]
+    for a in words:
+        for b in words:
+            for c in ("", " discord", " the downloads folder"):
+                text = f"{a} {b}{c}"
+                hit = _RULES.match(text)
+                got = (hit[0].name, hit[1].group(hit[0].group)) if hit else None
+                assert got == _linear(_RULES, text), text
+
+
+def test_priority_order():
+    rules = RuleSet(
+        [
+            Rule("first", re.compile(r"go (.+)"), ("go",), "x"),
+            Rule("second", re.compile(r"go to (.+)"), ("go to",), "x"),
+        ]
+    )
+    rule, m = rules.match("go to town")
+    assert rule.name == "first"
+    assert rules.candidates("nothing here") == []
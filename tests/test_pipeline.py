@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import pipeline
+from app.pipeline import RecognitionWorker, StageTimer, VoicePipeline, WakeSpotter, wake_grammar
+
+
+class FakeRecognizer:
+    """Replays a script of ``("final"|"partial", text)`` steps, one per chunk."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.step = ("partial", "")
+
+    def AcceptWaveform(self, chunk):
+        self.step = self.script.pop(0) if self.script else ("partial", "")
+        return self.step[0] == "final"
+
+    def Result(self):
+        return json.dumps({"text": self.step[1]})
+
+    def PartialResult(self):
+        return json.dumps({"partial": self.step[1]})
+
+    def FinalResult(self):
+        return json.dumps({"text": ""})
+
+    def Reset(self):
+        self.resets = getattr(self, "resets", 0) + 1
+
+
+def _to_command(text):
+    return text[5:].strip() if text.startswith("kyra") else None
+
+
+def test_worker_emits_wake_then_final():
+    rec = FakeRecognizer([("partial", "kyra"), ("partial", "kyra open"), ("final", "kyra open notes")])
+    w = RecognitionWorker(rec, _to_command)
+    events = [e for _ in range(3) for e in w.feed(b"")]
+    assert events == [
+        ("wake", "kyra"),
+        ("partial", "kyra"),
+        ("partial", "kyra open"),
+        ("raw", "kyra open notes"),
+        ("clear", ""),
+        ("final", "open notes"),
+    ]
+
+
+def test_worker_finalizes_after_silence(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(pipeline.time, "monotonic", lambda: now[0])
+    rec = FakeRecognizer([("partial", "kyra stop")])
+    w = RecognitionWorker(rec, _to_command)
+    w.feed(b"")
+    now[0] = 1.0
+    assert w.feed(b"")[-1] == ("final", "stop")
+
+
+def test_pipeline_recognizes_off_loop():
+    async def main():
+        rec = FakeRecognizer([("final", "kyra hello"), ("final", "no wake word")])
+        p = VoicePipeline(asyncio.get_running_loop(), rec, _to_command, audio_chunks=4)
+        p.start(capture=False)
+        p.audio.put_threadsafe(b"a")
+        p.audio.put_threadsafe(b"b")
+        events = []
+        while ("final", "hello") not in events:
+            events.append(await asyncio.wait_for(p.events.get(), 2))
+        p.stop()
+        return events, p.stats()
+
+    events, stats = asyncio.run(main())
+    assert ("raw", "kyra hello") in events
+    assert stats["recognize"]["count"] >= 1
+    assert stats["audio"]["dropped"] == 0
+
+
+def test_stage_timer():
+    t = StageTimer()
+    t.record(2.0)
+    t.record(4.0)
+    assert t.stats() == {"count": 2, "mean_ms": 3.0, "max_ms": 4.0, "last_ms": 4.0}
+
+
+def test_pipeline_skips_chunks_rejected_by_vad():
+    class DropAll:
+        calibrated = True
+
+        def process(self, chunk):
+            return []
+
+        def stats(self, decode_ms=0.0):
+            return {"skipped": 1}
+
+    async def main():
+        rec = FakeRecognizer([("final", "kyra hello")])
+        p = VoicePipeline(asyncio.get_running_loop(), rec, _to_command, vad=DropAll())
+        p.start(capture=False)
+        p.audio.put_threadsafe(b"a")
+        await asyncio.sleep(0.1)
+        p.stop()
+        return rec, p.stats()
+
+    rec, stats = asyncio.run(main())
+    assert rec.script == [("final", "kyra hello")]
+    assert stats["vad"] == {"skipped": 1}
+
+
+def test_wake_grammar():
+    assert json.loads(wake_grammar({"Kyra", "kira"})) == ["kira", "kyra", "[unk]"]
+
+
+def test_spotter_engages_full_recognizer_with_preroll():
+    spot = FakeRecognizer([("partial", "[unk]"), ("partial", "kira")])
+    full = FakeRecognizer([("partial", "kyra"), ("partial", "kyra open"), ("final", "kyra open notes")])
+    w = RecognitionWorker(full, _to_command, WakeSpotter(spot, {"kyra", "kira"}, preroll=2))
+    assert w.feed(b"1") == []
+    events = w.feed(b"2")
+    # Both pre-roll chunks go to the full recognizer straight away.
+    assert events == [("wake", "kyra"), ("partial", "kyra"), ("partial", "kyra open")]
+    assert w.feed(b"3")[-1] == ("final", "open notes")
+    assert not w.listening
+    assert w.stats() == {
+        "listening": False,
+        "wakes": 1,
+        "false_wakes": 0,
+        "spot_chunks": 2,
+        "full_chunks": 3,
+    }
+    assert full.resets == 1 and spot.resets == 1
+
+
+def test_spotter_counts_false_wake_on_timeout():
+    spot = FakeRecognizer([("final", "kira")])
+    full = FakeRecognizer([])
+    w = RecognitionWorker(full, _to_command, WakeSpotter(spot, {"kira"}, preroll=1), listen_chunks=3)
+    w.feed(b"")
+    w.feed(b"")
+    w.feed(b"")
+    assert not w.listening
+    assert w.false_wakes == 1
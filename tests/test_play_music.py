@@ -1,21 +1,28 @@
 import os, sys, types
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import youtube
 from app.assistant import play_music
 
 class FakeResp:
     def __init__(self, text):
         self.text = text
+    def iter_content(self, size):
+        yield self.text.encode()
+    def close(self):
+        pass
 
 def test_play_music_fetch(monkeypatch):
     opened = {}
     def fake_open(url):
         opened['url'] = url
         return True
-    def fake_get(url, timeout=5):
-        return FakeResp('<a href="/watch?v=abc123def45">')
+    resolver = youtube.YouTubeResolver(youtube.VideoIdCache())
+    resolver._session = types.SimpleNamespace(
+        get=lambda url, stream=False, timeout=5: FakeResp('<a href="/watch?v=abc123def45">')
+    )
     monkeypatch.setattr('webbrowser.open', fake_open)
-    monkeypatch.setattr('requests.get', fake_get)
+    monkeypatch.setattr(youtube, '_RESOLVER', resolver)
     ok, msg = play_music(query='test song')
     assert ok
     assert opened['url'] == 'https://www.youtube.com/watch?v=abc123def45'
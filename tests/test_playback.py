@@ -0,0 +1,91 @@
+import asyncio
+import os, sys, types
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import playback
+from app.playback import PRIORITY_HIGH, PlaybackScheduler
+from app.tts import Clip
+
+
+class FakePlay:
+    def __init__(self, log, samples, playing):
+        self.log = log
+        self.samples = samples
+        self.playing = playing
+        log.append(("start", samples))
+
+    def is_playing(self):
+        return self.playing
+
+    def stop(self):
+        self.log.append(("stop", self.samples))
+        self.playing = False
+
+
+def _install(monkeypatch, log, playing=False):
+    monkeypatch.setattr(
+        playback,
+        "simpleaudio",
+        types.SimpleNamespace(play_buffer=lambda s, *a: FakePlay(log, s, playing)),
+    )
+
+
+async def _clip(text):
+    return Clip(text.encode(), 1, 2, 16000)
+
+
+def test_plays_in_order_one_at_a_time(monkeypatch):
+    log = []
+    _install(monkeypatch, log)
+
+    async def main():
+        player = PlaybackScheduler(load=_clip)
+        first = player.submit("One. Two.")
+        second = player.submit("Three.")
+        assert await first and await second
+        return player.stats()
+
+    stats = asyncio.run(main())
+    assert log == [("start", b"One."), ("start", b"Two."), ("start", b"Three.")]
+    assert stats["played"] == 2
+    assert stats["queued"] == 0
+    assert stats["ttfa_ms_last"] is not None
+
+
+def test_priority_and_bounded_queue(monkeypatch):
+    log = []
+    _install(monkeypatch, log)
+
+    async def main():
+        player = PlaybackScheduler(maxsize=2, load=_clip)
+        a = player.submit("a")
+        b = player.submit("b")
+        c = player.submit("c")
+        urgent = player.submit("urgent", PRIORITY_HIGH)
+        return await asyncio.gather(a, b, c, urgent), player.stats()
+
+    results, stats = asyncio.run(main())
+    assert results == [True, False, False, True]
+    assert [s for _, s in log] == [b"urgent", b"a"]
+    assert stats["dropped"] == 2
+
+
+def test_interrupt_stops_device(monkeypatch):
+    log = []
+    _install(monkeypatch, log, playing=True)
+
+    async def main():
+        player = PlaybackScheduler(load=_clip)
+        long = player.submit("Long reply. More.")
+        queued = player.submit("Queued.")
+        while not log:
+            await asyncio.sleep(0)
+        player.interrupt()
+        return await long, await queued, player.stats()
+
+    long, queued, stats = asyncio.run(main())
+    assert (long, queued) == (False, False)
+    assert log == [("start", b"Long reply."), ("stop", b"Long reply.")]
+    assert stats["interrupted"] == 2
+    # Barge-in clears the queue; those items are not also counted as dropped.
+    assert stats["dropped"] == 0
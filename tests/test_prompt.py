@@ -0,0 +1,69 @@
+import json
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app.scenarios import FakeLLM, completion
+from core import tools
+from core.intent_router import IntentRouter
+from core.prompt import PreparedPrompt, compact_tools, estimate_tokens
+
+
+def test_prepared_body_matches_plain_encoding():
+    router = IntentRouter()
+    prompt = router.prompt()
+    payload = prompt.payload('play "Café del Mar"')
+    assert json.loads(prompt.encode(payload)) == payload
+    assert json.loads(prompt.encode(payload, stream=True)) == {**payload, "stream": True}
+    # A payload that was changed after it was built is encoded in full.
+    payload["max_tokens"] = 128
+    assert json.loads(prompt.encode(payload))["max_tokens"] == 128
+    assert router.prompt() is prompt
+
+
+def test_prompt_rebuilt_when_registry_changes():
+    router = IntentRouter()
+    prompt = router.prompt()
+
+    @tools.tool
+    def _prompt_probe_tool() -> tuple:
+        """Probe tool."""
+        return True, ""
+
+    try:
+        rebuilt = router.prompt()
+        assert rebuilt is not prompt
+        assert "_prompt_probe_tool" in [t["function"]["name"] for t in rebuilt.tools]
+    finally:
+        del tools._REGISTRY["_prompt_probe_tool"]
+
+
+def test_compact_tools_trims_schema_and_tokens():
+    router = IntentRouter()
+    full = router.prompt()
+    router.compact_tools = True
+    compact = router.prompt()
+    names = [t["function"]["name"] for t in compact.tools]
+    assert "install_cmd" not in names and "play_music" in names
+    music = next(t for t in compact.tools if t["function"]["name"] == "play_music")["function"]
+    assert "description" not in music["parameters"]["properties"]["query"]
+    assert "required" not in music["parameters"]
+    assert compact.tokens < full.tokens
+    assert compact.fingerprint != full.fingerprint
+    # A property that happens to be called "description" is kept.
+    schema = [{"function": {"name": "x", "parameters": {"properties": {"description": {"type": "string"}}}}}]
+    assert compact_tools(schema, ["x"])[0]["function"]["parameters"]["properties"] == {
+        "description": {"type": "string"}
+    }
+
+
+def test_prompt_tokens_reported():
+    body = completion(None, content="hi")
+    body["usage"] = {"prompt_tokens": 412}
+    router = FakeLLM({"hello there": body})
+    router.route("hello there")
+    stats = router.prompt_stats()
+    assert stats["prompt_tokens"] == 412
+    assert stats["tokens_est"] == router.prompt().tokens > 0
+    assert estimate_tokens('{"a":1}') == 7
+    prompt = PreparedPrompt("s", [])
+    assert prompt.count(prompt.payload("hello")) == prompt.tokens + 1
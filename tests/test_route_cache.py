@@ -0,0 +1,120 @@
+import json
+import time
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from core import route_cache
+from core.route_cache import RouteCache
+from app.scenarios import FakeLLM
+
+
+def test_lru_eviction():
+    cache = RouteCache(max_size=2, ttl=0)
+    cache.put("a", ("open_website", {"url": "a.com"}, "open_website"))
+    cache.put("b", ("open_website", {"url": "b.com"}, "open_website"))
+    assert cache.get("a") is not None
+    cache.put("c", ("open_website", {"url": "c.com"}, "open_website"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(route_cache.time, "time", lambda: now[0])
+    cache = RouteCache(ttl=10)
+    cache.put("k", (None, {"content": "hi"}, "chat"))
+    now[0] += 11
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_persists_to_disk(tmp_path):
+    path = str(tmp_path / "routes.json")
+    cache = RouteCache(path=path)
+    key = cache.key("Open YouTube!", "m", "s")
+    cache.put(key, ("open_website", {"url": "youtube.com"}, "open_website"))
+    cache.flush()
+    again = RouteCache(path=path)
+    assert again.get(RouteCache.key("open youtube", "m", "s")) == (
+        "open_website",
+        {"url": "youtube.com"},
+        "open_website",
+    )
+
+
+def test_router_serves_repeat_from_cache():
+    calls = []
+
+    class CountingLLM(FakeLLM):
+        def _post(self, payload):  # type: ignore[override]
+            calls.append(payload)
+            return super()._post(payload)
+
+    router = CountingLLM(
+        {
+            "close discord": {
+                "choices": [
+                    {
+                        "finish_reason": "tool_calls",
+                        "message": {
+                            "tool_calls": [
+                                {"function": {"name": "kill_process", "arguments": '{"name": "discord"}'}}
+                            ]
+                        },
+                    }
+                ]
+            }
+        }
+    )
+    first = router.route("close discord")
+    first[1]["name"] = "mutated"
+    second = router.route("close discord")
+    assert second == ("kill_process", {"name": "discord"}, "kill_process")
+    assert len(calls) == 1
+    assert router.cache_stats()["hits"] == 1
+
+
+
+def test_router_does_not_cache_chat_replies():
+    calls = []
+
+    class CountingLLM(FakeLLM):
+        def _post(self, payload):  # type: ignore[override]
+            calls.append(payload)
+            return super()._post(payload)
+
+    router = CountingLLM({"what time is it": {"choices": [{"message": {"content": "It is noon."}}]}})
+    assert router.route("what time is it")[2] == "chat"
+    assert router.route("what time is it")[2] == "chat"
+    assert len(calls) == 2
+    assert router.cache_stats()["hits"] == 0
+
+def test_saves_are_debounced_off_the_caller(tmp_path, monkeypatch):
+    path = tmp_path / "routes.json"
+    writes = []
+    cache = RouteCache(path=str(path), save_delay=0.05)
+    original = cache._save
+    monkeypatch.setattr(cache, "_save", lambda rows: (writes.append(len(rows)), original(rows)))
+    for i in range(5):
+        cache.put(f"k{i}", (None, {"content": "hi"}, "chat"))
+    assert writes == [] and not path.exists()
+    deadline = time.monotonic() + 2
+    while not writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    cache.flush()  # waits for the timer's write to finish
+    assert writes == [5]
+    assert len(RouteCache(path=str(path))) == 5
+
+
+def test_bad_rows_do_not_break_loading(tmp_path):
+    path = tmp_path / "routes.json"
+    good = ["k", time.time(), None, {"content": "hi"}, "chat"]
+    path.write_text(json.dumps([good, ["short"], 7, ["k2", "x", None, {}, "chat"]]))
+    cache = RouteCache(path=str(path))
+    assert len(cache) == 1 and cache.get("k") == (None, {"content": "hi"}, "chat")
+    path.write_text(json.dumps({"oops": 1}))
+    assert len(RouteCache(path=str(path))) == 0
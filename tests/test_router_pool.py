@@ -0,0 +1,65 @@
+import asyncio, os, sys, types
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from core.intent_router import IntentRouter
+
+
+class FakeResp:
+    status_code = 200
+    text = ""
+
+    def json(self):
+        return {"choices": [{"finish_reason": "stop", "message": {"content": "hi"}}]}
+
+
+def test_post_reuses_session(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("API_BASE_URL", raising=False)
+    router = IntentRouter()
+    session = router.session
+    calls = []
+
+    def fake_post(url, data=None, timeout=None):
+        calls.append((url, timeout))
+        return FakeResp()
+
+    monkeypatch.setattr(session, "post", fake_post)
+    router.route("hello")
+    router.route("hello again")
+    assert router.session is session
+    assert calls[0][0] == "http://localhost:11434/v1/chat/completions"
+    assert calls[0][1] == router.timeout
+    assert len(calls) == 2
+
+
+def test_connection_stats():
+    router = IntentRouter()
+    pool = types.SimpleNamespace(num_connections=1, num_requests=5)
+    router._adapter.poolmanager.pools = {"localhost": pool}
+    stats = router.connection_stats()
+    assert stats == {"opened": 1, "reused": 4, "requests": 5}
+
+
+def test_close_releases_async_client_on_its_loop():
+    closed = []
+
+    class FakeAsyncClient:
+        async def aclose(self):
+            closed.append(asyncio.get_running_loop())
+
+    router = IntentRouter()
+    loop = asyncio.new_event_loop()
+    try:
+        router._aclient, router._aclient_loop = FakeAsyncClient(), loop
+        router.close()
+        assert closed == [loop]
+        assert router._aclient is None
+
+        async def inside():
+            router._aclient, router._aclient_loop = FakeAsyncClient(), asyncio.get_running_loop()
+            await router.aclose()
+
+        asyncio.run(inside())
+        assert len(closed) == 2 and router._aclient is None
+    finally:
+        loop.close()
@@ -0,0 +1,71 @@
+import json
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from core.intent_router import IntentRouter, StreamAccumulator
+
+
+def _sse(delta, finish=None):
+    return "data: " + json.dumps({"choices": [{"delta": delta, "finish_reason": finish}]})
+
+
+class FakeStreamResp:
+    status_code = 200
+    text = ""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.read = 0
+        self.closed = False
+
+    def iter_lines(self):
+        for line in self.lines:
+            self.read += 1
+            yield line.encode()
+
+    def close(self):
+        self.closed = True
+
+
+def test_accumulator_ready_once_arguments_complete():
+    acc = StreamAccumulator()
+    assert not acc.feed(_sse({"tool_calls": [{"index": 0, "function": {"name": "kill_process", "arguments": ""}}]}))
+    assert not acc.feed(_sse({"tool_calls": [{"index": 0, "function": {"arguments": '{"name": '}}]}))
+    assert acc.feed(_sse({"tool_calls": [{"index": 0, "function": {"arguments": '"discord"}'}}]}))
+    choice = acc.choice()
+    assert choice["finish_reason"] == "tool_calls"
+    assert json.loads(choice["message"]["tool_calls"][0]["function"]["arguments"]) == {"name": "discord"}
+
+
+def test_accumulator_forwards_tokens():
+    tokens = []
+    acc = StreamAccumulator(tokens.append)
+    acc.feed(_sse({"content": "Hello"}))
+    acc.feed(_sse({"content": " there"}))
+    assert acc.feed("data: [DONE]")
+    assert tokens == ["Hello", " there"]
+    assert acc.choice()["message"]["content"] == "Hello there"
+
+
+def test_route_dispatches_before_stream_ends(monkeypatch):
+    router = IntentRouter()
+    router.stream = True
+    resp = FakeStreamResp(
+        [
+            _sse({"tool_calls": [{"index": 0, "function": {"name": "open_website", "arguments": '{"url": "example.com"}'}}]}),
+            _sse({}, "tool_calls"),
+            "data: [DONE]",
+        ]
+    )
+    seen = {}
+
+    def fake_post(url, data=None, timeout=None, stream=False):
+        seen["payload"] = json.loads(data)
+        return resp
+
+    monkeypatch.setattr(router.session, "post", fake_post)
+    monkeypatch.setattr(router, "_drain", lambda r, lines: None)
+    name, args, _ = router.route("open example")
+    assert seen["payload"]["stream"] is True
+    assert (name, args) == ("open_website", {"url": "example.com"})
+    assert resp.read == 1
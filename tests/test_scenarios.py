@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import scenarios
+from core import tools
+
+HERE = os.path.dirname(__file__)
+
+
+def test_load_csv_and_jsonl(tmp_path):
+    rows = scenarios.load_scenarios(os.path.join(HERE, "intents.csv"))
+    assert rows[1] == ("Hey Aurora launch calc", "launch_app", {"app": "calc"}, "")
+    path = tmp_path / "s.jsonl"
+    path.write_text(
+        json.dumps({"utterance": "hi", "tool": None, "content": "hello"}) + "\n\n"
+        + json.dumps({"utterance": "note", "tool": "create_note", "arguments": {"content": "x"}}) + "\n"
+    )
+    assert scenarios.load_scenarios(str(path)) == [
+        ("hi", None, {}, "hello"),
+        ("note", "create_note", {"content": "x"}, ""),
+    ]
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert scenarios.percentile(values, 50) == 50
+    assert scenarios.percentile(values, 99) == 99
+    assert scenarios.percentile([], 95) == 0.0
+
+
+def test_replay_is_dry_and_concurrent(monkeypatch):
+    def boom(**kwargs):
+        raise AssertionError("tool executed during a dry run")
+
+    monkeypatch.setitem(tools._REGISTRY["launch_app"], "callable", boom)
+    rows = [("fire up the calculator", "launch_app", {"app": "calc"}, ""), ("chat", None, {}, "hi")]
+    result = asyncio.run(scenarios.replay(rows, n=40, concurrency=20, latency_ms=20))
+    assert result["utterances"] == 40
+    assert result["mismatches"] == 0
+    assert result["llm_routes"] == 40
+    assert result["stages"]["route"]["count"] == 40
+    assert result["stages"]["route"]["p50_ms"] >= 15
+    assert result["stages"]["tool"]["count"] == 20
+    assert result["tool_calls"][0] == ("launch_app", {"app": "calc"})
+    # 40 requests of ~20 ms with 20 in flight take nowhere near 800 ms.
+    assert result["wall_s"] < 0.4
+
+
+
+def test_replay_ignores_llm_stream(monkeypatch):
+    monkeypatch.setattr("core.intent_router.LLM_STREAM", True)
+    rows = [("fire up the calculator", "launch_app", {"app": "calc"}, "")]
+    result = asyncio.run(scenarios.replay(rows, n=2, concurrency=1))
+    assert result["mismatches"] == 0 and result["errors"] == 0
+
+def test_run_file_honours_path(tmp_path):
+    path = tmp_path / "one.csv"
+    path.write_text('fire up notepad,launch_app,"{""app"": ""notepad""}"\n')
+    result = scenarios.run_file(str(path))
+    assert result["utterances"] == 1
+    assert result["tool_calls"] == [("launch_app", {"app": "notepad"})]
+
+
+def test_execute_counts_only_executor_errors(monkeypatch):
+    monkeypatch.setitem(tools._REGISTRY["launch_app"], "callable", lambda app: (False, "not installed"))
+    rows = [("fire up the calculator", "launch_app", {"app": "calc"}, "")]
+    assert asyncio.run(scenarios.replay(rows, execute=True))["errors"] == 0
+
+    def broken(app):
+        raise OSError("no display")
+
+    monkeypatch.setitem(tools._REGISTRY["launch_app"], "callable", broken)
+    assert asyncio.run(scenarios.replay(rows, n=2, execute=True))["errors"] == 2
+
+
+def test_validate_is_timed_through_the_router(monkeypatch):
+    import time
+    from core import intent_router
+
+    monkeypatch.setattr(intent_router, "validate_tool_args", lambda name, args: time.sleep(0.02))
+    rows = [("fire up the calculator", "launch_app", {"app": "calc"}, "")]
+    result = asyncio.run(scenarios.replay(rows, n=2))
+    assert result["stages"]["validate"]["p50_ms"] >= 15
+    assert result["stages"]["route"]["p50_ms"] < 15
@@ -0,0 +1,96 @@
+import asyncio
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import assistant
+from app.scenarios import FakeLLM, completion
+from app.speculation import Speculator
+from benchmarks.bench_speculation import replay
+
+
+def test_commits_matching_final_and_cancels_mismatch():
+    planned = []
+
+    async def plan(cmd):
+        planned.append(cmd)
+        await asyncio.sleep(0.01)
+        return None, cmd, None
+
+    async def main():
+        spec = Speculator(plan, stable=2)
+        spec.observe("open git")
+        spec.observe("open github")
+        spec.observe("open github")  # stable: launches
+        spec.observe("open github")  # already running
+        committed = await spec.take("Open  GitHub")
+        spec.observe("play jazz")
+        spec.observe("play jazz")
+        assert spec.take("play jazz please") is None
+        return spec, committed
+
+    spec, committed = asyncio.run(main())
+    assert committed == (None, "open github", None)
+    # The mismatched speculation was cancelled before it got to plan.
+    assert planned == ["open github"]
+    stats = spec.stats()
+    assert stats["launched"] == 2 and stats["committed"] == 1 and stats["cancelled"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_speculative_plan_never_runs_tools(monkeypatch):
+    calls = []
+    fake = lambda name: calls.append(name) or (True, "ok")
+    monkeypatch.setitem(assistant._REGISTRY["kill_process"], "callable", fake)
+    router = FakeLLM({"close discord": completion("kill_process", {"name": "discord"})})
+
+    async def main():
+        spec = Speculator(lambda cmd: assistant.plan_command(cmd, router))
+        spec.observe("close discord")
+        spec.observe("close discord")
+        await asyncio.sleep(0.02)
+        assert calls == []
+        # The final text differs: the plan is discarded and nothing runs.
+        assert spec.take("close discord now") is None
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert calls == []
+
+
+def test_replayed_timeline_saves_route_time():
+    router = FakeLLM({"play some jazz": completion(None, content="ok")}, latency=lambda: 0.08)
+    timeline = [
+        (0, "wake", "kyra"),
+        (10, "partial", "kyra play some"),
+        (20, "partial", "kyra play some jazz"),
+        (30, "partial", "kyra play some jazz"),
+        (150, "final", "play some jazz"),
+    ]
+    baseline = asyncio.run(replay(timeline, router, speculate=False))
+    speculative = asyncio.run(replay(timeline, router, speculate=True))
+    assert baseline[0] >= 70
+    assert speculative[0] < 40
+
+
+def test_plan_does_not_wait_for_speech_synthesis():
+    started = []
+
+    async def plan(cmd):
+        return "Here you go.", None, None
+
+    async def slow_synth(reply):
+        await asyncio.sleep(1)
+
+    def synthesize(reply):
+        started.append(asyncio.ensure_future(slow_synth(reply)))
+
+    async def main():
+        spec = Speculator(plan, stable=1, synthesize=synthesize)
+        spec.observe("tell me something")
+        await asyncio.sleep(0)
+        plan_result = await asyncio.wait_for(spec.take("tell me something"), 0.2)
+        started[0].cancel()
+        return plan_result
+
+    assert asyncio.run(main())[0] == "Here you go."
+    assert len(started) == 1
@@ -0,0 +1,39 @@
+import importlib
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import app
+
+# Only the voice mode may pull these in.
+HEAVY = ("vosk", "edge_tts", "miniaudio", "simpleaudio", "pyaudio", "numpy", "rich", "pydantic")
+APP_MODULES = ("assistant", "tts", "playback", "voice_cache", "pipeline", "vad")
+
+
+class _Blocker:
+    def __init__(self):
+        self.attempted = []
+
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] in HEAVY:
+            self.attempted.append(name)
+            raise ImportError(f"{name} imported at startup")
+        return None
+
+
+def test_console_and_oneshot_skip_audio_stack(monkeypatch):
+    for name in list(sys.modules):
+        if name.split(".")[0] in HEAVY:
+            monkeypatch.delitem(sys.modules, name)
+    for sub in APP_MODULES:
+        monkeypatch.delitem(sys.modules, f"app.{sub}", raising=False)
+        if hasattr(app, sub):
+            monkeypatch.setattr(app, sub, getattr(app, sub))
+    blocker = _Blocker()
+    monkeypatch.setattr(sys, "meta_path", [blocker, *sys.meta_path])
+
+    assistant = importlib.import_module("app.assistant")
+    router = assistant.IntentRouter()
+    assert router.route("open https://github.com")[0] == "open_website"
+    assistant.speak("hello", False)
+
+    assert blocker.attempted == []
@@ -0,0 +1,89 @@
+import asyncio
+import io
+import json
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from core import tracing
+from app import assistant
+from app.scenarios import FakeLLM, completion
+
+
+def test_histogram_quantiles():
+    h = tracing.Histogram()
+    for ms in [0.5] * 90 + [30] * 9 + [20000]:
+        h.observe(ms)
+    assert h.quantile(0.5) == 1
+    assert h.quantile(0.95) == 50
+    assert h.quantile(1.0) == 20000
+    assert h.summary()["count"] == 100
+
+
+def test_disabled_tracer_records_nothing(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACER", tracing.Tracer(False))
+    assert tracing.span("x") is tracing._NULL
+    with tracing.span("x"):
+        pass
+    tracing.record("y", 1.0)
+    assert tracing.snapshot() == {}
+
+
+def test_spans_carry_command_id_to_jsonl(tmp_path, monkeypatch):
+    path = tmp_path / "spans.jsonl"
+    prom = tmp_path / "kyra.prom"
+    monkeypatch.setattr(tracing, "TRACER", tracing.Tracer(True, str(path), str(prom)))
+    cmd = tracing.begin()
+    with tracing.span("tool", tool="open_website"):
+        pass
+    tracing.record("first_audio", 120.0)
+    out = io.StringIO()
+    tracing.dump(out)
+    assert "first_audio" in out.getvalue()
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [s["span"] for s in spans] == ["tool", "first_audio"]
+    assert {s["cmd"] for s in spans} == {cmd}
+    assert spans[0]["tool"] == "open_website"
+    text = prom.read_text()
+    assert 'kyra_span_ms_bucket{span="first_audio",le="250"} 1' in text
+    assert 'kyra_span_ms_bucket{span="first_audio",le="100"} 0' in text
+    assert 'kyra_span_ms_count{span="tool"} 1' in text
+
+
+def test_handle_text_async_traces_stages(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACER", tracing.Tracer(True))
+    router = FakeLLM({"shut it": completion("kill_process", {"name": "discord"})})
+    monkeypatch.setitem(assistant._REGISTRY, "kill_process", {"callable": lambda name: (True, "ok")})
+
+    class Log:
+        def log(self, tag, msg):
+            pass
+
+    asyncio.run(assistant.handle_text_async("shut it", router, False, Log()))
+    stats = tracing.snapshot()
+    assert set(stats) == {"rules", "llm_route", "validate", "tool_queue", "tool"}
+    assert all(s["count"] == 1 for s in stats.values())
+
+
+def test_signal_dump_does_not_take_lock_in_handler(monkeypatch):
+    import signal
+    import threading
+
+    if not hasattr(signal, "SIGUSR1"):
+        return
+    dumped = threading.Event()
+
+    def dump(out=None):
+        with tracing.TRACER._lock:
+            dumped.set()
+
+    monkeypatch.setattr(tracing, "dump", dump)
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert tracing.install_signal_handler()
+        with tracing.TRACER._lock:
+            # Held by the main thread: a handler that dumped inline would deadlock.
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert not dumped.wait(0.05)
+        assert dumped.wait(2.0)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
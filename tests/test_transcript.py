@@ -0,0 +1,85 @@
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from core.transcript import Transcript
+
+
+def test_writes_after_flush(tmp_path):
+    path = tmp_path / "t.txt"
+    t = Transcript(True, str(path), console=False)
+    t.log("USER", "open youtube")
+    t.log("BOT", "Opening")
+    t.flush()
+    assert path.read_text().splitlines() == ["[USER] open youtube", "[BOT] Opening"]
+
+
+def test_rotation_keeps_bounded_segments(tmp_path):
+    path = tmp_path / "t.txt"
+    t = Transcript(True, str(path), console=False, max_bytes=20, backups=2)
+    for i in range(5):
+        t.log("PART", f"line {i:02d} xxxxxx")
+        t.flush()
+    assert t.rotations == 5
+    assert not path.exists()
+    assert (tmp_path / "t.txt.1").read_text() == "[PART] line 04 xxxxxx\n"
+    assert (tmp_path / "t.txt.2").read_text() == "[PART] line 03 xxxxxx\n"
+    assert not (tmp_path / "t.txt.3").exists()
+
+
+def test_console_and_file_are_separable(tmp_path):
+    printed = []
+    t = Transcript(True, None)
+    t.console = type("C", (), {"print": lambda self, text: printed.append(text)})()
+    t.log("BOT", "hi")
+    t.flush()
+    assert len(printed) == 1
+    assert not list(tmp_path.iterdir())
+
+
+def test_disabled_does_nothing(tmp_path):
+    path = tmp_path / "t.txt"
+    t = Transcript(False, str(path))
+    t.log("BOT", "hi")
+    t.flush()
+    assert not path.exists()
+
+
+def test_failed_write_closes_the_handle(tmp_path, monkeypatch):
+    import builtins
+
+    handles = []
+    real_open = builtins.open
+
+    class Failing:
+        def __init__(self, path, mode):
+            self.fh = real_open(path, mode)
+            self.closed = False
+            handles.append(self)
+
+        def tell(self):
+            return self.fh.tell()
+
+        def write(self, data):
+            raise OSError("disk full")
+
+        def flush(self):
+            pass
+
+        def close(self):
+            self.closed = True
+            self.fh.close()
+
+    path = tmp_path / "t.txt"
+    t = Transcript(True, str(path), console=False)
+
+    def fake_open(p, mode="r", *args, **kwargs):
+        if str(p) == str(path):
+            return Failing(p, mode)
+        return real_open(p, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", fake_open)
+    t.log("USER", "x")
+    t.flush()
+    t.log("USER", "y")
+    t.flush()
+    assert len(handles) == 2 and all(h.closed for h in handles)
@@ -7,3 +7,72 @@ from app.tts import speak
 
 def test_speak_runs():
     asyncio.run(speak("This is only a test."))
+
+
+def test_split_sentences():
+    from app.tts import split_sentences
+
+    assert split_sentences("Hi there. How are you? Fine!") == ["Hi there.", "How are you?", "Fine!"]
+    assert split_sentences("   ") == []
+
+
+def test_speak_plays_first_sentence_before_last_is_synthesized(monkeypatch):
+    from app import tts
+
+    events = []
+    release = asyncio.Event()
+
+    async def fake_load(text):
+        if text == "Second.":
+            await release.wait()
+        events.append(("loaded", text))
+        return tts.Clip(b"", 1, 2, 16000)
+
+    async def fake_play(clip):
+        events.append(("play",))
+        release.set()
+
+    monkeypatch.setattr(tts, "load_sentence", fake_load)
+    monkeypatch.setattr(tts, "_play", fake_play)
+    asyncio.run(tts.speak("First. Second."))
+    assert events == [("loaded", "First."), ("play",), ("loaded", "Second."), ("play",)]
+
+
+def test_prewarm_fills_cache_once(monkeypatch, tmp_path):
+    from app import tts, voice_cache
+
+    synthesized = []
+
+    async def fake_synth(text):
+        synthesized.append(text)
+        return b"mp3"
+
+    monkeypatch.setattr(tts, "_synth_mp3", fake_synth)
+    monkeypatch.setattr(tts, "_VOICE_CACHE", voice_cache.VoiceCache(tmp_path, 10_000, store_pcm=False))
+    assert asyncio.run(tts.prewarm(["Ready", "Sure, I'm here. Ready"])) == 2
+    assert asyncio.run(tts.prewarm(["Ready"])) == 0
+    assert synthesized == ["Ready", "Sure, I'm here."]
+
+
+def test_warm_clip_is_used_once_and_not_cached(monkeypatch, tmp_path):
+    from app import tts, voice_cache
+
+    synthesized = []
+
+    async def fake_synth(text):
+        synthesized.append(text)
+        return b"mp3"
+
+    monkeypatch.setattr(tts, "_synth_mp3", fake_synth)
+    monkeypatch.setattr(tts, "decode_mp3", lambda mp3: tts.Clip(b"pcm", 1, 2, 16000))
+    cache = voice_cache.VoiceCache(tmp_path, 10_000, store_pcm=False)
+    monkeypatch.setattr(tts, "_VOICE_CACHE", cache)
+
+    async def main():
+        tts.warm("Opening it now. Enjoy.")
+        return await tts.load_sentence("Opening it now.")
+
+    assert asyncio.run(main()).samples == b"pcm"
+    assert synthesized == ["Opening it now."]
+    assert "Opening it now." not in cache
+    assert tts._WARM == {}
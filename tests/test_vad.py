@@ -0,0 +1,41 @@
+import os, sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+np = pytest.importorskip("numpy")
+from app.vad import EnergyVAD
+
+
+def _tone(amp, n=4000):
+    t = np.arange(n)
+    return (amp * np.sin(2 * np.pi * 220 * t / 16000)).astype("<i2").tobytes()
+
+
+def _noise(amp, n=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.normal(0, amp, n)).astype("<i2").tobytes()
+
+
+def test_measure_tone():
+    rms, zcr = EnergyVAD.measure(_tone(1000))
+    assert 650 < rms < 760
+    assert zcr < 0.05
+
+
+def test_skips_silence_with_hangover_and_preroll():
+    vad = EnergyVAD(calibrate=4, hangover=2)
+    for i in range(4):
+        assert vad.process(_noise(30, seed=i)) != []
+    assert vad.calibrated
+    quiet = [_noise(30, seed=10 + i) for i in range(5)]
+    assert all(vad.process(q) == [] for q in quiet)
+    speech = _tone(3000)
+    assert vad.process(speech) == [quiet[-1], speech]
+    assert vad.process(_noise(30, seed=20)) != []  # hangover
+    assert vad.process(_noise(30, seed=21)) != []
+    assert vad.process(_noise(30, seed=22)) == []
+    stats = vad.stats(decode_ms=5.0)
+    assert stats["skipped"] == 5
+    assert stats["skipped_pct"] == round(100 * 5 / 13, 1)
+    assert stats["cpu_saved_ms"] < 25
@@ -0,0 +1,57 @@
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import voice_cache
+from app.voice_cache import Clip, VoiceCache
+
+
+def test_pcm_hit_needs_no_decode(tmp_path, monkeypatch):
+    cache = VoiceCache(tmp_path, max_bytes=1000)
+    cache.store("Ready", b"mp3", Clip(b"\x01\x02" * 10, 1, 2, 16000))
+    monkeypatch.setattr(voice_cache, "decode_mp3", lambda data: (_ for _ in ()).throw(AssertionError))
+    clip = cache.load("Ready")
+    assert bytes(clip.samples) == b"\x01\x02" * 10
+    assert (clip.nchannels, clip.sample_width, clip.sample_rate) == (1, 2, 16000)
+    assert cache.stats()["hits"] == 1
+    assert cache.load("missing") is None
+
+
+def test_lru_eviction_to_budget(tmp_path, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(voice_cache.time, "time", lambda: now[0])
+    cache = VoiceCache(tmp_path, max_bytes=25, store_pcm=False)
+    for text in ("a", "b"):
+        cache.store(text, b"x" * 10)
+        now[0] += 1
+    cache.load("a")
+    now[0] += 1
+    cache.store("c", b"x" * 10)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.stats() == {"entries": 2, "bytes": 20, "hits": 1, "misses": 0, "evictions": 1}
+    assert sorted(p.name for p in tmp_path.glob("*.mp3")) == sorted(
+        [voice_cache.cache_key("a") + ".mp3", voice_cache.cache_key("c") + ".mp3"]
+    )
+
+
+def test_index_survives_restart_and_adopts_legacy(tmp_path):
+    (tmp_path / (voice_cache.cache_key("old") + ".mp3")).write_bytes(b"abc")
+    cache = VoiceCache(tmp_path, max_bytes=1000)
+    assert "old" in cache
+    cache.store("new", b"mp3", Clip(b"\x00" * 4, 1, 2, 8000))
+    again = VoiceCache(tmp_path, max_bytes=1000)
+    assert "new" in again and "old" in again
+
+
+def test_hits_are_persisted_and_maps_closed(tmp_path):
+    cache = VoiceCache(tmp_path, max_bytes=1000, save_every=2)
+    cache.store("Ready", b"mp3", Clip(b"\x01\x02" * 10, 1, 2, 16000))
+    cache.store("Done", b"mp3", Clip(b"\x03\x04" * 10, 1, 2, 16000))
+    cache.load("Ready")
+    cache.load("Ready")
+    key = voice_cache.cache_key("Ready")
+    assert VoiceCache(tmp_path, max_bytes=1000)._index[key]["hits"] == 2
+    clip = cache.load("Done")
+    cache.close()
+    assert clip.samples.closed
+    assert VoiceCache(tmp_path, max_bytes=1000)._index[voice_cache.cache_key("Done")]["hits"] == 1
@@ -0,0 +1,136 @@
+import json
+import threading
+import os, sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import youtube
+
+
+class StreamResp:
+    def __init__(self, chunks, delay=0.0):
+        self.chunks = chunks
+        self.delay = delay
+        self.served = 0
+        self.closed = False
+
+    def iter_content(self, size):
+        import time
+
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            self.served += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, resp):
+        self.resp = resp
+        self.calls = 0
+
+    def get(self, url, stream=False, timeout=None):
+        assert stream
+        self.calls += 1
+        return self.resp
+
+
+def _resolver(resp, **kwargs):
+    r = youtube.YouTubeResolver(youtube.VideoIdCache(), **kwargs)
+    r._session = FakeSession(resp)
+    return r
+
+
+def test_stops_reading_at_first_match_across_chunks():
+    page = [b"x" * 1000, b'<a href="/wat', b'ch?v=abc123def45">', b"y" * 100_000]
+    resp = StreamResp(page)
+    r = _resolver(resp)
+    assert r.resolve("Lofi  Beats") == "https://www.youtube.com/watch?v=abc123def45"
+    assert resp.served == 3 and resp.closed
+    assert r.stats()["last_bytes"] == sum(len(c) for c in page[:3])
+
+
+def test_cache_hits_skip_the_network():
+    r = _resolver(StreamResp([b"/watch?v=abc123def45"]))
+    r.resolve("lofi beats")
+    assert r.resolve("LOFI beats") == "https://www.youtube.com/watch?v=abc123def45"
+    stats = r.stats()
+    assert r._session.calls == 1
+    assert stats["hits"] == 1 and stats["hit_rate"] == 0.5
+
+
+def test_deadline_falls_back_to_search_url():
+    r = _resolver(StreamResp([b"z" * 100] * 50, delay=0.01), deadline=0.03)
+    url = r.resolve("slow song")
+    assert url == youtube.search_url("slow song")
+    assert r._session.resp.served < 50
+    assert r.stats()["fallbacks"] == 1
+    assert len(r.cache) == 0
+
+
+def test_cache_persists_and_expires(tmp_path):
+    path = str(tmp_path / "yt.json")
+    youtube.VideoIdCache(path=path).put("song", "abc123def45")
+    assert youtube.VideoIdCache(path=path).get("Song") == "abc123def45"
+    rows = json.loads(open(path).read())
+    rows[0][1] -= 10
+    with open(path, "w") as f:
+        json.dump(rows, f)
+    assert youtube.VideoIdCache(ttl=5, path=path).get("song") is None
+
+
+class HangingResp:
+    """A body read that blocks until the response is closed."""
+
+    def __init__(self):
+        import threading
+
+        self.closed = threading.Event()
+
+    def iter_content(self, size):
+        yield b"x" * 10
+        self.closed.wait(5)
+        raise ConnectionError("closed")
+
+    def close(self):
+        self.closed.set()
+
+
+def test_deadline_closes_a_stalled_body():
+    import time
+
+    r = _resolver(HangingResp(), deadline=0.05)
+    start = time.monotonic()
+    assert r.resolve("stalled") == youtube.search_url("stalled")
+    assert time.monotonic() - start < 1.0
+
+
+def test_bad_cache_rows_are_skipped(tmp_path):
+    import time
+
+    path = tmp_path / "yt.json"
+    path.write_text(json.dumps([["song", time.time(), "abc123def45"], ["broken"], 5, ["x", "y", "z"]]))
+    cache = youtube.VideoIdCache(path=str(path))
+    assert cache.get("song") == "abc123def45"
+    assert len(cache) == 1
+    path.write_text(json.dumps({"not": "rows"}))
+    assert len(youtube.VideoIdCache(path=str(path))) == 0
+
+
+def test_shared_resolver_is_created_once(monkeypatch, tmp_path):
+    monkeypatch.setattr(youtube, "_RESOLVER", None)
+    monkeypatch.setattr(youtube, "YOUTUBE_CACHE", str(tmp_path / "yt.json"))
+    barrier = threading.Barrier(8)
+    seen = []
+
+    def grab():
+        barrier.wait()
+        seen.append(youtube.resolver())
+
+    threads = [threading.Thread(target=grab) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(r) for r in seen}) == 1